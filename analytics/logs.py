@@ -0,0 +1,299 @@
+"""Step-timing analyzer for reports/logs.
+
+Streams any number of run logs (the plain `log_*.log` format and the
+JSON-lines `log_*.jsonl` format), rebuilds per-test and per-step
+durations, and reports the slowest steps, per-browser variance and
+regressions against a stored baseline.
+
+Usage:
+    python -m analytics.logs reports/logs
+    python -m analytics.logs reports/logs --save-baseline step_baseline.json
+    python -m analytics.logs reports/logs --baseline step_baseline.json --threshold 1.5
+"""
+import argparse
+import glob
+import json
+import math
+import mmap
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+
+PLAIN_LINE = re.compile(rb"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - (\w+) - (.*)$")
+STEP = re.compile(r"\bStep (\d+):?\s*(.*)$")
+BROWSER_PREFIX = re.compile(r"^\s*\[([A-Za-z]+)\]\s*")
+NODEID_PARAM = re.compile(r"\[(chrome|firefox)\]$", re.IGNORECASE)
+
+
+class RunningStats():
+    """Count/mean/variance/max accumulated in one pass and mergeable across processes"""
+
+    __slots__ = ("count", "mean", "m2", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        if not other.count:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def stdev(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def to_dict(self):
+        return {"count": self.count, "mean_s": round(self.mean, 4),
+                "stdev_s": round(self.stdev, 4), "max_s": round(self.max, 4)}
+
+    def __getstate__(self):
+        return (self.count, self.mean, self.m2, self.max)
+
+    def __setstate__(self, state):
+        self.count, self.mean, self.m2, self.max = state
+
+
+def _records(path):
+    """Yield (ts, nodeid, browser, message) from either log format, via mmap"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for raw in iter(mm.readline, b""):
+                raw = raw.rstrip(b"\r\n")
+                if raw.startswith(b"{"):
+                    try:
+                        entry = json.loads(raw)
+                    except ValueError:
+                        continue
+                    yield entry.get("ts"), entry.get("nodeid"), entry.get("browser"), entry.get("message", "")
+                    continue
+                match = PLAIN_LINE.match(raw)
+                if match:
+                    ts = datetime.strptime(match.group(1).decode(), "%Y-%m-%d %H:%M:%S,%f").timestamp()
+                    yield ts, None, None, match.group(3).decode("utf-8", errors="replace")
+
+
+class _OpenTest():
+    def __init__(self, key, browser, ts):
+        self.key = key
+        self.browser = browser
+        self.start = ts
+        self.last = ts
+        self.step = None
+
+
+def _close_step(test, ts, step_stats):
+    if test.step is None:
+        return
+    number, label, started = test.step
+    step_key = (test.key, number, label)
+    step_stats.setdefault((step_key, test.browser), RunningStats()).add(max(0.0, ts - started))
+    test.step = None
+
+
+def analyze_file(path):
+    """Per-file aggregates: ({(step_key, browser): stats}, {(test, browser): stats})"""
+    step_stats = {}
+    test_stats = {}
+    open_tests = {}
+    plain_current = None
+
+    def finish(test):
+        _close_step(test, test.last, step_stats)
+        test_stats.setdefault((test.key, test.browser), RunningStats()).add(test.last - test.start)
+
+    for ts, nodeid, browser, message in _records(path):
+        if ts is None:
+            continue
+        prefix = BROWSER_PREFIX.match(message)
+        text = message[prefix.end():] if prefix else message
+        if prefix and browser is None:
+            browser = prefix.group(1).lower()
+        step = STEP.search(text)
+
+        if nodeid:
+            base = NODEID_PARAM.sub("", nodeid)
+            if browser is None:
+                param = NODEID_PARAM.search(nodeid)
+                browser = param.group(1).lower() if param else None
+            test = open_tests.get(nodeid)
+            if test is None:
+                test = open_tests[nodeid] = _OpenTest(base, browser, ts)
+        else:
+            # Plain logs carry no test id: "Step 1" opens a new test, named
+            # after its first step.
+            if step and step.group(1) == "1":
+                if plain_current is not None:
+                    finish(plain_current)
+                plain_current = _OpenTest(step.group(2).strip() or "<unnamed>", browser, ts)
+            test = plain_current
+            if test is None:
+                continue
+
+        test.last = ts
+        if step:
+            _close_step(test, ts, step_stats)
+            test.step = (int(step.group(1)), step.group(2).strip(), ts)
+
+    for test in open_tests.values():
+        finish(test)
+    if plain_current is not None:
+        finish(plain_current)
+    return step_stats, test_stats
+
+
+def collect_paths(inputs):
+    """Expand files, directories and globs into a sorted list of log files"""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.update(glob.glob(os.path.join(item, "log_*.log")))
+            paths.update(glob.glob(os.path.join(item, "log_*.jsonl")))
+        else:
+            paths.update(p for p in glob.glob(item) if os.path.isfile(p))
+    return sorted(paths)
+
+
+def analyze(paths, workers=None):
+    """Aggregate step and test timings over many files, one file per process task"""
+    if workers == 1 or len(paths) <= 1:
+        return _merge(map(analyze_file, paths))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return _merge(executor.map(analyze_file, paths, chunksize=max(1, len(paths) // 64)))
+
+
+def _merge(results):
+    steps, tests = {}, {}
+    for step_stats, test_stats in results:
+        for key, stats in step_stats.items():
+            steps.setdefault(key, RunningStats()).merge(stats)
+        for key, stats in test_stats.items():
+            tests.setdefault(key, RunningStats()).merge(stats)
+    return steps, tests
+
+
+def step_name(step_key):
+    test, number, label = step_key
+    return f"{test} :: Step {number}" + (f": {label}" if label else "")
+
+
+def build_report(steps, tests, top=10, baseline=None, threshold=1.5, min_delta=0.05):
+    """Turn aggregates into a JSON-serialisable report"""
+    overall = {}
+    for (step_key, _), stats in steps.items():
+        overall.setdefault(step_key, RunningStats()).merge(stats)
+
+    slowest = sorted(overall.items(), key=lambda item: item[1].mean, reverse=True)[:top]
+    per_browser = {}
+    for (step_key, browser), stats in steps.items():
+        if browser:
+            per_browser.setdefault(step_name(step_key), {})[browser] = stats.to_dict()
+
+    regressions = []
+    for step_key, stats in overall.items():
+        name = step_name(step_key)
+        before = (baseline or {}).get(name)
+        if before is None:
+            continue
+        if stats.mean > before * threshold and stats.mean - before >= min_delta:
+            regressions.append({"step": name, "baseline_s": before, "current_s": round(stats.mean, 4),
+                                "ratio": round(stats.mean / before, 2) if before else None})
+    regressions.sort(key=lambda r: r["current_s"] - r["baseline_s"], reverse=True)
+
+    return {
+        "tests": {f"{key}[{browser}]" if browser else key: stats.to_dict()
+                  for (key, browser), stats in sorted(tests.items(), key=lambda i: (i[0][0], i[0][1] or ""))},
+        "slowest_steps": [{"step": step_name(key), **stats.to_dict()} for key, stats in slowest],
+        "per_browser": per_browser,
+        "regressions": regressions,
+        "total_time_s": round(sum(s.mean * s.count for s in tests.values()), 3),
+    }
+
+
+def baseline_from(steps):
+    """Mean duration per step, for --save-baseline"""
+    overall = {}
+    for (step_key, _), stats in steps.items():
+        overall.setdefault(step_key, RunningStats()).merge(stats)
+    return {step_name(key): round(stats.mean, 4) for key, stats in overall.items()}
+
+
+def format_report(report, files):
+    lines = [f"Analyzed {files} log file(s), {len(report['tests'])} test(s), "
+             f"{report['total_time_s']:.1f}s of logged test time", "", "Slowest steps (mean):"]
+    for entry in report["slowest_steps"]:
+        lines.append(f"  {entry['mean_s']:8.3f}s ±{entry['stdev_s']:.3f} (n={entry['count']}, "
+                     f"max {entry['max_s']:.3f}s)  {entry['step']}")
+    if report["per_browser"]:
+        lines += ["", "Per-browser variance:"]
+        for name, browsers in sorted(report["per_browser"].items()):
+            detail = "  ".join(f"{b}: {s['mean_s']:.3f}s ±{s['stdev_s']:.3f}" for b, s in sorted(browsers.items()))
+            lines.append(f"  {name}\n      {detail}")
+    if report["regressions"]:
+        lines += ["", "Regressions vs baseline:"]
+        for r in report["regressions"]:
+            lines.append(f"  {r['baseline_s']:.3f}s -> {r['current_s']:.3f}s (x{r['ratio']})  {r['step']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m analytics.logs", description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="*", default=[os.path.join("reports", "logs")],
+                        help="log files, directories or globs (default: reports/logs)")
+    parser.add_argument("--top", type=int, default=10, help="how many slowest steps to list")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--baseline", help="baseline JSON to compare step means against")
+    parser.add_argument("--threshold", type=float, default=1.5, help="regression ratio vs baseline")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="ignore regressions smaller than this (s)")
+    parser.add_argument("--save-baseline", help="write current step means as a baseline JSON")
+    parser.add_argument("--json", dest="json_path", help="write the report as JSON ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    paths = collect_paths(args.inputs)
+    if not paths:
+        parser.error("no log files found")
+    steps, tests = analyze(paths, workers=args.workers)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    report = build_report(steps, tests, top=args.top, baseline=baseline,
+                          threshold=args.threshold, min_delta=args.min_delta)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(baseline_from(steps), f, indent=2, sort_keys=True)
+    if args.json_path == "-":
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        if args.json_path:
+            with open(args.json_path, "w") as f:
+                json.dump(report, f, indent=2)
+        print(format_report(report, len(paths)))
+    return 1 if report["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,462 @@
+"""Columnar viewer-session analytics for event streams.
+
+Loads events (userId, type, videoTime, timestamp) into NumPy columns with
+dictionary-encoded userId/type and computes per-user viewing metrics with
+vectorized group-bys.
+
+Usage:
+    python -m analytics.sessions events.jsonl [--json out.json]
+    python -m analytics.sessions --synthetic 10000000 --users 100000
+    python -m analytics.sessions --synthetic 10000000 --jsonl /tmp/events.jsonl
+"""
+import argparse
+import json
+import sys
+import time
+import warnings
+
+import numpy as np
+
+
+PLAY, PAUSE, SEEKED, SCROLL = "play", "pause", "seeked", "scroll"
+NAT = np.iinfo(np.int64).min
+
+# from_jsonl reads this many bytes at a time (cut at a line end)
+JSONL_BLOCK_BYTES = 16 * 1024 * 1024
+
+# Bytes that may appear in a timestamp the vectorized parser is given;
+# anything else (time zones, odd formats) goes through _parse_timestamps.
+_TIMESTAMP_BYTES = np.zeros(256, dtype=bool)
+_TIMESTAMP_BYTES[list(b"0123456789-:.T\0")] = True
+# Separators around a bare JSON number, blanked before float parsing
+_NUMBER_SEPARATORS = np.zeros(256, dtype=bool)
+_NUMBER_SEPARATORS[list(b":,{}\t\r ")] = True
+
+
+def _encode(values):
+    """Dictionary-encode a sequence: returns (codes int32, names list)"""
+    codes = {}
+    encoded = np.fromiter(
+        (codes.setdefault(v if isinstance(v, str) or v is None else json.dumps(v), len(codes)) for v in values),
+        dtype=np.int32, count=len(values),
+    )
+    return encoded, list(codes)
+
+
+def _parse_timestamps(values):
+    """ISO-8601 strings -> int64 epoch milliseconds, NAT where unparsable"""
+    strings = np.asarray([v[:-1] if isinstance(v, str) and v.endswith("Z") else v for v in values], dtype=object)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return strings.astype("datetime64[ms]").astype(np.int64)
+    except (ValueError, TypeError):
+        pass
+    # Slow path: at least one value is malformed, parse one by one.
+    out = np.empty(len(strings), dtype=np.int64)
+    for i, value in enumerate(strings):
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                parsed = np.datetime64(value, "ms") if isinstance(value, str) else np.datetime64("NaT")
+            out[i] = parsed.astype(np.int64)
+        except ValueError:
+            out[i] = NAT
+    return out
+
+
+def _recode(local_codes, local_names, codes):
+    """Map block-local codes onto the file-wide dictionary `codes` (name -> code)"""
+    lut = np.array([codes.setdefault(name, len(codes)) for name in local_names], dtype=np.int32)
+    return lut[local_codes] if len(lut) else local_codes.astype(np.int32)
+
+
+def _gather(buf, start, end):
+    """Byte ranges [start, end) of `buf` as rows of a zero-padded uint8 matrix"""
+    length = end - start
+    width = max(int(length.max()), 1) if len(length) else 1
+    offsets = np.arange(width)
+    if len(start) and width <= len(buf) and start.max() + width <= len(buf):
+        # Copying whole rows out of a strided view beats gathering bytes one by one.
+        chars = np.lib.stride_tricks.sliding_window_view(buf, width)[start]
+    else:
+        chars = buf[np.minimum(start[:, None] + offsets, len(buf) - 1)]
+    chars[offsets >= length[:, None]] = 0
+    return chars
+
+
+def _as_bytes(chars):
+    return np.ascontiguousarray(chars).view(f"S{chars.shape[1]}").ravel()
+
+
+def _encode_chars(chars):
+    """Dictionary-encode the rows of a _gather matrix: (codes int32, names list).
+
+    Rows are hashed to uint64 and grouped with np.unique; a hash collision
+    (two different rows, one hash) falls back to sorting the rows.
+    """
+    hashes = np.zeros(len(chars), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for column in chars.T:
+            hashes = hashes * np.uint64(1099511628211) + column
+    _, first, codes = np.unique(hashes, return_index=True, return_inverse=True)
+    values = _as_bytes(chars)
+    if not np.array_equal(values[first][codes], values):
+        names, codes = np.unique(values, return_inverse=True)
+    else:
+        names = values[first]
+    return codes.astype(np.int32), [name.decode() for name in names.tolist()]
+
+
+def _line_layout(line):
+    """(quotes per line, {field: quote index}) for lines shaped like `line`, or None.
+
+    userId/type/timestamp map to the opening quote of their string value,
+    videoTime to the closing quote of its key (the number follows it).
+    """
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(event, dict):
+        return None
+    fields = {}
+    position = 0
+    for key, value in event.items():
+        if key == "videoTime" and isinstance(value, (int, float)) and not isinstance(value, bool):
+            fields[key] = position + 1
+        position += 2
+        if isinstance(value, str):
+            if key in ("userId", "type", "timestamp"):
+                fields[key] = position
+            position += 2
+        else:
+            position += json.dumps(value, ensure_ascii=False).count('"')
+    if len(fields) != 4 or position != line.count(b'"'):
+        return None
+    return position, fields
+
+
+def _decode_block_fast(block):
+    """Columns of a block whose lines all share the first line's layout, or None.
+
+    Works on the raw bytes with NumPy: quote positions give every field's
+    byte range, which are gathered into fixed-width arrays and converted
+    in bulk. Escapes, blank lines, missing or non-string/number fields
+    and differing key orders all return None (decoded with json.loads).
+    """
+    if b"\\" in block:
+        return None
+    buf = np.frombuffer(block, dtype=np.uint8)
+    ends = np.flatnonzero(buf == ord("\n"))
+    if not block.endswith(b"\n"):
+        ends = np.append(ends, len(buf))
+    n = len(ends)
+    if n == 0:
+        return None
+    layout = _line_layout(block[:ends[0]])
+    if layout is None:
+        return None
+    per_line, fields = layout
+    quotes = np.flatnonzero(buf == ord('"'))
+    if len(quotes) != per_line * n:
+        return None
+    quotes = quotes.reshape(n, per_line)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    # Quotes are sorted, so each row lies in its own line iff its ends do.
+    if np.any(quotes[:, 0] < starts) or np.any(quotes[:, -1] > ends):
+        return None
+    for key, index in fields.items():
+        key_open = index - 2 if key != "videoTime" else index - 1
+        key_start = quotes[:, key_open] + 1
+        if np.any(quotes[:, key_open + 1] - key_start != len(key)):
+            return None
+        key_bytes = np.frombuffer(key.encode(), dtype=np.uint8)
+        if not np.all(buf[key_start[:, None] + np.arange(len(key_bytes))] == key_bytes):
+            return None
+
+    def string_field(key):
+        index = fields[key]
+        return quotes[:, index] + 1, quotes[:, index + 1]
+
+    user, users = _encode_chars(_gather(buf, *string_field("userId")))
+    event_type, types = _encode_chars(_gather(buf, *string_field("type")))
+
+    index = fields["videoTime"]
+    number_end = quotes[:, index + 1] if index + 1 < per_line else ends
+    number = _gather(buf, quotes[:, index] + 1, number_end)
+    number[_NUMBER_SEPARATORS[number]] = ord(" ")
+    try:
+        video_time = _as_bytes(number).astype(np.float64)
+    except ValueError:
+        return None
+
+    start, end = string_field("timestamp")
+    end = end - ((end > start) & (buf[np.maximum(end - 1, 0)] == ord("Z")))
+    chars = _gather(buf, start, end)
+    timestamp = None
+    if _TIMESTAMP_BYTES[chars].all():
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                timestamp = _as_bytes(chars).astype("datetime64[ms]").astype(np.int64)
+        except ValueError:
+            timestamp = None
+    if timestamp is None:
+        timestamp = _parse_timestamps([value.decode("utf-8", "replace") for value in _as_bytes(chars).tolist()])
+    return user, users, event_type, types, video_time, timestamp
+
+
+def _decode_block_json(block):
+    """Columns of any block: one json.loads for the block, or per line when it has a bad line"""
+    lines = [line for line in block.split(b"\n") if line.strip()]
+    try:
+        events = json.loads(b"[" + b",".join(lines) + b"]")
+    except ValueError:
+        events = []
+        for line in lines:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    events = [e if isinstance(e, dict) else {} for e in events]
+    user, users = _encode([e.get("userId") for e in events])
+    event_type, types = _encode([e.get("type") for e in events])
+    video_time = np.fromiter((_to_float(e.get("videoTime")) for e in events), dtype=np.float64, count=len(events))
+    timestamp = _parse_timestamps([e.get("timestamp") for e in events])
+    return user, users, event_type, types, video_time, timestamp
+
+
+def _to_float(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return float(value)
+
+
+class EventColumns():
+    """Viewer events stored column-wise.
+
+    `user` and `type` hold int32 codes into `users` / `types`; `video_time`
+    is float64 (NaN when missing) and `timestamp` int64 epoch milliseconds
+    (NAT when missing or malformed).
+    """
+
+    def __init__(self, user, users, event_type, types, video_time, timestamp):
+        self.user = user
+        self.users = users
+        self.type = event_type
+        self.types = types
+        self.video_time = video_time
+        self.timestamp = timestamp
+
+    def __len__(self):
+        return len(self.user)
+
+    @classmethod
+    def from_events(cls, events):
+        """Build from an iterable of event dicts"""
+        events = [e if isinstance(e, dict) else {} for e in events]
+        user, users = _encode([e.get("userId") for e in events])
+        event_type, types = _encode([e.get("type") for e in events])
+        video_time = np.fromiter((_to_float(e.get("videoTime")) for e in events),
+                                 dtype=np.float64, count=len(events))
+        timestamp = _parse_timestamps([e.get("timestamp") for e in events])
+        return cls(user, users, event_type, types, video_time, timestamp)
+
+    @classmethod
+    def from_jsonl(cls, path, block_bytes=JSONL_BLOCK_BYTES):
+        """Build from a JSON-lines file; blank and non-JSON lines are skipped.
+
+        The file is decoded `block_bytes` at a time straight into columns:
+        blocks of uniformly shaped lines with vectorized NumPy parsing, any
+        other block with a single json.loads. No per-event dicts are kept
+        for the common case, so memory stays near the size of the columns.
+        """
+        user_codes, type_codes = {}, {}
+        parts = []
+        with open(path, "rb") as f:
+            pending = b""
+            while True:
+                chunk = f.read(block_bytes)
+                data = pending + chunk
+                if chunk:
+                    cut = data.rfind(b"\n") + 1
+                    data, pending = data[:cut], data[cut:]
+                if data:
+                    decoded = _decode_block_fast(data) or _decode_block_json(data)
+                    user, users, event_type, types, video_time, timestamp = decoded
+                    parts.append((_recode(user, users, user_codes), _recode(event_type, types, type_codes),
+                                  video_time, timestamp))
+                if not chunk:
+                    break
+        if not parts:
+            return cls.from_events([])
+        user, event_type, video_time, timestamp = (np.concatenate(column) for column in zip(*parts))
+        return cls(user, list(user_codes), event_type, list(type_codes), video_time, timestamp)
+
+    @classmethod
+    def from_arrays(cls, user_ids, types, video_times, timestamps):
+        """Build from parallel arrays; timestamps may be ISO strings or datetime64"""
+        user_names, user = np.unique(np.asarray(user_ids, dtype=str), return_inverse=True)
+        type_names, event_type = np.unique(np.asarray(types, dtype=str), return_inverse=True)
+        timestamps = np.asarray(timestamps)
+        if np.issubdtype(timestamps.dtype, np.datetime64):
+            timestamp = timestamps.astype("datetime64[ms]").astype(np.int64)
+        else:
+            timestamp = _parse_timestamps(list(timestamps))
+        return cls(user.astype(np.int32), list(user_names), event_type.astype(np.int32), list(type_names),
+                   np.asarray(video_times, dtype=np.float64), timestamp)
+
+    def type_code(self, name):
+        """Code of an event type, or -1 when it never occurs"""
+        return self.types.index(name) if name in self.types else -1
+
+
+def viewer_metrics(columns):
+    """Per-user viewing metrics.
+
+    Events are ordered by (user, timestamp). A user is "playing" from a
+    play event until the next pause; events without a valid timestamp are
+    ignored. Returns a dict of equal-length arrays indexed by user code,
+    plus "userId" with the user names:
+
+    - events: events per user
+    - watch_time: seconds spent playing, between consecutive events
+    - seeks / seek_distance: seek count and total |jump| in video seconds,
+      measured against where playback would have been without the seek
+    - pauses / pause_dwell: pause count and seconds spent paused after a pause
+    - scrolls / scroll_while_playing_ratio: share of scrolls made while playing
+    """
+    n_users = len(columns.users)
+    valid = columns.timestamp != NAT
+    user = columns.user[valid]
+    order = np.lexsort((columns.timestamp[valid], user))
+    user = user[order]
+    event_type = columns.type[valid][order]
+    video_time = columns.video_time[valid][order]
+    ts = columns.timestamp[valid][order] / 1000.0
+    n = len(user)
+
+    is_play = event_type == columns.type_code(PLAY)
+    is_pause = event_type == columns.type_code(PAUSE)
+    is_seek = event_type == columns.type_code(SEEKED)
+    is_scroll = event_type == columns.type_code(SCROLL)
+
+    group_start = np.ones(n, dtype=bool)
+    group_start[1:] = user[1:] != user[:-1]
+    same_as_next = np.zeros(n, dtype=bool)
+    same_as_next[:-1] = ~group_start[1:]
+    dt_next = np.zeros(n)
+    dt_next[:-1] = np.where(same_as_next[:-1], ts[1:] - ts[:-1], 0.0)
+
+    # Playback state after each event, forward-filled within each user:
+    # play/pause set it, everything else carries it, users start stopped.
+    sets_state = is_play | is_pause | group_start
+    source = np.maximum.accumulate(np.where(sets_state, np.arange(n), 0))
+    playing = is_play[source]
+    paused_by_pause = is_pause[source]
+
+    # State in effect just before each event (the previous row's state).
+    playing_before = np.zeros(n, dtype=bool)
+    playing_before[1:] = playing[:-1] & ~group_start[1:]
+
+    counts = lambda weights=None: np.bincount(user, weights=weights, minlength=n_users)
+
+    watch_time = counts(dt_next * playing)
+    pause_dwell = counts(dt_next * paused_by_pause)
+
+    dt_prev = np.zeros(n)
+    dt_prev[1:] = np.where(group_start[1:], 0.0, ts[1:] - ts[:-1])
+    prev_video_time = np.full(n, np.nan)
+    prev_video_time[1:] = np.where(group_start[1:], np.nan, video_time[:-1])
+    expected = prev_video_time + dt_prev * playing_before
+    jump = np.abs(video_time - expected)
+    seek_distance = counts(np.where(is_seek & ~np.isnan(jump), jump, 0.0))
+
+    scrolls = counts(is_scroll)
+    scrolls_playing = counts(is_scroll & playing_before)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scroll_ratio = np.where(scrolls > 0, scrolls_playing / scrolls, np.nan)
+
+    return {
+        "userId": list(columns.users),
+        "events": counts().astype(np.int64),
+        "watch_time": watch_time,
+        "seeks": counts(is_seek).astype(np.int64),
+        "seek_distance": seek_distance,
+        "pauses": counts(is_pause).astype(np.int64),
+        "pause_dwell": pause_dwell,
+        "scrolls": scrolls.astype(np.int64),
+        "scroll_while_playing_ratio": scroll_ratio,
+    }
+
+
+def metrics_to_records(metrics):
+    """Per-user metrics dict -> list of plain dicts (one per user)"""
+    keys = [k for k in metrics if k != "userId"]
+    return [
+        {"userId": user, **{k: (None if isinstance(metrics[k][i], float) and np.isnan(metrics[k][i])
+                                else metrics[k][i].item()) for k in keys}}
+        for i, user in enumerate(metrics["userId"])
+    ]
+
+
+def synthetic_columns(n_events, n_users, seed=0):
+    """Random viewer sessions generated directly as columns (for benchmarks)"""
+    rng = np.random.default_rng(seed)
+    types = [PLAY, PAUSE, SEEKED, SCROLL]
+    user = rng.integers(0, n_users, n_events, dtype=np.int32)
+    event_type = rng.choice(4, n_events, p=[0.2, 0.2, 0.1, 0.5]).astype(np.int32)
+    timestamp = 1_750_000_000_000 + np.sort(rng.integers(0, 86_400_000, n_events))
+    video_time = rng.uniform(0, 3600, n_events)
+    return EventColumns(user, [f"user-{i}" for i in range(n_users)], event_type, types, video_time, timestamp)
+
+
+def write_jsonl(columns, path):
+    """Write columns as a JSON-lines file of events (the shape the server logs)"""
+    users = np.asarray(columns.users, dtype=object)[columns.user]
+    types = np.asarray(columns.types, dtype=object)[columns.type]
+    timestamps = np.datetime_as_string(columns.timestamp.astype("datetime64[ms]"), unit="ms", timezone="UTC")
+    with open(path, "w") as f:
+        for user, event_type, video_time, timestamp in zip(users, types, columns.video_time.tolist(), timestamps):
+            f.write(f'{{"userId":"{user}","type":"{event_type}","videoTime":{video_time!r},'
+                    f'"timestamp":"{timestamp}"}}\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m analytics.sessions", description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", help="JSON-lines file of events")
+    parser.add_argument("--synthetic", type=int, help="benchmark on N generated events instead of a file")
+    parser.add_argument("--users", type=int, default=10000, help="users for --synthetic")
+    parser.add_argument("--jsonl", help="with --synthetic: write the events to this file and load them back")
+    parser.add_argument("--json", dest="json_path", help="write per-user metrics as JSON")
+    args = parser.parse_args(argv)
+    if not args.path and not args.synthetic:
+        parser.error("give a JSONL path or --synthetic N")
+
+    path = args.path
+    if args.synthetic and args.jsonl:
+        start = time.perf_counter()
+        write_jsonl(synthetic_columns(args.synthetic, args.users), args.jsonl)
+        print(f"wrote {args.synthetic} events to {args.jsonl} in {time.perf_counter() - start:.2f}s")
+        path = args.jsonl
+
+    start = time.perf_counter()
+    columns = EventColumns.from_jsonl(path) if path else synthetic_columns(args.synthetic, args.users)
+    loaded = time.perf_counter()
+    metrics = viewer_metrics(columns)
+    done = time.perf_counter()
+
+    print(f"{len(columns)} events, {len(columns.users)} users: "
+          f"load {loaded - start:.2f}s, metrics {done - loaded:.2f}s")
+    print(f"  total watch time: {metrics['watch_time'].sum():.1f}s, "
+          f"seeks: {metrics['seeks'].sum()}, pauses: {metrics['pauses'].sum()}, "
+          f"scrolls: {metrics['scrolls'].sum()}")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(metrics_to_records(metrics), f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
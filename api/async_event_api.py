@@ -0,0 +1,226 @@
+import asyncio
+import json
+import ssl
+import time
+from collections import namedtuple
+from datetime import datetime
+from urllib.parse import urlsplit
+
+
+EventResult = namedtuple("EventResult", ["index", "status_code", "latency", "error"])
+
+
+class AsyncResponse():
+    """Minimal HTTP response returned by AsyncEventAPI"""
+
+    def __init__(self, status_code, headers, content, elapsed):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class _ConnectionPool():
+    """Keep-alive connection pool bounded to `size` open connections"""
+
+    def __init__(self, host, port, size, use_ssl=False):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.ssl = ssl.create_default_context() if use_ssl else None
+        self.opened = 0
+        self._idle = []
+        self._slots = None
+
+    async def acquire(self):
+        """Return (reader, writer, reused) for an open connection"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        await self._slots.acquire()
+
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        except BaseException:
+            self._slots.release()
+            raise
+        self.opened += 1
+        return reader, writer, False
+
+    def release(self, reader, writer, reuse=True):
+        """Give a connection back to the pool, or close it"""
+        if reuse and not writer.is_closing():
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+        self._slots.release()
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+
+class AsyncEventAPI():
+    """Asyncio API class for event endpoint, with pooled keep-alive connections"""
+
+    def __init__(self, base_url="http://localhost:3000", pool_size=100, timeout=10.0):
+        self.endpoint = "/api/event"
+        self.base_url = base_url
+        self.timeout = timeout
+
+        parts = urlsplit(base_url)
+        use_ssl = parts.scheme == "https"
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if use_ssl else 80)
+        self._host_header = parts.netloc or self.host
+        self._prefix = parts.path.rstrip("/")
+        self.pool = _ConnectionPool(self.host, self.port, pool_size, use_ssl=use_ssl)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close all pooled connections"""
+        await self.pool.close()
+
+    @property
+    def connections_opened(self):
+        return self.pool.opened
+
+    async def send_event(self, event_type, video_time=0.0, user_id="user-123", timestamp=None):
+        """Send event to API"""
+        if timestamp is None:
+            timestamp = datetime.now().isoformat() + 'Z'
+
+        data = {
+            "userId": user_id,
+            "type": event_type,
+            "videoTime": video_time,
+            "timestamp": timestamp
+        }
+
+        response = await self.post(self.endpoint, data)
+        return response
+
+    async def send_custom_event(self, data):
+        """Send custom event data"""
+        response = await self.post(self.endpoint, data)
+        return response
+
+    async def send_many(self, events, concurrency=10):
+        """Send events with at most `concurrency` requests in flight.
+
+        Returns one EventResult per event, in input order.
+        """
+        events = list(events)
+        results = [None] * len(events)
+        pending = iter(enumerate(events))
+
+        async def worker():
+            for index, data in pending:
+                start = time.perf_counter()
+                try:
+                    response = await self.post(self.endpoint, data)
+                    results[index] = EventResult(index, response.status_code,
+                                                 time.perf_counter() - start, None)
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                    results[index] = EventResult(index, None, time.perf_counter() - start, e)
+
+        workers = max(1, min(concurrency, len(events)))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return results
+
+    async def post(self, endpoint, data=None, headers=None):
+        """Send POST request"""
+        body = json.dumps(data).encode("utf-8")
+        request_headers = {"Content-Type": "application/json"}
+        if headers:
+            request_headers.update(headers)
+        return await asyncio.wait_for(
+            self._request("POST", endpoint, body, request_headers), self.timeout
+        )
+
+    async def _request(self, method, endpoint, body, headers):
+        head = [f"{method} {self._prefix}{endpoint} HTTP/1.1",
+                f"Host: {self._host_header}",
+                f"Content-Length: {len(body)}",
+                "Connection: keep-alive"]
+        head.extend(f"{name}: {value}" for name, value in headers.items())
+        payload = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+        # A reused keep-alive connection may have been closed by the server
+        # while idle; retry once on a fresh connection in that case.
+        for attempt in range(2):
+            reader, writer, reused = await self.pool.acquire()
+            start = time.perf_counter()
+            try:
+                writer.write(payload)
+                await writer.drain()
+                status, response_headers, content, keep_alive = await _read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self.pool.release(reader, writer, reuse=False)
+                if reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                self.pool.release(reader, writer, reuse=False)
+                raise
+            self.pool.release(reader, writer, reuse=keep_alive)
+            return AsyncResponse(status, response_headers, content, time.perf_counter() - start)
+
+
+async def _read_response(reader):
+    """Read one HTTP/1.1 response; returns (status, headers, body, keep_alive)"""
+    status_line = await reader.readuntil(b"\r\n")
+    version, status, _ = (status_line.decode("latin-1").rstrip("\r\n") + "  ").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readuntil(b"\r\n")
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    keep_alive = headers.get("connection", "").lower() != "close" and version != "HTTP/1.0"
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        chunks = []
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        content = b"".join(chunks)
+    elif "content-length" in headers:
+        content = await reader.readexactly(int(headers["content-length"]))
+    else:
+        content = await reader.read()
+        keep_alive = False
+    return int(status), headers, content, keep_alive
@@ -0,0 +1,182 @@
+import atexit
+import threading
+import time
+import weakref
+from collections import deque
+from datetime import datetime
+
+import requests
+
+from api.event_api import EventAPI
+
+
+BACKPRESSURE_POLICIES = ("block", "drop_oldest", "raise")
+
+# Instances not closed yet; a single atexit hook flushes whatever is left
+_open_apis = weakref.WeakSet()
+
+
+class EventQueueFull(Exception):
+    """Raised when the send buffer is full and the policy does not allow waiting"""
+
+
+class BufferedEventAPI(EventAPI):
+    """EventAPI that queues events in memory and sends them from a background thread.
+
+    send_event/send_custom_event return immediately; a flusher thread drains the
+    queue in batches of `batch_size`, or every `flush_interval` seconds, whichever
+    comes first, and sends each batch as one bulk request to /api/events. When
+    the queue holds `max_queue` events, `backpressure` decides what happens to
+    the next one: "block" waits for room (up to `block_timeout`), "drop_oldest"
+    discards the oldest queued event, "raise" raises EventQueueFull.
+    """
+
+    def __init__(self, base_url="http://localhost:3000", max_queue=10000, batch_size=100,
+                 flush_interval=0.5, backpressure="block", block_timeout=None, transport=None):
+        super().__init__(base_url, transport=transport)
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"backpressure must be one of {BACKPRESSURE_POLICIES}, got {backpressure!r}")
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.backpressure = backpressure
+        self.block_timeout = block_timeout
+
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.last_error = None
+
+        self._queue = deque()
+        self._inflight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._lock = threading.Lock()
+        self._has_events = threading.Condition(self._lock)
+        self._has_room = threading.Condition(self._lock)
+        self._drained = threading.Condition(self._lock)
+
+        self._thread = threading.Thread(target=self._run, name="event-api-flusher", daemon=True)
+        self._thread.start()
+        _open_apis.add(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def send_event(self, event_type, video_time=0.0, user_id="user-123", timestamp=None):
+        """Queue event for sending"""
+        if timestamp is None:
+            timestamp = datetime.now().isoformat() + 'Z'
+
+        self._enqueue({
+            "userId": user_id,
+            "type": event_type,
+            "videoTime": video_time,
+            "timestamp": timestamp
+        })
+
+    def send_custom_event(self, data):
+        """Queue custom event data for sending"""
+        self._enqueue(data)
+
+    @property
+    def pending(self):
+        """Events queued or being sent"""
+        with self._lock:
+            return len(self._queue) + self._inflight
+
+    def flush(self, timeout=None):
+        """Send everything queued so far; returns False if `timeout` expired first"""
+        with self._lock:
+            self._flush_requested = True
+            self._has_events.notify()
+            return self._drained.wait_for(lambda: not self._queue and not self._inflight, timeout)
+
+    def close(self, timeout=None):
+        """Flush remaining events and stop the flusher thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._has_events.notify()
+            self._has_room.notify_all()
+        _open_apis.discard(self)
+        self._thread.join(timeout)
+
+    def _enqueue(self, data):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BufferedEventAPI is closed")
+            if len(self._queue) >= self.max_queue:
+                if self.backpressure == "raise":
+                    raise EventQueueFull(f"{len(self._queue)} events already queued")
+                if self.backpressure == "drop_oldest":
+                    self._queue.popleft()
+                    self.dropped += 1
+                elif not self._has_room.wait_for(
+                        lambda: len(self._queue) < self.max_queue or self._closed, self.block_timeout):
+                    raise EventQueueFull(f"no room after waiting {self.block_timeout}s")
+                elif self._closed:
+                    raise RuntimeError("BufferedEventAPI is closed")
+            self._queue.append(data)
+            if len(self._queue) >= self.batch_size:
+                self._has_events.notify()
+
+    def _next_batch(self):
+        """Block until a batch is due; returns [] once closed and drained"""
+        with self._lock:
+            deadline = time.monotonic() + self.flush_interval
+            while not (len(self._queue) >= self.batch_size or self._flush_requested or self._closed):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._has_events.wait(remaining)
+
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            self._inflight = len(batch)
+            if not self._queue:
+                self._flush_requested = False
+            self._has_room.notify_all()
+            return batch
+
+    def _send_batch(self, batch):
+        # One bulk request per batch; rejected lines count as failed.
+        try:
+            response = self.send_events(batch)
+        except requests.RequestException as e:
+            self.failed += len(batch)
+            self.last_error = e
+            return
+        if response.status_code >= 400:
+            self.failed += len(batch)
+            self.last_error = f"HTTP {response.status_code}: {response.text[:200]}"
+            return
+        try:
+            result = response.json()
+        except ValueError:
+            result = {"accepted": len(batch)}
+        self.sent += result.get("accepted", 0)
+        self.failed += len(batch) - result.get("accepted", 0)
+        if result.get("errors"):
+            self.last_error = f"rejected: {result['errors'][0]}"
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._send_batch(batch)
+            with self._lock:
+                self._inflight = 0
+                if not self._queue:
+                    self._drained.notify_all()
+                    if self._closed:
+                        return
+
+
+@atexit.register
+def _close_at_exit():
+    for api in list(_open_apis):
+        api.close()
@@ -1,15 +1,25 @@
 from datetime import datetime
-import requests
+import json
+
+from api.schema import EventValidationError, default_schema
+from api.transports import transport_for
 
 
 class EventAPI():
     """API class for event endpoint"""
 
-    def __init__(self,base_url="http://localhost:3000"):
+    def __init__(self,base_url="http://localhost:3000", validate=False, transport=None):
         super().__init__()
         self.endpoint = "/api/event"
+        self.bulk_endpoint = "/api/events"
         self.base_url = base_url
-        self.session = requests.Session()
+        # How requests reach the server (see api.transports); by default every
+        # EventAPI for an http(s) URL shares one pooled session.
+        self.transport = transport or transport_for(base_url)
+        self.session = self.transport.session
+        # Check events against api.schema before sending; invalid ones raise
+        # EventValidationError and are never sent.
+        self.validate = validate
 
     def send_event(self, event_type, video_time=0.0, user_id="user-123", timestamp=None):
         """Send event to API"""
@@ -23,14 +33,45 @@ class EventAPI():
             "timestamp": timestamp
         }
 
+        if self.validate:
+            default_schema().check(data)
         response = self.post(self.endpoint, data)
         return response
 
     def send_custom_event(self, data):
         """Send custom event data"""
+        if self.validate:
+            default_schema().check(data)
         response = self.post(self.endpoint, data)
         return response
 
+    def send_events(self, events, chunk_events=1000):
+        """Stream events to the bulk endpoint as NDJSON in one chunked request.
+
+        `events` can be any iterable (e.g. a generator reading a file); it is
+        consumed lazily, `chunk_events` lines per chunk, so the body is never
+        built in memory. The response lists accepted/rejected counts and the
+        1-based line of every rejected event. With `validate`, the first
+        invalid event raises EventValidationError and aborts the upload
+        (events before it may already be stored).
+        """
+        schema = default_schema() if self.validate else None
+
+        def body():
+            lines = []
+            for position, event in enumerate(events):
+                if schema is not None and not schema.is_valid(event):
+                    raise EventValidationError(schema.errors(event, position))
+                lines.append(json.dumps(event, separators=(",", ":")))
+                if len(lines) >= chunk_events:
+                    yield ("\n".join(lines) + "\n").encode()
+                    lines = []
+            if lines:
+                yield ("\n".join(lines) + "\n").encode()
+
+        url = f"{self.base_url}{self.bulk_endpoint}"
+        return self.session.post(url, data=body(), headers={"Content-Type": "application/x-ndjson"})
+
     def post(self, endpoint, data=None, **kwargs):
         """Send POST request"""
         url = f"{self.base_url}{endpoint}"
@@ -0,0 +1,529 @@
+"""In-process stand-in for server/server.js.
+
+Serves client/ statically and accepts POST /api/event and /api/events like the Node server,
+but keeps every event in a queryable in-memory EventStore.
+
+Usage:
+    python -m api.event_sink --port 3000 [--unix-socket /tmp/events.sock]
+"""
+import argparse
+import asyncio
+import json
+import math
+import mimetypes
+import os
+import threading
+import time
+import urllib.parse
+from array import array
+from datetime import datetime, timezone
+
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CLIENT_DIR = os.path.join(PROJECT_ROOT, "client")
+MAX_BODY = 1024 * 1024
+BULK_MAX_BODY = 64 * 1024 * 1024
+MAX_BULK_ERRORS = 1000
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 415: "Unsupported Media Type", 431: "Request Header Fields Too Large"}
+
+
+def parse_timestamp(value):
+    """ISO-8601 string -> epoch seconds, NaN when missing or malformed"""
+    if not isinstance(value, str):
+        return math.nan
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return math.nan
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def format_timestamp(epoch):
+    if math.isnan(epoch):
+        return None
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def trace_now():
+    """Epoch milliseconds, the unit of the latency trace marks"""
+    return time.time_ns() / 1e6
+
+
+def _with_trace(status, content_type, payload, received):
+    # Like server.js: requests with X-Event-Trace get their receive and
+    # respond marks in the JSON reply.
+    if received is None or status != 200 or content_type != "application/json":
+        return payload
+    reply = json.loads(payload)
+    reply["trace"] = {"receive": received, "respond": trace_now()}
+    return json.dumps(reply).encode()
+
+
+def _to_epoch(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp() if value.tzinfo else value.replace(tzinfo=timezone.utc).timestamp()
+    if isinstance(value, str):
+        return parse_timestamp(value)
+    return float(value)
+
+
+class EventStore():
+    """Columnar in-memory event store.
+
+    userId and type are interned into small integer codes; videoTime and the
+    parsed timestamp are kept as doubles. Per-user and per-type row indexes
+    make the common queries proportional to their result size.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._user_codes = {}
+            self._type_codes = {}
+            self._user_names = []
+            self._type_names = []
+            self._users = array("I")
+            self._types = array("I")
+            self._video_times = array("d")
+            self._timestamps = array("d")
+            self._rows_by_user = []
+            self._rows_by_type = []
+
+    def __len__(self):
+        return len(self._users)
+
+    def _code(self, codes, names, rows, value):
+        if not isinstance(value, str):
+            value = None if value is None else json.dumps(value)
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value)
+            rows.append(array("I"))
+        return code
+
+    def add(self, event):
+        """Store one event dict; returns its row number"""
+        if not isinstance(event, dict):
+            event = {}
+        video_time = event.get("videoTime")
+        if isinstance(video_time, bool) or not isinstance(video_time, (int, float)):
+            video_time = math.nan
+        with self._lock:
+            row = len(self._users)
+            user = self._code(self._user_codes, self._user_names, self._rows_by_user, event.get("userId"))
+            event_type = self._code(self._type_codes, self._type_names, self._rows_by_type, event.get("type"))
+            self._users.append(user)
+            self._types.append(event_type)
+            self._video_times.append(video_time)
+            self._timestamps.append(parse_timestamp(event.get("timestamp")))
+            self._rows_by_user[user].append(row)
+            self._rows_by_type[event_type].append(row)
+            return row
+
+    def users(self):
+        return list(self._user_names)
+
+    def types(self):
+        return list(self._type_names)
+
+    def _rows(self, user_id, event_type):
+        with self._lock:
+            candidates = []
+            if user_id is not None:
+                code = self._user_codes.get(user_id)
+                candidates.append(self._rows_by_user[code] if code is not None else array("I"))
+            if event_type is not None:
+                code = self._type_codes.get(event_type)
+                candidates.append(self._rows_by_type[code] if code is not None else array("I"))
+            if not candidates:
+                return range(len(self._users))
+            rows = min(candidates, key=len)
+            if len(candidates) == 2:
+                other = set(max(candidates, key=len))
+                return [row for row in rows if row in other]
+            return list(rows)
+
+    def _select(self, user_id, event_type, start, end):
+        rows = self._rows(user_id, event_type)
+        start, end = _to_epoch(start), _to_epoch(end)
+        if start is None and end is None:
+            return rows
+        timestamps = self._timestamps
+        return [row for row in rows
+                if (start is None or timestamps[row] >= start) and (end is None or timestamps[row] <= end)]
+
+    def count(self, user_id=None, event_type=None, start=None, end=None):
+        """Number of events matching the filters"""
+        return len(self._select(user_id, event_type, start, end))
+
+    def query(self, user_id=None, event_type=None, start=None, end=None):
+        """Events matching the filters, oldest first; start/end are inclusive"""
+        rows = self._select(user_id, event_type, start, end)
+        return [self._event(row) for row in rows]
+
+    def _event(self, row):
+        video_time = self._video_times[row]
+        return {
+            "userId": self._user_names[self._users[row]],
+            "type": self._type_names[self._types[row]],
+            "videoTime": None if math.isnan(video_time) else video_time,
+            "timestamp": format_timestamp(self._timestamps[row]),
+        }
+
+
+class EventSinkServer():
+    """Asyncio HTTP/1.1 server for /api/event running on a background thread.
+
+    With `unix_path` it listens on that Unix-domain socket instead of TCP.
+    `handle()` answers a request without any socket (see
+    api.transports.InProcessTransport).
+    Requests with an X-Event-Trace header get latency trace marks in the
+    reply, like server.js (see pages.latency_trace).
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, client_dir=CLIENT_DIR, store=None, unix_path=None):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.client_dir = client_dir
+        self.store = store if store is not None else EventStore()
+        self.requests = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._startup_error = None
+        self._connections = set()
+        self._static_cache = {}
+
+    @property
+    def url(self):
+        if self.unix_path:
+            return f"http+unix://{urllib.parse.quote(self.unix_path, safe='')}"
+        return f"http://{self.host}:{self.port}"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self, timeout=5):
+        """Start serving on a background thread; returns self once listening"""
+        self._thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError("event sink did not start")
+        if self._startup_error is not None:
+            raise self._startup_error
+        return self
+
+    def stop(self, timeout=5):
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._server = self._loop.run_until_complete(self._listen())
+        except OSError as e:
+            self._startup_error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            self._loop.run_until_complete(asyncio.sleep(0))
+            self._loop.close()
+            if self.unix_path and os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+
+    async def _listen(self):
+        if self.unix_path:
+            return await asyncio.start_unix_server(self._handle, self.unix_path, backlog=1024)
+        server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+
+    async def serve_forever(self):
+        """Serve on the current event loop (used by the CLI)"""
+        server = await self._listen()
+        async with server:
+            await server.serve_forever()
+
+    def handle(self, method, target, headers, body):
+        """Answer one request in the calling thread: (status, content_type, payload)"""
+        path = target.split("?", 1)[0]
+        headers = {name.lower(): value for name, value in headers.items()}
+        received = trace_now() if "x-event-trace" in headers else None
+        if len(body) > (BULK_MAX_BODY if path == "/api/events" else MAX_BODY):
+            return 413, "application/json", b'{"ok":false}'
+        self.requests += 1
+        if method == "POST" and path == "/api/events" and "ndjson" in headers.get("content-type", ""):
+            ingest = NdjsonIngest(self.store)
+            ingest.feed(body)
+            status, content_type, payload = 200, "application/json", ingest.finish().to_json()
+        else:
+            status, content_type, payload = self._dispatch(method, path, headers, body)
+        return status, content_type, _with_trace(status, content_type, payload, received)
+
+    async def _handle(self, reader, writer):
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    writer.write(_response(431, b"", keep_alive=False))
+                    break
+
+                request_line, _, header_block = head[:-4].decode("latin-1").partition("\r\n")
+                try:
+                    method, target, version = request_line.split(" ", 2)
+                except ValueError:
+                    writer.write(_response(400, b"", keep_alive=False))
+                    break
+                headers = {}
+                for line in header_block.split("\r\n"):
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                received = trace_now() if "x-event-trace" in headers else None
+
+                path = target.split("?", 1)[0]
+                limit = BULK_MAX_BODY if path == "/api/events" else MAX_BODY
+                try:
+                    if method == "POST" and path == "/api/events" and "ndjson" in headers.get("content-type", ""):
+                        status, content_type, payload = await self._ingest_ndjson(_iter_body(reader, headers, limit))
+                    else:
+                        body = await _read_body(reader, headers, limit)
+                        status, content_type, payload = self._dispatch(method, path, headers, body)
+                except BodyTooLarge:
+                    writer.write(_response(413, b"", keep_alive=False))
+                    break
+                except (ValueError, asyncio.LimitOverrunError):
+                    # Malformed chunk size or content-length
+                    writer.write(_response(400, b"", keep_alive=False))
+                    break
+                except asyncio.IncompleteReadError:
+                    # The client gave up mid-body (e.g. an aborted NDJSON stream)
+                    break
+
+                self.requests += 1
+                payload = _with_trace(status, content_type, payload, received)
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() != "HTTP/1.0")
+                writer.write(_response(status, payload, content_type, keep_alive, send_body=method != "HEAD"))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    def _dispatch(self, method, path, headers, body):
+        if path == "/api/event":
+            if method != "POST":
+                return 405, "application/json", b'{"ok":false}'
+            return self._ingest(headers, body)
+        if path == "/api/events":
+            if method != "POST":
+                return 405, "application/json", b'{"ok":false}'
+            return self._ingest_batch(headers, body)
+        if method in ("GET", "HEAD"):
+            return self._static(path)
+        return 404, "text/plain", b"Not Found"
+
+    def _ingest(self, headers, body):
+        # Like bodyParser.json(): only JSON bodies are parsed, anything else
+        # is acknowledged without an event.
+        if "json" not in headers.get("content-type", ""):
+            return 200, "application/json", b'{"ok":true}'
+        try:
+            event = json.loads(body) if body else {}
+        except ValueError as e:
+            return 400, "application/json", json.dumps({"ok": False, "error": str(e)}).encode()
+        self.store.add(event)
+        return 200, "application/json", b'{"ok":true}'
+
+    def _ingest_batch(self, headers, body):
+        # Bulk events as a JSON array, sent as application/json or, from
+        # navigator.sendBeacon, as text/plain. NDJSON bodies are streamed
+        # through _ingest_ndjson instead.
+        content_type = headers.get("content-type", "")
+        if "json" not in content_type and "text/plain" not in content_type:
+            return 415, "application/json", b'{"ok":false,"error":"expected a JSON array or NDJSON"}'
+        try:
+            events = json.loads(body) if body else None
+        except ValueError as e:
+            return 400, "application/json", json.dumps({"ok": False, "error": str(e)}).encode()
+        if not isinstance(events, list):
+            return 400, "application/json", b'{"ok":false,"error":"expected a JSON array"}'
+        result = BulkResult()
+        for line, event in enumerate(events, 1):
+            result.add(self.store, line, event)
+        return 200, "application/json", result.to_json()
+
+    async def _ingest_ndjson(self, pieces):
+        """One event per line, stored as lines arrive"""
+        ingest = NdjsonIngest(self.store)
+        async for piece in pieces:
+            ingest.feed(piece)
+        return 200, "application/json", ingest.finish().to_json()
+
+    def _static(self, path):
+        if path.endswith("/"):
+            path += "index.html"
+        cached = self._static_cache.get(path)
+        if cached is None:
+            full_path = os.path.realpath(os.path.join(self.client_dir, path.lstrip("/")))
+            if not full_path.startswith(os.path.realpath(self.client_dir) + os.sep) or not os.path.isfile(full_path):
+                return 404, "text/plain", b"Not Found"
+            with open(full_path, "rb") as f:
+                content = f.read()
+            content_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+            cached = self._static_cache[path] = (200, content_type, content)
+        return cached
+
+
+class BodyTooLarge(ValueError):
+    pass
+
+
+async def _iter_body(reader, headers, limit=None):
+    """Yield the request body piece by piece as it arrives (chunked or content-length)"""
+    total = 0
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return
+            total += size
+            if limit and total > limit:
+                raise BodyTooLarge("body too large")
+            yield await reader.readexactly(size)
+            await reader.readexactly(2)
+    length = int(headers.get("content-length") or 0)
+    if limit and length > limit:
+        raise BodyTooLarge("body too large")
+    while total < length:
+        piece = await reader.readexactly(min(length - total, 64 * 1024))
+        total += len(piece)
+        yield piece
+
+
+async def _read_body(reader, headers, limit=MAX_BODY):
+    return b"".join([piece async for piece in _iter_body(reader, headers, limit)])
+
+
+class BulkResult():
+    """Per-line outcome of a bulk request; only rejections are listed"""
+
+    def __init__(self):
+        self.received = 0
+        self.accepted = 0
+        self.errors = []
+        self.rejected = 0
+
+    def add(self, store, line, event):
+        self.received += 1
+        if not isinstance(event, dict):
+            self._error(line, "expected a JSON object")
+            return
+        store.add(event)
+        self.accepted += 1
+
+    def reject(self, line, error):
+        self.received += 1
+        self._error(line, error)
+
+    def _error(self, line, error):
+        self.rejected += 1
+        if len(self.errors) < MAX_BULK_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+    def to_json(self):
+        return json.dumps({"ok": self.rejected == 0, "received": self.received, "accepted": self.accepted,
+                           "rejected": self.rejected, "errors": self.errors}).encode()
+
+
+class NdjsonIngest():
+    """Stores NDJSON events as pieces of the body arrive; blank lines are skipped but counted"""
+
+    def __init__(self, store):
+        self.store = store
+        self.result = BulkResult()
+        self.line = 0
+        self.pending = b""
+
+    def feed(self, piece):
+        lines = (self.pending + piece).split(b"\n")
+        self.pending = lines.pop()
+        for raw in lines:
+            self._ingest(raw)
+
+    def finish(self):
+        if self.pending:
+            self._ingest(self.pending)
+            self.pending = b""
+        return self.result
+
+    def _ingest(self, raw):
+        self.line += 1
+        if not raw.strip():
+            return
+        try:
+            event = json.loads(raw)
+        except ValueError as e:
+            self.result.reject(self.line, str(e))
+            return
+        self.result.add(self.store, self.line, event)
+
+
+def _response(status, payload, content_type="application/json", keep_alive=True, send_body=True):
+    """Status line, headers and payload; HEAD replies (send_body=False) keep only the Content-Length"""
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + (payload if send_body else b"")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m api.event_sink", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "3000")))
+    parser.add_argument("--unix-socket", default=os.getenv("SOCKET_PATH"), help="listen on this Unix socket instead")
+    args = parser.parse_args(argv)
+
+    sink = EventSinkServer(args.host, args.port, unix_path=args.unix_socket)
+    print(f"📺 Event sink is running at {args.unix_socket or f'http://{args.host}:{args.port}'}")
+    try:
+        asyncio.run(sink.serve_forever())
+    except KeyboardInterrupt:
+        print(f"Received {len(sink.store)} events")
+
+
+if __name__ == "__main__":
+    main()
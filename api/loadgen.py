@@ -0,0 +1,265 @@
+"""Load generator and latency benchmark for the /api/event endpoint.
+
+Usage:
+    python -m api.loadgen --rate 500 --duration 10
+    python -m api.loadgen --concurrency 50 --duration 10 --json loadgen.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+from api.async_event_api import AsyncEventAPI
+
+
+EVENT_TYPES = ("play", "pause", "seeked", "scroll")
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+class LatencyHistogram():
+    """HDR-style log-linear histogram of latencies in microseconds.
+
+    Values are recorded with `significant_digits` of precision between
+    1us and `highest` us; larger values are clamped to `highest`.
+    """
+
+    def __init__(self, highest=60_000_000, significant_digits=3):
+        largest_single_unit = 2 * 10 ** significant_digits
+        self._sub_bits = max(1, (largest_single_unit - 1).bit_length())
+        self._sub_count = 1 << self._sub_bits
+        self._half = self._sub_count // 2
+        self.highest = highest
+        self.counts = [0] * (self._index(highest) + 1)
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self._sum = 0
+
+    def _index(self, value):
+        if value < self._sub_count:
+            return value
+        shift = value.bit_length() - self._sub_bits
+        return self._sub_count + (shift - 1) * self._half + (value >> shift) - self._half
+
+    def _highest_equivalent(self, index):
+        if index < self._sub_count:
+            return index
+        offset = index - self._sub_count
+        shift = offset // self._half + 1
+        top = offset % self._half + self._half
+        return ((top + 1) << shift) - 1
+
+    def record(self, seconds):
+        """Record one latency given in seconds"""
+        self.record_value(int(seconds * 1_000_000))
+
+    def record_value(self, value, count=1):
+        """Record a latency given in microseconds"""
+        value = min(max(int(value), 0), self.highest)
+        self.counts[self._index(value)] += count
+        self.total += count
+        self._sum += value * count
+        self.max = max(self.max, value)
+        self.min = value if self.min is None else min(self.min, value)
+
+    def merge(self, other):
+        """Add all counts from another histogram with the same layout"""
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total += other.total
+        self._sum += other._sum
+        self.max = max(self.max, other.max)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+
+    def value_at_percentile(self, percentile):
+        """Return the latency (us) at or below which `percentile` % of values fall"""
+        if not self.total:
+            return 0
+        target = max(1, int(round(percentile / 100.0 * self.total + 0.4999999)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self._sum / self.total if self.total else 0.0
+
+    def summary(self, percentiles=PERCENTILES):
+        """Return count/min/mean/max and percentiles, in milliseconds"""
+        result = {
+            "count": self.total,
+            "min_ms": (self.min or 0) / 1000.0,
+            "mean_ms": self.mean / 1000.0,
+            "max_ms": self.max / 1000.0,
+        }
+        for p in percentiles:
+            result[f"p{p:g}_ms"] = self.value_at_percentile(p) / 1000.0
+        return result
+
+
+def make_event(rng, users):
+    """Build a random viewer event"""
+    return {
+        "userId": f"user-{rng.randrange(users)}",
+        "type": rng.choice(EVENT_TYPES),
+        "videoTime": round(rng.uniform(0, 600), 3),
+        "timestamp": datetime.now().isoformat() + 'Z'
+    }
+
+
+class LoadGenerator():
+    """Drive /api/event at an open-loop rate or at a fixed concurrency"""
+
+    def __init__(self, base_url="http://localhost:3000", users=100, seed=None,
+                 max_inflight=1000, timeout=10.0):
+        self.base_url = base_url
+        self.users = users
+        self.max_inflight = max_inflight
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.histogram = LatencyHistogram()
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.dropped = 0
+
+    def _record(self, latency, response=None, error=None):
+        self.histogram.record(latency)
+        if error is not None:
+            self.errors[type(error).__name__] += 1
+        else:
+            self.statuses[response.status_code] += 1
+            if response.status_code >= 400:
+                self.errors[f"HTTP {response.status_code}"] += 1
+
+    async def _send(self, api, intended_start):
+        # Latency is measured from the intended start so that a slow server
+        # cannot hide queueing delay (no coordinated omission).
+        try:
+            response = await api.send_custom_event(make_event(self.rng, self.users))
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            self._record(time.perf_counter() - intended_start, error=e)
+        else:
+            self._record(time.perf_counter() - intended_start, response=response)
+
+    async def run_rate(self, rate, duration):
+        """Open loop: start `rate` requests per second regardless of completions"""
+        pool_size = min(self.max_inflight, max(1, int(rate)))
+        async with AsyncEventAPI(self.base_url, pool_size=pool_size, timeout=self.timeout) as api:
+            inflight = set()
+            start = time.perf_counter()
+            interval = 1.0 / rate
+            total = int(rate * duration)
+            for i in range(total):
+                intended = start + i * interval
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if len(inflight) >= self.max_inflight:
+                    self.dropped += 1
+                    continue
+                task = asyncio.ensure_future(self._send(api, intended))
+                inflight.add(task)
+                task.add_done_callback(inflight.discard)
+            if inflight:
+                await asyncio.gather(*inflight)
+            return time.perf_counter() - start
+
+    async def run_concurrency(self, concurrency, duration):
+        """Closed loop: `concurrency` workers each send back to back"""
+        async with AsyncEventAPI(self.base_url, pool_size=concurrency, timeout=self.timeout) as api:
+            start = time.perf_counter()
+            deadline = start + duration
+
+            async def worker():
+                while time.perf_counter() < deadline:
+                    await self._send(api, time.perf_counter())
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            return time.perf_counter() - start
+
+    def run(self, duration, rate=None, concurrency=None):
+        """Run one benchmark and return the report dict"""
+        if rate:
+            elapsed = asyncio.run(self.run_rate(rate, duration))
+            mode = {"mode": "rate", "target_rate": rate}
+        else:
+            elapsed = asyncio.run(self.run_concurrency(concurrency or 1, duration))
+            mode = {"mode": "concurrency", "concurrency": concurrency or 1}
+        return self.report(elapsed, mode)
+
+    def report(self, elapsed, mode):
+        requests = self.histogram.total
+        return {
+            **mode,
+            "base_url": self.base_url,
+            "duration_s": round(elapsed, 3),
+            "requests": requests,
+            "throughput_rps": round(requests / elapsed, 1) if elapsed else 0.0,
+            "errors": sum(self.errors.values()),
+            "error_breakdown": dict(self.errors),
+            "status_codes": {str(k): v for k, v in sorted(self.statuses.items())},
+            "dropped": self.dropped,
+            "latency": self.histogram.summary(),
+        }
+
+
+def format_summary(report):
+    """Render a report as a short text summary"""
+    latency = report["latency"]
+    target = (f"target {report['target_rate']} req/s" if report["mode"] == "rate"
+              else f"concurrency {report['concurrency']}")
+    lines = [
+        f"Load test against {report['base_url']} ({target})",
+        f"  requests:   {report['requests']} in {report['duration_s']:.2f}s "
+        f"({report['throughput_rps']:.1f} req/s)",
+        f"  errors:     {report['errors']} {report['error_breakdown'] or ''}".rstrip(),
+        f"  dropped:    {report['dropped']}",
+        "  latency ms: " + "  ".join(
+            f"{key[:-3]}={latency[key]:.2f}"
+            for key in ("min_ms", "p50_ms", "p90_ms", "p99_ms", "p99.9_ms", "max_ms")
+        ),
+    ]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m api.loadgen", description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:3000")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--rate", type=float, help="open-loop target requests per second")
+    mode.add_argument("--concurrency", type=int, default=10, help="closed-loop concurrent senders")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--users", type=int, default=100, help="distinct userId values")
+    parser.add_argument("--max-inflight", type=int, default=1000,
+                        help="open-loop cap on outstanding requests")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", dest="json_path", help="write the JSON report to this file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    generator = LoadGenerator(args.base_url, users=args.users, seed=args.seed,
+                              max_inflight=args.max_inflight, timeout=args.timeout)
+    report = generator.run(args.duration, rate=args.rate, concurrency=args.concurrency)
+
+    if args.json_path == "-":
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        if args.json_path:
+            with open(args.json_path, "w") as f:
+                json.dump(report, f, indent=2)
+        print(format_summary(report))
+    return 0 if report["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""Replay recorded event streams against a server, keeping their timing.
+
+Reads captured events (a JSON array such as a `get_events` dump, JSON
+lines, or the Node server's "Event received" log output), schedules them
+by their original timestamps, optionally fans one session out to many
+synthetic users, and sends them through AsyncEventAPI at 1x, scaled, or
+maximum speed. The report compares when each event was sent with when it
+should have been (drift) and includes server latency.
+
+Usage:
+    python -m api.replay capture.json --speed 10
+    python -m api.replay server.log --users 50 --stagger 0.5 --speed max
+"""
+import argparse
+import asyncio
+import json
+import math
+import re
+import sys
+import time
+from collections import Counter
+
+from api.async_event_api import AsyncEventAPI
+from api.event_sink import format_timestamp, parse_timestamp
+from api.loadgen import LatencyHistogram
+
+
+NODE_LOG_MARKER = "Event received:"
+DEFAULT_USER_TEMPLATE = "{userId}-r{n}"
+
+# util.inspect output: quoted strings, identifiers, anything else.
+_JS_TOKEN = re.compile(r"""'(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*"|`(?:\\.|[^`\\])*`|[A-Za-z_$][\w$]*|\s+|.""", re.S)
+_JS_ESCAPE = re.compile(r"\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.)", re.S)
+_JS_SIMPLE_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+_JS_NULLS = {"undefined", "NaN", "Infinity"}
+
+
+def _unescape_js(body):
+    def replace(match):
+        escape = match.group(1)
+        if escape.startswith("u{"):
+            return chr(int(escape[2:-1], 16))
+        if escape[0] in "ux" and len(escape) > 1:
+            return chr(int(escape[1:], 16))
+        return _JS_SIMPLE_ESCAPES.get(escape, escape)
+    return _JS_ESCAPE.sub(replace, body)
+
+
+def parse_js_literal(text):
+    """Parse a Node `util.inspect` object literal (as console.log prints it)"""
+    tokens = [t for t in _JS_TOKEN.findall(text)]
+    out = []
+    for i, token in enumerate(tokens):
+        first = token[0]
+        if first in "'\"`":
+            out.append(json.dumps(_unescape_js(token[1:-1])))
+        elif first.isalpha() or first in "_$":
+            following = next((t for t in tokens[i + 1:] if not t.isspace()), "")
+            if following == ":":
+                out.append(json.dumps(token))
+            elif token in _JS_NULLS:
+                out.append("null")
+            else:
+                out.append(token)
+        else:
+            out.append(token)
+    return json.loads("".join(out))
+
+
+def _depth(text):
+    """Open braces/brackets left in `text`, ignoring quoted strings"""
+    depth = 0
+    for token in _JS_TOKEN.findall(text):
+        if token in "{[":
+            depth += 1
+        elif token in "}]":
+            depth -= 1
+    return depth
+
+
+def _unwrap(record):
+    """Accept bare events and records that wrap one ({"body": ...} / {"event": ...})"""
+    if isinstance(record, dict):
+        for key in ("body", "event", "data"):
+            if isinstance(record.get(key), dict) and "type" not in record:
+                return record[key]
+    return record
+
+
+def load_events(path):
+    """Events from a JSON dump, JSON-lines file or Node server log, in file order"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith(("[", "{")):
+        try:
+            data = json.loads(stripped)
+        except ValueError:
+            pass
+        else:
+            if isinstance(data, dict):
+                data = data.get("events") or data.get("capturedEvents") or [data]
+            return [_unwrap(e) for e in data if isinstance(_unwrap(e), dict)]
+
+    events = []
+    pending = None
+    for line in text.splitlines():
+        if pending is not None:
+            pending.append(line)
+            literal = "\n".join(pending)
+            if _depth(literal) <= 0:
+                events.append(parse_js_literal(literal))
+                pending = None
+            continue
+        if NODE_LOG_MARKER in line:
+            literal = line.split(NODE_LOG_MARKER, 1)[1]
+            if _depth(literal) > 0:
+                pending = [literal]
+            elif literal.strip():
+                events.append(parse_js_literal(literal))
+            continue
+        line = line.strip()
+        if line.startswith("{"):
+            try:
+                record = _unwrap(json.loads(line))
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                events.append(record)
+    return events
+
+
+def build_schedule(events, users=1, stagger=0.0, user_template=None):
+    """[(offset_seconds, event)] sorted by offset.
+
+    Offsets come from each event's timestamp relative to the earliest one;
+    events without a usable timestamp keep the offset of the event before
+    them. With `users` > 1 the session is copied once per synthetic user,
+    each copy shifted by `stagger` seconds and its userId rewritten with
+    `user_template` (fields: userId, n).
+    """
+    base = []
+    previous = None
+    for event in events:
+        ts = parse_timestamp(event.get("timestamp"))
+        if math.isnan(ts):
+            ts = previous
+        previous = ts
+        base.append((ts, event))
+    known = [ts for ts, _ in base if ts is not None]
+    start = min(known) if known else 0.0
+    session = [((ts - start) if ts is not None else 0.0, event) for ts, event in base]
+
+    if users <= 1 and user_template is None:
+        return sorted(session, key=lambda item: item[0])
+    template = user_template or DEFAULT_USER_TEMPLATE
+    schedule = []
+    for n in range(users):
+        for offset, event in session:
+            user = template.format(userId=event.get("userId", "user"), n=n)
+            schedule.append((offset + n * stagger, {**event, "userId": user}))
+    schedule.sort(key=lambda item: item[0])
+    return schedule
+
+
+class Replayer():
+    """Send a schedule open-loop: each event starts at its (scaled) offset.
+
+    `speed` divides every offset (10 = ten times faster); None or inf sends
+    as fast as `max_inflight` allows. With `retime` each event's timestamp
+    is rewritten to its actual send time.
+    """
+
+    def __init__(self, base_url="http://localhost:3000", speed=1.0, max_inflight=1000, timeout=10.0, retime=True):
+        self.base_url = base_url
+        self.speed = None if speed is None or math.isinf(speed) else float(speed)
+        self.max_inflight = max_inflight
+        self.timeout = timeout
+        self.retime = retime
+        self.drift = LatencyHistogram()
+        self.latency = LatencyHistogram()
+        self.statuses = Counter()
+        self.errors = Counter()
+
+    async def _send(self, api, event, started):
+        try:
+            response = await api.send_custom_event(event)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            self.errors[type(e).__name__] += 1
+        else:
+            self.statuses[response.status_code] += 1
+            if response.status_code >= 400:
+                self.errors[f"HTTP {response.status_code}"] += 1
+        self.latency.record(time.perf_counter() - started)
+
+    async def replay(self, schedule):
+        """Send every event; returns (elapsed, target duration) in seconds"""
+        pool_size = min(self.max_inflight, max(1, len(schedule)))
+        async with AsyncEventAPI(self.base_url, pool_size=pool_size, timeout=self.timeout) as api:
+            inflight = set()
+            gate = asyncio.Semaphore(self.max_inflight)
+            start = time.perf_counter()
+            wall_start = time.time()
+            for offset, event in schedule:
+                target = start + offset / self.speed if self.speed else time.perf_counter()
+                delay = target - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await gate.acquire()
+                now = time.perf_counter()
+                self.drift.record(max(0.0, now - target))
+                if self.retime:
+                    event = {**event, "timestamp": format_timestamp(wall_start + (now - start))}
+                task = asyncio.ensure_future(self._send(api, event, now))
+                inflight.add(task)
+                task.add_done_callback(inflight.discard)
+                task.add_done_callback(lambda _: gate.release())
+            sent_until = time.perf_counter() - start
+            if inflight:
+                await asyncio.gather(*inflight)
+        target_duration = (schedule[-1][0] / self.speed) if schedule and self.speed else 0.0
+        return sent_until, target_duration
+
+    def run(self, schedule):
+        """Replay and return the report dict"""
+        started = time.perf_counter()
+        sent_until, target_duration = asyncio.run(self.replay(schedule))
+        return self.report(schedule, sent_until, target_duration, time.perf_counter() - started)
+
+    def report(self, schedule, sent_until, target_duration, elapsed):
+        events = self.latency.total
+        return {
+            "base_url": self.base_url,
+            "speed": self.speed or "max",
+            "events": events,
+            "users": len({e.get("userId") for _, e in schedule}),
+            "target_duration_s": round(target_duration, 3),
+            "send_duration_s": round(sent_until, 3),
+            "duration_s": round(elapsed, 3),
+            "throughput_eps": round(events / elapsed, 1) if elapsed else 0.0,
+            "errors": sum(self.errors.values()),
+            "error_breakdown": dict(self.errors),
+            "status_codes": {str(k): v for k, v in sorted(self.statuses.items())},
+            "drift": self.drift.summary(),
+            "latency": self.latency.summary(),
+        }
+
+
+def format_summary(report):
+    drift, latency = report["drift"], report["latency"]
+    speed = "max speed" if report["speed"] == "max" else f"{report['speed']:g}x"
+    keys = ("p50_ms", "p90_ms", "p99_ms", "max_ms")
+    return "\n".join([
+        f"Replay against {report['base_url']} at {speed}: {report['events']} events, {report['users']} users",
+        f"  timing:     sent over {report['send_duration_s']:.2f}s (target {report['target_duration_s']:.2f}s), "
+        f"{report['throughput_eps']:.1f} events/s",
+        "  drift ms:   " + "  ".join(f"{k[:-3]}={drift[k]:.2f}" for k in keys),
+        "  latency ms: " + "  ".join(f"{k[:-3]}={latency[k]:.2f}" for k in keys),
+        f"  errors:     {report['errors']} {report['error_breakdown'] or ''}".rstrip(),
+    ])
+
+
+def _speed(value):
+    return math.inf if value.lower() in ("max", "inf", "0") else float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m api.replay", description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="JSON dumps, JSON-lines files or Node server logs")
+    parser.add_argument("--base-url", default="http://localhost:3000")
+    parser.add_argument("--speed", type=_speed, default=1.0, help="time scale (10 = 10x faster) or 'max'")
+    parser.add_argument("--users", type=int, default=1, help="replay the recording once per synthetic user")
+    parser.add_argument("--stagger", type=float, default=0.0, help="seconds between synthetic users' sessions")
+    parser.add_argument("--user-template", default=None, help=f"userId rewrite (default {DEFAULT_USER_TEMPLATE!r})")
+    parser.add_argument("--keep-timestamps", action="store_true", help="send the recorded timestamps unchanged")
+    parser.add_argument("--max-inflight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--json", dest="json_path", help="write the JSON report to this file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    events = [event for path in args.paths for event in load_events(path)]
+    if not events:
+        parser.error("no events found in the input")
+    schedule = build_schedule(events, args.users, args.stagger, args.user_template)
+    replayer = Replayer(args.base_url, speed=args.speed, max_inflight=args.max_inflight,
+                        timeout=args.timeout, retime=not args.keep_timestamps)
+    report = replayer.run(schedule)
+
+    if args.json_path == "-":
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        if args.json_path:
+            with open(args.json_path, "w") as f:
+                json.dump(report, f, indent=2)
+        print(format_summary(report))
+    return 0 if report["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
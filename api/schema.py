@@ -0,0 +1,248 @@
+"""Event contract and a compiled validator for it.
+
+The schema below is turned into straight-line Python source once (see
+`CompiledSchema.source`) and compiled into two functions: `is_valid`, a
+fast path that stops at the first problem, and `errors`, which lists every
+problem of one event. Batch helpers run the fast path over every event and
+the detailed one only over the failures.
+
+Usage:
+    python -m api.schema capture.jsonl [--max-errors 20]
+"""
+import argparse
+import json
+import math
+import mmap
+import os
+import sys
+from collections import namedtuple
+from datetime import datetime
+
+
+EVENT_TYPES = ("play", "pause", "seeked", "scroll")
+JSONL_BLOCK = 4096
+
+EVENT_SCHEMA = {
+    "userId": {"type": "string", "min_length": 1},
+    "type": {"type": "string", "enum": EVENT_TYPES},
+    "videoTime": {"type": "number", "minimum": 0},
+    "timestamp": {"type": "timestamp"},
+}
+
+# One problem: `position` is the array index, the 1-based JSONL line, or
+# None for a single event; `field` is None for problems with the whole event.
+SchemaError = namedtuple("SchemaError", ["position", "field", "message"])
+
+
+class EventValidationError(ValueError):
+    """Raised by EventAPI(validate=True) for events that break the contract"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        detail = "; ".join(f"{e.field or 'event'} {e.message}" + (f" (at {e.position})" if e.position is not None else "")
+                           for e in self.errors[:5])
+        more = f" (+{len(self.errors) - 5} more)" if len(self.errors) > 5 else ""
+        super().__init__(f"invalid event: {detail}{more}")
+
+
+def _valid_timestamp(value, parse=datetime.fromisoformat):
+    """Extended ISO-8601 date and time ("2025-07-21T19:30:45.123Z"), calendar-checked"""
+    if len(value) < 16 or value[4] != "-" or value[7] != "-" or value[10] != "T" or value[13] != ":":
+        return False
+    try:
+        parse(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _field_checks(name, spec, fail):
+    """Source lines checking one field held in `v`; `fail(message)` renders a failure"""
+    kind = spec["type"]
+    lines = [
+        f"v = event.get({name!r}, _MISSING)",
+        "if v is _MISSING:",
+        f"    {fail(name, 'is required')}",
+        "elif v is None:",
+        f"    {fail(name, 'must not be null')}",
+    ]
+    if kind == "string" or kind == "timestamp":
+        lines += ["elif type(v) is not str:", f"    {fail(name, 'must be a string')}"]
+    elif kind == "number":
+        lines += ["elif type(v) is not int and type(v) is not float:", f"    {fail(name, 'must be a number')}",
+                  "elif not _isfinite(v):", f"    {fail(name, 'must be finite')}"]
+    else:
+        raise ValueError(f"unknown type {kind!r} for {name}")
+    if "min_length" in spec:
+        lines += [f"elif len(v) < {spec['min_length']!r}:",
+                  f"    {fail(name, 'must have at least %d character(s)' % spec['min_length'])}"]
+    if "enum" in spec:
+        lines += [f"elif v not in _enum_{name}:",
+                  f"    {fail(name, 'must be one of ' + ', '.join(sorted(spec['enum'])))}"]
+    if "minimum" in spec:
+        lines += [f"elif v < {spec['minimum']!r}:", f"    {fail(name, 'must be >= %r' % spec['minimum'])}"]
+    if kind == "timestamp":
+        lines += ["elif not _valid_timestamp(v):", f"    {fail(name, 'must be an ISO-8601 timestamp')}"]
+    return lines
+
+
+def _function_source(schema, allow_extra, fast):
+    if fast:
+        fail = lambda field, message: "return False"
+        head = ["def is_valid(event):", "    if type(event) is not dict:", "        return False"]
+        tail = ["    return True"]
+    else:
+        fail = lambda field, message: f"errors.append(({field!r}, {message!r}))"
+        head = ["def errors(event):", "    if type(event) is not dict:",
+                "        return [(None, 'must be a JSON object')]", "    errors = []"]
+        tail = ["    return errors"]
+    body = []
+    for name, spec in schema.items():
+        body += _field_checks(name, spec, fail)
+    if not allow_extra:
+        body += ["for k in event:", "    if k not in _fields:"]
+        body += ["        return False"] if fast else ["        errors.append((k, 'is not allowed'))"]
+    return "\n".join(head + ["    " + line for line in body] + tail)
+
+
+class CompiledSchema():
+    """A schema compiled into `is_valid(event)` and `errors(event)`"""
+
+    def __init__(self, schema=None, allow_extra=True):
+        self.schema = schema or EVENT_SCHEMA
+        self.allow_extra = allow_extra
+        self.source = (_function_source(self.schema, allow_extra, fast=True) + "\n\n\n"
+                       + _function_source(self.schema, allow_extra, fast=False) + "\n")
+        namespace = {"_MISSING": object(), "_isfinite": math.isfinite, "_valid_timestamp": _valid_timestamp,
+                     "_fields": frozenset(self.schema)}
+        for name, spec in self.schema.items():
+            if "enum" in spec:
+                namespace[f"_enum_{name}"] = frozenset(spec["enum"])
+        exec(compile(self.source, "<api.schema>", "exec"), namespace)
+        self.is_valid = namespace["is_valid"]
+        self._errors = namespace["errors"]
+
+    def errors(self, event, position=None):
+        """Every problem with one event, as SchemaError tuples"""
+        return [SchemaError(position, field, message) for field, message in self._errors(event)]
+
+    def check(self, event):
+        """Raise EventValidationError unless the event is valid"""
+        if not self.is_valid(event):
+            raise EventValidationError(self.errors(event))
+
+    def validate_events(self, events, max_errors=None):
+        """Problems across a sequence of events; positions are 0-based indexes"""
+        is_valid = self.is_valid
+        found = []
+        for index, event in enumerate(events):
+            if not is_valid(event):
+                found.extend(self.errors(event, index))
+                if max_errors is not None and len(found) >= max_errors:
+                    return found[:max_errors]
+        return found
+
+    def validate_jsonl(self, path, max_errors=None):
+        """(lines with an event, problems) for a JSON-lines file; positions are 1-based lines.
+
+        Lines are decoded JSONL_BLOCK at a time with a single json.loads; a
+        block with a malformed line is re-read line by line so the bad line
+        can be reported with the column of the parse error. Blank lines are
+        skipped.
+        """
+        found = []
+        count = 0
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return 0, found
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                block = []
+                for line_number, raw in enumerate(iter(mm.readline, b""), 1):
+                    if raw.isspace():
+                        continue
+                    block.append((line_number, raw))
+                    if len(block) >= JSONL_BLOCK:
+                        count += len(block)
+                        self._validate_block(block, found)
+                        block = []
+                        if max_errors is not None and len(found) >= max_errors:
+                            return count, found[:max_errors]
+                count += len(block)
+                self._validate_block(block, found)
+        return count, found if max_errors is None else found[:max_errors]
+
+    def _validate_block(self, block, found):
+        try:
+            events = json.loads(b"[" + b",".join(raw for _, raw in block) + b"]")
+        except ValueError:
+            events = None
+        if events is not None and len(events) == len(block):
+            is_valid = self.is_valid
+            for (line_number, _), event in zip(block, events):
+                if not is_valid(event):
+                    found.extend(self.errors(event, line_number))
+            return
+        for line_number, raw in block:
+            try:
+                event = json.loads(raw)
+            except ValueError as e:
+                found.append(SchemaError(line_number, None, f"is not valid JSON (column {getattr(e, 'colno', '?')})"))
+                continue
+            if not self.is_valid(event):
+                found.extend(self.errors(event, line_number))
+
+
+_default = None
+
+
+def default_schema():
+    global _default
+    if _default is None:
+        _default = CompiledSchema()
+    return _default
+
+
+def is_valid(event):
+    """Fast check against the event contract"""
+    return default_schema().is_valid(event)
+
+
+def validate_event(event):
+    """Problems with one event under the event contract ([] when valid)"""
+    return default_schema().errors(event)
+
+
+def validate_events(events, max_errors=None):
+    return default_schema().validate_events(events, max_errors)
+
+
+def validate_jsonl(path, max_errors=None):
+    return default_schema().validate_jsonl(path, max_errors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m api.schema", description="Validate captured events against the event contract")
+    parser.add_argument("paths", nargs="+", help="JSON-lines files, or .json files holding an array of events")
+    parser.add_argument("--max-errors", type=int, default=20, help="problems to print per file")
+    parser.add_argument("--strict", action="store_true", help="reject fields outside the contract")
+    args = parser.parse_args(argv)
+
+    schema = CompiledSchema(allow_extra=not args.strict)
+    status = 0
+    for path in args.paths:
+        if path.endswith(".json"):
+            with open(path) as f:
+                events = json.load(f)
+            count, found = len(events), schema.validate_events(events)
+        else:
+            count, found = schema.validate_jsonl(path)
+        bad = len({e.position for e in found})
+        print(f"{path}: {count} events, {bad} invalid, {len(found)} problems")
+        for error in found[:args.max_errors]:
+            print(f"  {error.position}: {error.field or 'event'} {error.message}")
+        status = status or (1 if found else 0)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""Transports for EventAPI: how its requests.Session reaches the server.
+
+- PooledHTTPTransport: one keep-alive connection pool shared by every
+  EventAPI in the process (the default for http:// and https:// URLs).
+- UnixSocketTransport: HTTP over a Unix-domain socket (base URLs of the
+  form "http+unix://<url-quoted socket path>").
+- InProcessTransport: calls a Python handler directly, no sockets at all;
+  EventSinkServer.handle is one.
+
+Each transport exposes `session`, a requests.Session whose adapters do the
+routing, so callers keep using the requests API and responses.
+"""
+import socket
+import threading
+import urllib.parse
+from http import HTTPStatus
+from io import BytesIO
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3 import HTTPConnectionPool
+from urllib3.connection import HTTPConnection
+
+
+UNIX_SCHEME = "http+unix://"
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+_REASONS = {status.value: status.phrase for status in HTTPStatus}
+
+_lock = threading.Lock()
+_shared = None
+_unix = {}
+
+
+class PooledHTTPTransport():
+    """requests.Session with a sized keep-alive pool and no retries"""
+
+    def __init__(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self):
+        self.session.close()
+
+
+class _UnixConnection(HTTPConnection):
+
+    def __init__(self, socket_path, *args, **kwargs):
+        self.socket_path = socket_path
+        super().__init__(*args, **kwargs)
+
+    def _new_conn(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if isinstance(self.timeout, (int, float)):
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+
+class _UnixConnectionPool(HTTPConnectionPool):
+
+    def __init__(self, socket_path, maxsize):
+        super().__init__("localhost", maxsize=maxsize)
+        self.socket_path = socket_path
+
+    def _new_conn(self):
+        self.num_connections += 1
+        return _UnixConnection(self.socket_path, self.host, self.port,
+                               timeout=self.timeout.connect_timeout, **self.conn_kw)
+
+
+class UnixSocketAdapter(HTTPAdapter):
+    """Sends every request it is mounted for to one Unix-domain socket"""
+
+    def __init__(self, socket_path, pool_maxsize=POOL_MAXSIZE):
+        self.socket_path = socket_path
+        self._pool = _UnixConnectionPool(socket_path, pool_maxsize)
+        super().__init__(max_retries=0)
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self._pool
+
+    def get_connection(self, url, proxies=None):
+        return self._pool
+
+    def request_url(self, request, proxies):
+        return request.path_url
+
+    def close(self):
+        super().close()
+        self._pool.close()
+
+
+class UnixSocketTransport():
+    """HTTP over a Unix-domain socket, whatever host the URL names"""
+
+    def __init__(self, socket_path, pool_maxsize=POOL_MAXSIZE):
+        self.socket_path = socket_path
+        self.base_url = UNIX_SCHEME + urllib.parse.quote(socket_path, safe="")
+        self.session = requests.Session()
+        adapter = UnixSocketAdapter(socket_path, pool_maxsize)
+        for prefix in (UNIX_SCHEME, "http://"):
+            self.session.mount(prefix, adapter)
+
+    def close(self):
+        self.session.close()
+
+
+class InProcessAdapter(BaseAdapter):
+    """Answers requests by calling `handler(method, path, headers, body)`.
+
+    The handler returns (status, content_type, payload bytes). Streamed
+    request bodies (iterables, file objects) are read fully first.
+    """
+
+    def __init__(self, handler):
+        super().__init__()
+        self.handler = handler
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        status, content_type, payload = self.handler(request.method, request.path_url,
+                                                     dict(request.headers), _body_bytes(request.body))
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict({"Content-Type": content_type, "Content-Length": str(len(payload))})
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = BytesIO(payload)
+        response.reason = _REASONS.get(status, "")
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+class InProcessTransport():
+    """Requests never leave the process: every URL is answered by `handler`"""
+
+    base_url = "http://in-process"
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.session = requests.Session()
+        adapter = InProcessAdapter(handler)
+        for prefix in ("http://", "https://", UNIX_SCHEME):
+            self.session.mount(prefix, adapter)
+
+    def close(self):
+        self.session.close()
+
+
+def _body_bytes(body):
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if isinstance(body, (bytes, bytearray)):
+        return bytes(body)
+    if hasattr(body, "read"):
+        return body.read()
+    return b"".join(piece.encode("utf-8") if isinstance(piece, str) else piece for piece in body)
+
+
+def shared_transport():
+    """The process-wide pooled HTTP transport"""
+    global _shared
+    with _lock:
+        if _shared is None:
+            _shared = PooledHTTPTransport()
+        return _shared
+
+
+def transport_for(base_url):
+    """Default transport for a base URL: a shared Unix-socket transport per socket, else the pooled HTTP one"""
+    if base_url.startswith(UNIX_SCHEME):
+        socket_path = urllib.parse.unquote(base_url[len(UNIX_SCHEME):].split("/", 1)[0])
+        with _lock:
+            if socket_path not in _unix:
+                _unix[socket_path] = UnixSocketTransport(socket_path)
+            return _unix[socket_path]
+    return shared_transport()
@@ -0,0 +1,70 @@
+import logging
+
+
+class DriverPool():
+    """Pool of live WebDrivers keyed by browser, reused across tests.
+
+    One pool lives in each test process, so under `pytest -n auto` every
+    xdist worker keeps its own warm browsers and nothing is shared between
+    processes. A driver is quit after `max_uses` tests, or as soon as a test
+    using it fails.
+    """
+
+    def __init__(self, factories, max_uses=20, logger=None):
+        self.factories = factories
+        self.max_uses = max_uses
+        self.logger = logger or logging.getLogger(__name__)
+        self.launched = 0
+        self._idle = {}
+        self._uses = {}
+        self._unavailable = {}
+
+    def acquire(self, browser, logger=None):
+        """Return an idle driver for `browser`, launching one if needed"""
+        logger = logger or self.logger
+        idle = self._idle.get(browser)
+        if idle:
+            driver = idle.pop()
+            logger.info(f"Reusing {browser} driver (use {self._uses[id(driver)] + 1}/{self.max_uses})")
+        else:
+            if browser in self._unavailable:
+                raise self._unavailable[browser]
+            if browser not in self.factories:
+                raise ValueError(f"No driver factory for browser '{browser}'")
+            try:
+                driver = self.factories[browser](logger)
+            except Exception as e:
+                # Don't pay the failed launch again for every remaining test.
+                self._unavailable[browser] = e
+                raise
+            driver.maximize_window()
+            self.launched += 1
+            self._uses[id(driver)] = 0
+        self._uses[id(driver)] += 1
+        return driver
+
+    def release(self, browser, driver, failed=False, logger=None):
+        """Return a driver to the pool, or quit it when it failed or is worn out"""
+        logger = logger or self.logger
+        if failed or self._uses.get(id(driver), self.max_uses) >= self.max_uses:
+            reason = "after failure" if failed else f"after {self._uses.get(id(driver))} uses"
+            logger.info(f"Recycling {browser} driver {reason}")
+            self.discard(driver)
+        else:
+            self._idle.setdefault(browser, []).append(driver)
+
+    def discard(self, driver):
+        """Quit a driver and forget it"""
+        self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            self.logger.warning(f"Failed to quit driver: {e}")
+
+    def close(self):
+        """Quit every idle driver"""
+        idle, self._idle = self._idle, {}
+        for browser, drivers in idle.items():
+            for driver in drivers:
+                self.logger.info(f"Closing {browser} driver...")
+                self.discard(driver)
@@ -0,0 +1,300 @@
+import glob
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+
+DRIVER_SPECS = {
+    "chrome": {"binary": "chromedriver", "env": "CHROMEDRIVER_PATH"},
+    "firefox": {"binary": "geckodriver", "env": "GECKODRIVER_PATH"},
+}
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "video-player-automation")
+LOCK_STALE_AFTER = 300
+
+
+def _install_chromedriver():
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def _install_geckodriver():
+    from webdriver_manager.firefox import GeckoDriverManager
+    return GeckoDriverManager().install()
+
+
+DEFAULT_INSTALLERS = {"chrome": _install_chromedriver, "firefox": _install_geckodriver}
+
+
+def _chrome_version():
+    from webdriver_manager.core.os_manager import ChromeType, OperationSystemManager
+    return OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+
+
+# Browsers whose driver must match their major version. geckodriver
+# supports a range of Firefox releases, so it is not checked.
+DEFAULT_BROWSER_VERSIONS = {"chrome": _chrome_version}
+
+
+class DriverResolutionError(RuntimeError):
+    """Raised when no driver binary can be found"""
+
+
+class FileLock():
+    """Cross-process lock backed by an O_EXCL lock file (works on Windows too)"""
+
+    def __init__(self, path, timeout=120, stale_after=LOCK_STALE_AFTER):
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        delay = 0.01
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                self._break_if_stale()
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for lock {self.path}")
+                time.sleep(delay)
+                delay = min(delay * 2, 0.5)
+                continue
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            return self
+
+    def __exit__(self, *exc_info):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _break_if_stale(self):
+        try:
+            if time.time() - os.path.getmtime(self.path) > self.stale_after:
+                os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class DriverResolver():
+    """Resolve chromedriver/geckodriver paths once per machine.
+
+    Lookup order: in-process memo, env override (CHROMEDRIVER_PATH /
+    GECKODRIVER_PATH), the on-disk cache, the binary on PATH, webdriver-manager's
+    local download cache, and only then a webdriver-manager install. With
+    `offline` (or DRIVER_OFFLINE=1) the network step is never taken. The cache
+    file is written under a lock file so concurrent xdist workers resolve once.
+
+    A cached or local chromedriver whose major version differs from the
+    installed Chrome (e.g. after a browser auto-update) is not used;
+    invalidate() drops a cached driver that failed to start a session.
+    """
+
+    def __init__(self, cache_dir=None, offline=None, installers=None, logger=None, browser_versions=None):
+        self.cache_dir = cache_dir or os.getenv("DRIVER_CACHE_DIR") or DEFAULT_CACHE_DIR
+        self.cache_file = os.path.join(self.cache_dir, "drivers.json")
+        if offline is None:
+            offline = os.getenv("DRIVER_OFFLINE", "").lower() in ("1", "true", "yes")
+        self.offline = offline
+        self.installers = installers or DEFAULT_INSTALLERS
+        self.browser_versions = DEFAULT_BROWSER_VERSIONS if browser_versions is None else browser_versions
+        self.logger = logger or logging.getLogger(__name__)
+        self._memo = {}
+        self._browser_version_memo = {}
+
+    def resolve(self, browser, logger=None):
+        """Return the driver binary path for `browser`"""
+        if browser in self._memo:
+            return self._memo[browser]
+        logger = logger or self.logger
+        spec = DRIVER_SPECS[browser]
+
+        override = os.getenv(spec["env"])
+        if override:
+            if not _is_executable(override):
+                raise DriverResolutionError(f"{spec['env']}={override} is not an executable file")
+            logger.info(f"Using {spec['binary']} from {spec['env']}: {override}")
+            self._memo[browser] = override
+            return override
+
+        entry = self._usable_entry(browser, logger)
+        if entry is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with FileLock(self.cache_file + ".lock"):
+                # Another worker may have resolved it while we waited.
+                entry = self._usable_entry(browser, logger)
+                if entry is None:
+                    entry = self._lookup(browser, logger)
+                    self._store(browser, entry)
+            logger.info(f"Resolved {spec['binary']} {entry.get('version') or ''}: {entry['path']}")
+
+        self._memo[browser] = entry["path"]
+        return entry["path"]
+
+    def version(self, browser):
+        """Return the cached driver version string, if known"""
+        entry = self._cached_entry(browser)
+        return entry and entry.get("version")
+
+    def invalidate(self, browser):
+        """Drop `browser`'s cached driver, e.g. after it failed to start a session"""
+        self._memo.pop(browser, None)
+        self._browser_version_memo.pop(browser, None)
+        if not os.path.exists(self.cache_file):
+            return
+        with FileLock(self.cache_file + ".lock"):
+            cache = self._read_cache()
+            if cache.pop(browser, None) is not None:
+                self._write_cache(cache)
+
+    def clear(self):
+        """Forget all cached resolutions"""
+        self._memo.clear()
+        try:
+            os.remove(self.cache_file)
+        except FileNotFoundError:
+            pass
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_file) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _cached_entry(self, browser):
+        entry = self._read_cache().get(browser)
+        if entry and _is_executable(entry.get("path", "")):
+            return entry
+        return None
+
+    def _browser_version(self, browser):
+        """Installed browser version, or None when it cannot be told"""
+        if browser not in self._browser_version_memo:
+            detect = self.browser_versions.get(browser)
+            try:
+                version = detect() if detect else None
+            except Exception:
+                version = None
+            self._browser_version_memo[browser] = version
+        return self._browser_version_memo[browser]
+
+    def _matches_browser(self, browser, driver_version):
+        browser_version = self._browser_version(browser)
+        if not browser_version or not driver_version:
+            return True
+        return _major(browser_version) == _major(driver_version)
+
+    def _usable_entry(self, browser, logger):
+        entry = self._cached_entry(browser)
+        if entry is not None and not self._matches_browser(browser, entry.get("version")):
+            logger.info(f"Cached {DRIVER_SPECS[browser]['binary']} {entry.get('version')} does not match "
+                        f"{browser} {self._browser_version(browser)}; resolving again")
+            return None
+        return entry
+
+    def _store(self, browser, entry):
+        cache = self._read_cache()
+        cache[browser] = entry
+        self._write_cache(cache)
+
+    def _write_cache(self, cache):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix="drivers.", suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, self.cache_file)
+
+    def _lookup(self, browser, logger):
+        binary = DRIVER_SPECS[browser]["binary"]
+        path = shutil.which(binary) or _find_in_wdm_cache(binary)
+        source = "local"
+        if path is not None and not self.offline and not self._matches_browser(browser, _driver_version(path)):
+            logger.info(f"Local {binary} at {path} does not match {browser} {self._browser_version(browser)}")
+            path = None
+        if path is None:
+            if self.offline:
+                raise DriverResolutionError(
+                    f"{binary} not found on PATH or in the webdriver-manager cache, and offline mode is on"
+                )
+            logger.info(f"Downloading {binary} with webdriver-manager...")
+            path = _fix_binary_path(self.installers[browser](), binary)
+            source = "webdriver-manager"
+        return {
+            "path": path,
+            "version": _driver_version(path),
+            "browser_version": self._browser_version(browser),
+            "source": source,
+            "resolved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+
+
+def _exe_name(binary):
+    return binary + ".exe" if sys.platform.startswith("win") else binary
+
+
+def _is_executable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def _fix_binary_path(path, binary):
+    """webdriver-manager sometimes returns a sibling file (e.g. THIRD_PARTY_NOTICES.chromedriver)"""
+    if os.path.basename(path) == _exe_name(binary) and _is_executable(path):
+        return path
+    candidate = os.path.join(os.path.dirname(path), _exe_name(binary))
+    if _is_executable(candidate):
+        return candidate
+    raise DriverResolutionError(f"webdriver-manager returned {path}, which is not a {binary} binary")
+
+
+def _find_in_wdm_cache(binary):
+    """Newest binary already downloaded by webdriver-manager, if any"""
+    if os.getenv("WDM_LOCAL") == "1":
+        root = os.path.join(os.getcwd(), ".wdm")
+    else:
+        root = os.path.join(os.path.expanduser("~"), ".wdm")
+    candidates = [
+        p for p in glob.glob(os.path.join(root, "drivers", binary, "**", _exe_name(binary)), recursive=True)
+        if _is_executable(p)
+    ]
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+def _major(version):
+    return version.split(".", 1)[0]
+
+
+def _driver_version(path):
+    try:
+        output = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r"\d+(\.\d+)+", output)
+    return match.group(0) if match else None
+
+
+_default_resolver = None
+
+
+def resolve_driver(browser, logger=None):
+    """Resolve `browser`'s driver binary with the shared process-wide resolver"""
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = DriverResolver()
+    return _default_resolver.resolve(browser, logger)
+
+
+def invalidate_driver(browser):
+    """Drop `browser`'s cached driver from the shared resolver and the on-disk cache"""
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = DriverResolver()
+    _default_resolver.invalidate(browser)
@@ -0,0 +1,165 @@
+"""Local media server with HTTP Range and keep-alive support.
+
+Serves every file in a directory (the synthetic video cache by default)
+over HTTP/1.1, so the video element can stream and seek without touching
+an external CDN.
+
+Usage:
+    python -m media.server --port 8090 [--directory DIR] [--generate 30]
+"""
+import argparse
+import mimetypes
+import os
+import re
+import sys
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from media.synth import media_cache_dir, synthetic_video
+
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """GET/HEAD with single byte ranges; the connection stays open between requests"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "MediaFixture/1.0"
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        path = self._resolve()
+        if path is None:
+            self._empty(404)
+            return
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        status = 200
+
+        header = self.headers.get("Range")
+        if header:
+            match = RANGE.match(header.strip())
+            if match is None or match.group(1) == match.group(2) == "":
+                self._empty(416, {"Content-Range": f"bytes */{size}"})
+                return
+            first, last = match.groups()
+            if first == "":
+                start = max(0, size - int(last))
+            else:
+                start = int(first)
+                end = min(int(last), size - 1) if last else size - 1
+            if start >= size or start > end:
+                self._empty(416, {"Content-Range": f"bytes */{size}"})
+                return
+            status = 206
+
+        length = end - start + 1
+        self.send_response(status)
+        self.send_header("Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if not send_body:
+            return
+        self.wfile.flush()
+        with open(path, "rb") as f:
+            try:
+                self.connection.sendfile(f, offset=start, count=length)
+            except (BrokenPipeError, ConnectionResetError):
+                # The browser aborted the request (it does so on every seek).
+                self.close_connection = True
+
+    def _resolve(self):
+        directory = os.path.realpath(self.server.directory)
+        relative = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path).lstrip("/")
+        path = os.path.realpath(os.path.join(directory, relative))
+        if not path.startswith(directory + os.sep) or not os.path.isfile(path):
+            return None
+        return path
+
+    def _empty(self, status, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MediaServer():
+    """Threaded range-capable file server on a background thread (port 0 = ephemeral)"""
+
+    def __init__(self, directory=None, host="127.0.0.1", port=0):
+        self.directory = directory or media_cache_dir()
+        self.host = host
+        self.port = port
+        self.httpd = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def url_for(self, path):
+        """URL of a file in (or directly under) the served directory"""
+        return f"{self.url}/{urllib.parse.quote(os.path.relpath(path, self.directory).replace(os.sep, '/'))}"
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.httpd = ThreadingHTTPServer((self.host, self.port), RangeRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.directory = self.directory
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="media-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self._thread.join(timeout=5)
+            self.httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m media.server", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--directory", default=None, help="directory to serve (default: media cache)")
+    parser.add_argument("--generate", type=int, metavar="SECONDS", help="make sure a synthetic video exists first")
+    args = parser.parse_args(argv)
+
+    server = MediaServer(args.directory, args.host, args.port)
+    if args.generate:
+        path = synthetic_video(duration=args.generate, cache_dir=server.directory)
+        print(f"Synthetic video: {path}")
+    server.start()
+    print(f"Serving {server.directory} at {server.url}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
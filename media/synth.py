@@ -0,0 +1,69 @@
+"""Synthetic test videos, generated with ffmpeg and cached on disk.
+
+Files are encoded with a keyframe every second and the moov atom up front
+(+faststart), so a browser can start playback from the first range
+request and land any seek on a nearby keyframe.
+"""
+import os
+import shutil
+import subprocess
+
+from drivers.resolver import DEFAULT_CACHE_DIR, FileLock
+
+
+class MediaUnavailable(RuntimeError):
+    """ffmpeg is missing or failed, so no synthetic video can be produced"""
+
+
+def media_cache_dir():
+    return os.getenv("MEDIA_CACHE_DIR") or os.path.join(DEFAULT_CACHE_DIR, "media")
+
+
+def synthetic_name(duration, width, height, bitrate_kbps):
+    return f"synthetic_{duration}s_{width}x{height}_{bitrate_kbps}k.mp4"
+
+
+def ffmpeg_available():
+    return shutil.which(os.getenv("FFMPEG", "ffmpeg")) is not None
+
+
+def synthetic_video(duration=30, width=640, height=360, bitrate_kbps=500, fps=25, cache_dir=None):
+    """Path to an H.264/AAC test video with these parameters, generating it once.
+
+    File size is roughly duration * bitrate_kbps / 8 KB, so larger bitrates
+    give larger files for seek benchmarks. Safe to call from several xdist
+    workers at once.
+    """
+    cache_dir = cache_dir or media_cache_dir()
+    path = os.path.join(cache_dir, synthetic_name(duration, width, height, bitrate_kbps))
+    if os.path.exists(path):
+        return path
+
+    ffmpeg = shutil.which(os.getenv("FFMPEG", "ffmpeg"))
+    if ffmpeg is None:
+        raise MediaUnavailable("ffmpeg not found; install it or set FFMPEG to its path")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with FileLock(path + ".lock", timeout=600):
+        if os.path.exists(path):
+            return path
+        tmp = f"{path}.{os.getpid()}.tmp.mp4"
+        command = [
+            ffmpeg, "-y", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}:duration={duration}",
+            "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+            "-c:v", "libx264", "-pix_fmt", "yuv420p", "-preset", "veryfast",
+            "-b:v", f"{bitrate_kbps}k", "-maxrate", f"{bitrate_kbps}k", "-bufsize", f"{bitrate_kbps * 2}k",
+            "-g", str(fps), "-keyint_min", str(fps), "-sc_threshold", "0",
+            "-c:a", "aac", "-b:a", "64k",
+            "-movflags", "+faststart", "-shortest", tmp,
+        ]
+        try:
+            subprocess.run(command, check=True, capture_output=True, timeout=600)
+        except (OSError, subprocess.SubprocessError) as e:
+            stderr = getattr(e, "stderr", b"") or b""
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise MediaUnavailable(f"ffmpeg failed: {stderr.decode(errors='replace').strip() or e}") from e
+        os.replace(tmp, path)
+    return path
@@ -0,0 +1,188 @@
+import weakref
+
+
+DEFAULT_CAPACITY = 1000
+
+# Installs window.__eventCapture: a fixed-size ring of every event the page
+# posts to /api/event or /api/events (fetch or sendBeacon), plus one ring per event type, each entry tagged with a
+# global sequence number so Python can drain only what it has not seen yet.
+CAPTURE_JS = """
+(function (capacity) {
+    if (window.__eventCapture) return;
+
+    // `prev` holds, per slot, the seq of the entry before it in the same
+    // ring, so a drain can tell whether evicted entries were still unread.
+    const makeRing = () => ({ items: new Array(capacity), prev: new Array(capacity), count: 0, last: 0 });
+    const all = makeRing();
+    const byType = {};
+    let seq = 0;
+
+    const push = (ring, entry) => {
+        ring.items[ring.count % capacity] = entry;
+        ring.prev[ring.count % capacity] = ring.last;
+        ring.last = entry.seq;
+        ring.count++;
+    };
+
+    const record = (event) => {
+        const entry = { seq: ++seq, event: event };
+        push(all, entry);
+        const type = event && event.type;
+        push(byType[type] || (byType[type] = makeRing()), entry);
+    };
+
+    // Requests per endpoint, so tests can bound how chatty the page is.
+    const requests = {};
+    const eventPath = (input) => {
+        const url = typeof input === 'string' ? input : (input && input.url) || '';
+        const path = new URL(url, location.href).pathname;
+        return path === '/api/event' || path === '/api/events' ? path : null;
+    };
+
+    // Single events and batches (JSON arrays) are recorded one by one.
+    const recordBody = (path, body) => {
+        requests[path] = (requests[path] || 0) + 1;
+        const parse = (text) => {
+            const parsed = JSON.parse(text);
+            (Array.isArray(parsed) ? parsed : [parsed]).forEach(record);
+        };
+        if (typeof body === 'string') {
+            parse(body);
+        } else if (body && typeof body.text === 'function') {
+            body.text().then(parse).catch(() => {});
+        }
+    };
+
+    const originalFetch = window.fetch;
+    window.fetch = function (...args) {
+        try {
+            const path = eventPath(args[0]);
+            if (path && args[1]) recordBody(path, args[1].body);
+        } catch (e) { /* never break the page's own request */ }
+        return originalFetch.apply(this, args);
+    };
+
+    if (navigator.sendBeacon) {
+        const originalBeacon = navigator.sendBeacon.bind(navigator);
+        navigator.sendBeacon = function (url, data) {
+            try {
+                const path = eventPath(url);
+                if (path) recordBody(path, data);
+            } catch (e) { /* never break the page's own request */ }
+            return originalBeacon(url, data);
+        };
+    }
+
+    window.__eventCapture = {
+        record: record,
+        head: () => seq,
+        requests: () => Object.assign({}, requests),
+        drain: (cursor, type, limit) => {
+            const ring = type ? byType[type] : all;
+            const out = [];
+            let overflow = false;
+            if (ring) {
+                const oldest = Math.max(0, ring.count - capacity);
+                let i = ring.count - 1;
+                for (; i >= oldest; i--) {
+                    const entry = ring.items[i % capacity];
+                    if (entry.seq <= cursor) break;
+                    out.push(entry);
+                }
+                overflow = i < oldest && oldest > 0 && ring.prev[oldest % capacity] > cursor;
+                out.reverse();
+            }
+            const taken = limit ? out.slice(0, limit) : out;
+            const next = limit && taken.length < out.length ? taken[taken.length - 1].seq : seq;
+            return {
+                events: taken.map((entry) => entry.event),
+                cursor: next,
+                overflow: overflow
+            };
+        }
+    };
+})(__CAPACITY__);
+"""
+
+
+class EventCapture():
+    """Cursor-based access to the events a page sends to /api/event(s).
+
+    On Chrome the capture script is registered with the DevTools protocol
+    so it runs before any page script on every load of this driver. Other
+    browsers fall back to injecting it after `driver.get`, which misses
+    events fired during load.
+    """
+
+    _by_driver = weakref.WeakKeyDictionary()
+
+    def __init__(self, driver, capacity=DEFAULT_CAPACITY):
+        self.driver = driver
+        self.capacity = capacity
+        self.script = CAPTURE_JS.replace("__CAPACITY__", str(int(capacity)))
+        self.preloaded = False
+        self.overflowed = 0
+        self._cursors = {}
+        self._floor = 0
+        self._install_preload()
+
+    @classmethod
+    def for_driver(cls, driver, capacity=DEFAULT_CAPACITY):
+        """Return the capture attached to `driver`, creating it once.
+
+        The ring size is fixed by the first call (the script may already be
+        registered with the browser); asking for a different one raises
+        ValueError.
+        """
+        capture = cls._by_driver.get(driver)
+        if capture is None:
+            capture = cls._by_driver[driver] = cls(driver, capacity)
+        elif capture.capacity != capacity:
+            raise ValueError(f"event capture for this driver already has capacity {capture.capacity}, "
+                             f"not {capacity}")
+        return capture
+
+    def _install_preload(self):
+        execute_cdp_cmd = getattr(self.driver, "execute_cdp_cmd", None)
+        if execute_cdp_cmd is None:
+            return
+        try:
+            execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": self.script})
+        except Exception:
+            return
+        self.preloaded = True
+
+    def attach(self):
+        """Call after each page load: installs the script if it was not preloaded
+        and starts reading from the beginning of the new page's buffer"""
+        if not self.preloaded:
+            self.driver.execute_script(self.script)
+        self._cursors = {}
+        self._floor = 0
+
+    def drain(self, event_type=None, limit=None):
+        """Return events (optionally of one type) newer than the last drain of that type"""
+        key = event_type or "*"
+        result = self.driver.execute_script(
+            "return window.__eventCapture ? "
+            "window.__eventCapture.drain(arguments[0], arguments[1], arguments[2]) : null",
+            max(self._cursors.get(key, 0), self._floor), event_type, limit,
+        )
+        if result is None:
+            return []
+        if result["overflow"]:
+            self.overflowed += 1
+        self._cursors[key] = result["cursor"]
+        return result["events"]
+
+    def clear(self):
+        """Skip every event captured so far"""
+        self._floor = self.driver.execute_script(
+            "return window.__eventCapture ? window.__eventCapture.head() : 0"
+        )
+
+    def request_counts(self):
+        """Requests the page made to each event endpoint since load, e.g. {"/api/events": 2}"""
+        return self.driver.execute_script(
+            "return window.__eventCapture ? window.__eventCapture.requests() : {}"
+        ) or {}
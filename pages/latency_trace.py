@@ -0,0 +1,111 @@
+import weakref
+
+from api.loadgen import LatencyHistogram
+
+# Where an event's time goes, between marks (epoch ms) of the traced page
+# (client/index.html?trace=1) and of the server:
+#   queue     listener fired -> fetch started (throttle, batching, busy page)
+#   uplink    fetch started  -> server received the request
+#   server    received       -> server replied
+#   downlink  server replied -> reply reached the page
+#   delivery  listener fired -> server received (queue + uplink)
+STAGES = ("queue", "uplink", "server", "downlink", "delivery")
+MARKS = ("listener", "fetchStart", "receive", "respond", "responseEnd")
+
+DRAIN_TRACES_JS = "return window.__eventTraces ? window.__eventTraces.drain() : null;"
+
+
+def is_complete(trace):
+    return all(isinstance(trace.get(mark), (int, float)) for mark in MARKS)
+
+
+def clock_offset(traces):
+    """Server clock minus page clock in ms, or 0.0 without a complete trace.
+
+    NTP-style estimate from the round trip that spent the least time on
+    the network: ((receive - fetchStart) + (respond - responseEnd)) / 2.
+    """
+    best = None
+    for trace in traces:
+        if not is_complete(trace):
+            continue
+        network = (trace["responseEnd"] - trace["fetchStart"]) - (trace["respond"] - trace["receive"])
+        offset = ((trace["receive"] - trace["fetchStart"]) + (trace["respond"] - trace["responseEnd"])) / 2
+        if best is None or network < best[0]:
+            best = (network, offset)
+    return best[1] if best else 0.0
+
+
+def stages(trace, offset=0.0):
+    """Milliseconds spent in each of STAGES, server marks moved onto the page clock"""
+    receive = trace["receive"] - offset
+    respond = trace["respond"] - offset
+    return {
+        "queue": trace["fetchStart"] - trace["listener"],
+        "uplink": receive - trace["fetchStart"],
+        "server": respond - receive,
+        "downlink": trace["responseEnd"] - respond,
+        "delivery": receive - trace["listener"],
+    }
+
+
+class LatencyTrace():
+    """Latency traces of the events a page sends, collected through the driver.
+
+    The page must be loaded with ?trace=1. Traces accumulate across
+    collect() calls (collect before navigating away), and the clock offset
+    is re-estimated from all of them.
+    """
+
+    _by_driver = weakref.WeakKeyDictionary()
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.traces = []
+        self.incomplete = 0
+
+    @classmethod
+    def for_driver(cls, driver):
+        """Return the trace collector attached to `driver`, creating it once"""
+        trace = cls._by_driver.get(driver)
+        if trace is None:
+            trace = cls._by_driver[driver] = cls(driver)
+        return trace
+
+    def collect(self):
+        """Pull the traces the page finished since the last call; returns them.
+
+        Raises AssertionError when the page was not loaded with tracing.
+        """
+        new = self.driver.execute_script(DRAIN_TRACES_JS)
+        if new is None:
+            raise AssertionError("page has no event tracing; load it with ?trace=1")
+        complete = [trace for trace in new if is_complete(trace)]
+        self.incomplete += len(new) - len(complete)
+        self.traces.extend(complete)
+        return complete
+
+    def clear(self):
+        self.traces = []
+        self.incomplete = 0
+
+    @property
+    def offset(self):
+        return clock_offset(self.traces)
+
+    def histograms(self):
+        """{event type: {stage: LatencyHistogram}} of every collected trace"""
+        offset = self.offset
+        result = {}
+        for trace in self.traces:
+            by_stage = result.get(trace.get("type"))
+            if by_stage is None:
+                by_stage = result[trace.get("type")] = {stage: LatencyHistogram() for stage in STAGES}
+            for stage, ms in stages(trace, offset).items():
+                by_stage[stage].record(ms / 1000.0)
+        return result
+
+    def summary(self):
+        """{event type: {stage: count/min/mean/max/percentiles in ms}}"""
+        return {event_type: {stage: histogram.summary() for stage, histogram in by_stage.items()}
+                for event_type, by_stage in self.histograms().items()}
@@ -0,0 +1,223 @@
+import urllib.parse
+
+from pages.event_capture import DEFAULT_CAPACITY, EventCapture
+
+# Shared prologue: `viewers` are the selected iframes (arguments[0] is a
+# list of indexes, or null for all of them).
+SELECT_JS = """
+const all = window.__viewers || [];
+const selected = arguments[0] === null ? all.map((_, i) => i) : arguments[0];
+"""
+
+# Runs arguments[1] (JS with `video` and `win` in scope) in every selected
+# viewer and returns one result per viewer, errors as "error: ..." strings.
+RUN_JS = SELECT_JS + """
+const run = new Function('video', 'win', arguments[1]);
+return selected.map((i) => {
+    try {
+        const win = all[i].contentWindow;
+        const result = run(win.document.getElementById('video'), win);
+        return result === undefined ? null : result;
+    } catch (e) {
+        return 'error: ' + e.message;
+    }
+});
+"""
+
+# Resolves with the indexes still failing arguments[1] (a JS expression
+# with `video` and `win` in scope) once all pass, or after arguments[2] ms.
+WAIT_JS = SELECT_JS + """
+const check = new Function('video', 'win', 'return (' + arguments[1] + ');');
+const timeoutMs = arguments[2];
+const callback = arguments[arguments.length - 1];
+const deadline = Date.now() + timeoutMs;
+const failing = () => selected.filter((i) => {
+    try {
+        const win = all[i].contentWindow;
+        const video = win && win.document.getElementById('video');
+        return !(video && check(video, win));
+    } catch (e) {
+        return true;
+    }
+});
+const poll = () => {
+    const left = failing();
+    if (!left.length || Date.now() >= deadline) return callback(left);
+    setTimeout(poll, 50);
+};
+poll();
+"""
+
+# Drains every selected viewer's capture from its own cursor:
+# arguments[1] = cursors (one per selected viewer), then type and limit.
+DRAIN_JS = SELECT_JS + """
+const [, cursors, type, limit] = arguments;
+return selected.map((i, k) => {
+    const capture = all[i].contentWindow.__eventCapture;
+    return capture ? capture.drain(cursors[k], type, limit) : null;
+});
+"""
+
+# Installs the capture script in viewers loaded before it was registered.
+INSTALL_CAPTURE_JS = SELECT_JS + """
+const source = arguments[1];
+let installed = 0;
+selected.forEach((i) => {
+    const win = all[i].contentWindow;
+    if (!win.__eventCapture) {
+        win.eval(source);
+        installed++;
+    }
+});
+return installed;
+"""
+
+
+class Viewer():
+    """One player of a MultiViewerPage"""
+
+    def __init__(self, page, index):
+        self.page = page
+        self.index = index
+        self.user_id = page.user_ids[index]
+
+    def run(self, body):
+        return self.page.run(body, [self.index])[0]
+
+    def play(self):
+        return self.page.play([self.index])
+
+    def pause(self):
+        return self.page.pause([self.index])
+
+    def seek(self, seconds):
+        return self.page.seek(seconds, [self.index])
+
+    def scroll_to(self, y_position):
+        return self.page.scroll_to(y_position, [self.index])
+
+    def state(self):
+        return self.page.states([self.index])[0]
+
+    def drain(self, event_type=None, limit=None):
+        return self.page.drain(event_type, limit, [self.index]).get(self.user_id, [])
+
+
+class MultiViewerPage():
+    """Many isolated players in one browser tab, for load from real browser event code.
+
+    client/viewers.html loads `viewers` copies of the player in iframes,
+    each with its own userId (`user_template`, "{n}" is the viewer number)
+    and its own event capture. Actions and drains cover every viewer, or
+    a list of viewer indexes, in one WebDriver round trip.
+    """
+
+    def __init__(self, driver, viewers, app_url="http://localhost:3000", src=None,
+                 user_template="viewer-{n}", event_timeout=5, capacity=DEFAULT_CAPACITY):
+        self.driver = driver
+        self.viewers = viewers
+        self.app_url = app_url
+        self.src = src
+        self.user_template = user_template
+        self.event_timeout = event_timeout
+        self.capture = EventCapture.for_driver(driver, capacity)
+        self.user_ids = [user_template.replace("{n}", str(n)) for n in range(viewers)]
+        self.last_wait_failures = []
+        self._cursors = [{} for _ in range(viewers)]
+        self._floors = [0] * viewers
+
+    @property
+    def url(self):
+        query = {"count": self.viewers, "user": self.user_template}
+        if self.src:
+            query["src"] = self.src
+        return f"{self.app_url}/viewers.html?{urllib.parse.urlencode(query)}"
+
+    def open(self, timeout=30):
+        """Load every viewer and wait until all of them can play; returns self"""
+        self.driver.set_script_timeout(max(timeout, self.event_timeout) + 5)
+        self.driver.get(self.url)
+        if not self.wait_for("win.document.readyState === 'complete'", timeout=timeout):
+            raise AssertionError(f"viewers did not load: {self.last_wait_failures[:10]}")
+        if not self.capture.preloaded:
+            self.driver.execute_script(INSTALL_CAPTURE_JS, None, self.capture.script)
+        self._cursors = [{} for _ in range(self.viewers)]
+        self._floors = [0] * self.viewers
+        if not self.wait_for("video.readyState >= 2", timeout=timeout):
+            raise AssertionError(f"viewers not ready to play: {self.last_wait_failures[:10]}")
+        return self
+
+    def viewer(self, index):
+        return Viewer(self, index)
+
+    def run(self, body, viewers=None):
+        """Run JS (`video` and `win` in scope) in each viewer; one result per viewer"""
+        return self.driver.execute_script(RUN_JS, viewers, body)
+
+    def wait_for(self, condition, viewers=None, timeout=None):
+        """Wait until the JS expression `condition` holds in every viewer.
+
+        Returns False on timeout; the indexes that never got there are kept
+        in `last_wait_failures`.
+        """
+        timeout = self.event_timeout if timeout is None else timeout
+        self.last_wait_failures = self.driver.execute_async_script(
+            WAIT_JS, viewers, condition, int(timeout * 1000)
+        )
+        return not self.last_wait_failures
+
+    def play(self, viewers=None):
+        self.run("video.play().catch(() => {});", viewers)
+        return self.wait_for("!video.paused && video.readyState >= 3", viewers)
+
+    def pause(self, viewers=None):
+        self.run("video.pause();", viewers)
+        return self.wait_for("video.paused", viewers)
+
+    def seek(self, seconds, viewers=None):
+        seconds = float(seconds)
+        self.run(f"video.currentTime = {seconds};", viewers)
+        return self.wait_for(f"!video.seeking && Math.abs(video.currentTime - {seconds}) < 0.5", viewers)
+
+    def scroll_to(self, y_position, viewers=None):
+        y_position = int(y_position)
+        self.run(f"win.scrollTo(0, {y_position});", viewers)
+        return self.wait_for(
+            f"Math.abs(win.scrollY - Math.max(0, Math.min({y_position}, "
+            f"win.document.documentElement.scrollHeight - win.innerHeight))) < 1", viewers)
+
+    def states(self, viewers=None):
+        """currentTime, paused, ended and readyState of each viewer"""
+        return self.run("return {currentTime: video.currentTime, paused: video.paused, "
+                        "ended: video.ended, readyState: video.readyState};", viewers)
+
+    def flush_events(self, viewers=None):
+        """Send every viewer's queued (batched) events now"""
+        return self.run("return win.__eventPipeline ? win.__eventPipeline.flush() : 0;", viewers)
+
+    def drain(self, event_type=None, limit=None, viewers=None):
+        """New events of every viewer since its last drain (of that type), by userId"""
+        indexes = list(range(self.viewers)) if viewers is None else list(viewers)
+        key = event_type or "*"
+        cursors = [max(self._cursors[i].get(key, 0), self._floors[i]) for i in indexes]
+        results = self.driver.execute_script(DRAIN_JS, indexes, cursors, event_type, limit)
+        events = {}
+        for index, result in zip(indexes, results):
+            if result is None:
+                events[self.user_ids[index]] = []
+                continue
+            self._cursors[index][key] = result["cursor"]
+            events[self.user_ids[index]] = result["events"]
+        return events
+
+    def clear(self, viewers=None):
+        """Skip every event the viewers captured so far"""
+        indexes = list(range(self.viewers)) if viewers is None else list(viewers)
+        heads = self.run("return win.__eventCapture ? win.__eventCapture.head() : 0;", indexes)
+        for index, head in zip(indexes, heads):
+            self._floors[index] = head
+
+    def drain_all(self, event_type=None, limit=None, viewers=None):
+        """drain() flattened into one list, ordered by timestamp"""
+        events = [event for batch in self.drain(event_type, limit, viewers).values() for event in batch]
+        return sorted(events, key=lambda event: event.get("timestamp") or "")
@@ -0,0 +1,248 @@
+import atexit
+import hashlib
+import io
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import weakref
+
+from drivers.resolver import FileLock
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SCREENSHOT_DIR = os.path.join(PROJECT_ROOT, "reports", "screenshots")
+INDEX_FILE = "index.json"
+
+# Element rect in device pixels, so it lines up with the screenshot bitmap.
+ELEMENT_RECT_JS = """
+const el = document.querySelector(arguments[0]);
+if (!el) return null;
+const r = el.getBoundingClientRect();
+const dpr = window.devicePixelRatio || 1;
+return [r.left * dpr, r.top * dpr, r.right * dpr, r.bottom * dpr];
+"""
+
+logger = logging.getLogger(__name__)
+
+# Stores created so far; a single atexit hook flushes their pending shots
+_stores = weakref.WeakSet()
+
+
+def _pillow():
+    """Pillow is optional: without it shots are stored as-is with exact-match dedup"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+
+def dhash(image, size=8):
+    """64-bit difference hash of a PIL image (robust to re-encoding and small changes)"""
+    gray = image.convert("L").resize((size + 1, size))
+    pixels = list(gray.getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def safe_name(name):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("_") or "screenshot"
+
+
+class Screenshot():
+    """Handle for a queued shot; `path` is set once the worker has stored it"""
+
+    def __init__(self, name):
+        self.name = name
+        self.path = None
+        self.duplicate = False
+        self.error = None
+        self._done = threading.Event()
+
+    def result(self, timeout=None):
+        self._done.wait(timeout)
+        return self.path
+
+
+class ScreenshotStore():
+    """Failure screenshots written off the test thread.
+
+    `capture` grabs the PNG bytes (and the crop rect, if asked to crop) and
+    returns at once; a daemon worker crops, hashes, encodes and writes. Files are content
+    addressed (`<sha1>.webp`, or `.png` without Pillow); a shot whose
+    perceptual hash is within `max_distance` bits of a stored one reuses
+    that file. `index.json` maps every shot name to its file and keeps the
+    directory under `max_bytes` by evicting least recently used files.
+    The index is shared by xdist workers through a FileLock.
+    """
+
+    def __init__(self, directory=SCREENSHOT_DIR, max_bytes=50 * 1024 * 1024, crop_selector="#video",
+                 max_distance=6, quality=80, max_queue=32):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.crop_selector = crop_selector
+        self.max_distance = max_distance
+        self.quality = quality
+        self.written = 0
+        self.deduplicated = 0
+        self.evicted = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._worker = None
+        self._lock = threading.Lock()
+        _stores.add(self)
+
+    _default = None
+
+    @classmethod
+    def default(cls):
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def capture(self, driver, name, crop=False):
+        """Grab the screen now, process it later; returns a Screenshot handle.
+
+        With `crop` only the `crop_selector` element is kept.
+        """
+        png = driver.get_screenshot_as_png()
+        rect = None
+        if crop and self.crop_selector:
+            try:
+                rect = driver.execute_script(ELEMENT_RECT_JS, self.crop_selector)
+            except Exception:
+                rect = None
+        shot = Screenshot(f"{safe_name(name)}_{time.strftime('%Y-%m-%d_%H-%M-%S')}")
+        self._ensure_worker()
+        self._queue.put((shot, png, rect))
+        return shot
+
+    def flush(self, timeout=None):
+        """Wait until every queued shot is on disk"""
+        if self._worker is None:
+            return True
+        done = threading.Event()
+        self._queue.put((None, done, None))
+        return done.wait(timeout)
+
+    def index(self):
+        return self._load_index()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="screenshot-writer", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            shot, png, rect = self._queue.get()
+            if shot is None:
+                png.set()
+                continue
+            try:
+                self._store(shot, png, rect)
+            except Exception as e:
+                shot.error = e
+                logger.warning(f"Screenshot {shot.name} could not be stored: {e}")
+            finally:
+                shot._done.set()
+
+    def _encode(self, png, rect):
+        """-> (bytes, extension, perceptual hash or None)"""
+        Image = _pillow()
+        if Image is None:
+            return png, "png", None
+        image = Image.open(io.BytesIO(png))
+        if rect:
+            left, top, right, bottom = (int(round(v)) for v in rect)
+            box = (max(0, left), max(0, top), min(image.width, right), min(image.height, bottom))
+            if box[2] > box[0] and box[3] > box[1]:
+                image = image.crop(box)
+        image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, "WEBP", quality=self.quality, method=4)
+        return out.getvalue(), "webp", dhash(image)
+
+    def _store(self, shot, png, rect):
+        data, ext, phash = self._encode(png, rect)
+        digest = hashlib.sha1(data).hexdigest()
+        os.makedirs(self.directory, exist_ok=True)
+        with FileLock(os.path.join(self.directory, INDEX_FILE + ".lock")):
+            index = self._load_index()
+            files = index["files"]
+            match = None
+            if phash is not None:
+                for entry in files.values():
+                    if entry.get("phash") is not None and hamming(entry["phash"], phash) <= self.max_distance:
+                        match = entry
+                        break
+            if match is None:
+                match = files.get(digest)
+            if match is not None and os.path.exists(os.path.join(self.directory, match["file"])):
+                shot.duplicate = True
+                self.deduplicated += 1
+            else:
+                filename = f"{digest}.{ext}"
+                tmp = os.path.join(self.directory, f".{filename}.{os.getpid()}.tmp")
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, os.path.join(self.directory, filename))
+                match = files[digest] = {"file": filename, "size": len(data), "phash": phash}
+                self.written += 1
+            match["last_used"] = time.time()
+            index["names"][shot.name] = match["file"]
+            self._evict(index)
+            self._save_index(index)
+        shot.path = os.path.join(self.directory, match["file"])
+        logger.info(f"Screenshot {shot.name} stored as {shot.path}" + (" (duplicate)" if shot.duplicate else ""))
+
+    def _evict(self, index):
+        files = index["files"]
+        total = sum(entry["size"] for entry in files.values())
+        for digest, entry in sorted(files.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes or len(files) <= 1:
+                break
+            try:
+                os.remove(os.path.join(self.directory, entry["file"]))
+            except FileNotFoundError:
+                pass
+            total -= entry["size"]
+            del files[digest]
+            self.evicted += 1
+        live = {entry["file"] for entry in files.values()}
+        index["names"] = {name: f for name, f in index["names"].items() if f in live}
+
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE)) as f:
+                index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {"files": {}, "names": {}}
+        index.setdefault("files", {})
+        index.setdefault("names", {})
+        return index
+
+    def _save_index(self, index):
+        path = os.path.join(self.directory, INDEX_FILE)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+
+
+@atexit.register
+def _flush_at_exit():
+    for store in list(_stores):
+        store.flush(timeout=10)
@@ -0,0 +1,225 @@
+import time
+from contextlib import contextmanager
+
+# Page clock whose speed can be changed: Date, performance.now() and timer
+# delays follow `window.__clock`, so timestamps the page sends keep pace
+# with media played at a higher playbackRate. Installed once per document.
+# The unscaled sources stay available as __clock.realPerfNow and
+# __clock.realSetTimeout (latency traces in client/index.html use the former).
+CLOCK_JS = """
+(function () {
+    if (window.__clock) return;
+    const RealDate = Date;
+    const realNow = Date.now.bind(Date);
+    const realPerf = performance.now.bind(performance);
+    const realSetTimeout = window.setTimeout.bind(window);
+    const realSetInterval = window.setInterval.bind(window);
+    const epoch = realNow() - realPerf();
+    let scale = 1;
+    let realAnchor = realPerf();
+    let virtualAnchor = realAnchor;
+
+    const perfNow = () => virtualAnchor + (realPerf() - realAnchor) * scale;
+    const dateNow = () => Math.floor(epoch + perfNow());
+    const delay = (ms) => (Number(ms) || 0) / (scale || 1);
+
+    function ClockDate(...args) {
+        if (!new.target) return new RealDate(dateNow()).toString();
+        return args.length ? new RealDate(...args) : new RealDate(dateNow());
+    }
+    ClockDate.prototype = RealDate.prototype;
+    ClockDate.now = dateNow;
+    ClockDate.parse = RealDate.parse;
+    ClockDate.UTC = RealDate.UTC;
+    window.Date = ClockDate;
+    performance.now = perfNow;
+    window.setTimeout = (fn, ms, ...rest) => realSetTimeout(fn, delay(ms), ...rest);
+    window.setInterval = (fn, ms, ...rest) => realSetInterval(fn, delay(ms), ...rest);
+
+    window.__clock = {
+        get scale() { return scale; },
+        setScale(value) {
+            virtualAnchor = perfNow();
+            realAnchor = realPerf();
+            scale = value;
+            return scale;
+        },
+        advance(ms) {
+            virtualAnchor += ms;
+            return dateNow();
+        },
+        now: dateNow,
+        realPerfNow: realPerf,
+        realSetTimeout: realSetTimeout
+    };
+})();
+"""
+
+# Sets the fastest rate up to arguments[0] the browser accepts (Chrome
+# throws outside 1/16..16) and scales the page clock to the same rate.
+SET_RATE_JS = """
+const [rate, scaleClock] = arguments;
+const video = document.getElementById('video');
+for (const candidate of [rate, 16, 8, 4, 2, 1]) {
+    if (candidate > rate) continue;
+    try {
+        video.playbackRate = candidate;
+        break;
+    } catch (e) {
+        // NotSupportedError: try the next lower rate
+    }
+}
+if (scaleClock && window.__clock) window.__clock.setScale(video.playbackRate);
+return video.playbackRate;
+"""
+
+# Plays until currentTime reaches arguments[0] (or the media ends); resolves
+# with currentTime, or an "error: ..." string after arguments[1] real ms.
+FAST_FORWARD_JS = """
+const [target, timeoutMs] = arguments;
+const callback = arguments[arguments.length - 1];
+const video = document.getElementById('video');
+const later = window.__clock ? window.__clock.realSetTimeout : setTimeout;
+let finished = false;
+const finish = (result) => {
+    if (finished) return;
+    finished = true;
+    video.removeEventListener('timeupdate', check);
+    callback(result);
+};
+const check = () => {
+    if (video.currentTime >= target || video.ended) finish(video.currentTime);
+};
+video.addEventListener('timeupdate', check);
+later(() => finish('error: currentTime ' + video.currentTime + ' < ' + target), timeoutMs);
+check();
+if (!finished && video.paused) video.play().catch((e) => finish('error: ' + e.message));
+"""
+
+# Pauses, moves currentTime forward by arguments[0] seconds and advances the
+# page clock by the same amount; resolves with currentTime once seeked.
+STEP_JS = """
+const [seconds, timeoutMs] = arguments;
+const callback = arguments[arguments.length - 1];
+const video = document.getElementById('video');
+const later = window.__clock ? window.__clock.realSetTimeout : setTimeout;
+const end = isFinite(video.duration) ? video.duration : Infinity;
+const target = Math.min(video.currentTime + seconds, end);
+let finished = false;
+const finish = (result) => {
+    if (finished) return;
+    finished = true;
+    video.removeEventListener('seeked', onSeeked);
+    callback(result);
+};
+const onSeeked = () => finish(video.currentTime);
+video.pause();
+video.addEventListener('seeked', onSeeked);
+later(() => finish('error: no seeked event'), timeoutMs);
+if (window.__clock) window.__clock.advance((target - video.currentTime) * 1000);
+video.currentTime = target;
+"""
+
+MAX_PLAYBACK_RATE = 16.0
+MIN_PLAYBACK_RATE = 1 / 16
+# Extra seconds the driver waits for a script beyond its own in-page timeout
+SCRIPT_TIMEOUT_MARGIN = 5
+
+
+class TimeControl():
+    """Fast-forwarding for a VideoPage, so long-session tests finish in seconds.
+
+    Three ways, from most to least realistic:
+    - set_playback_rate(): real playback at up to MAX_PLAYBACK_RATE, with the
+      page clock (Date, performance.now, timers) scaled to match, so sent
+      events keep videoTime and timestamp consistent.
+    - step(): paused, deterministic jumps of currentTime with the page clock
+      moved by the same amount.
+    - virtual_time(): Chrome DevTools virtual time; page timers and clock
+      run ahead without waiting. The browser stays on virtual time
+      afterwards, so `virtualized` tells the caller not to reuse it.
+
+    The clock shim is registered for every later page load through the
+    DevTools protocol where available; otherwise install_clock() must be
+    called again after each navigation.
+    """
+
+    def __init__(self, page, max_rate=MAX_PLAYBACK_RATE):
+        self.page = page
+        self.driver = page.driver
+        self.max_rate = max_rate
+        self.rate = 1.0
+        self.preloaded = False
+        self.virtualized = False
+
+    def _cdp(self, command, params):
+        execute_cdp_cmd = getattr(self.driver, "execute_cdp_cmd", None)
+        if execute_cdp_cmd is None:
+            return None
+        try:
+            return execute_cdp_cmd(command, params)
+        except Exception:
+            return None
+
+    @contextmanager
+    def _script_timeout(self, seconds):
+        # The driver would abort a script that outlives its script timeout
+        # (VideoPage sets ~15s) before the in-page timeout could report.
+        self.driver.set_script_timeout(max(seconds + SCRIPT_TIMEOUT_MARGIN, self.page.script_timeout))
+        try:
+            yield
+        finally:
+            self.driver.set_script_timeout(self.page.script_timeout)
+
+    def install_clock(self):
+        """Install the scalable page clock in the current document (and future ones where possible)"""
+        if not self.preloaded:
+            self.preloaded = self._cdp("Page.addScriptToEvaluateOnNewDocument", {"source": CLOCK_JS}) is not None
+        self.driver.execute_script(CLOCK_JS)
+
+    def set_playback_rate(self, rate, scale_clock=True):
+        """Play at `rate` (clamped to what the browser accepts); returns the rate applied"""
+        rate = min(max(float(rate), MIN_PLAYBACK_RATE), self.max_rate)
+        if scale_clock:
+            self.install_clock()
+        self.rate = self.driver.execute_script(SET_RATE_JS, rate, scale_clock)
+        return self.rate
+
+    def fast_forward(self, seconds, timeout=None):
+        """Play `seconds` of media at the current rate; returns the new currentTime.
+
+        Raises AssertionError when playback does not get there within
+        `timeout` real seconds (default: the scaled duration plus the page's
+        event timeout).
+        """
+        start = self.page.get_current_time()
+        if timeout is None:
+            timeout = seconds / (self.rate or 1) + self.page.event_timeout
+        with self._script_timeout(timeout):
+            result = self.driver.execute_async_script(FAST_FORWARD_JS, start + seconds, int(timeout * 1000))
+        if isinstance(result, str):
+            raise AssertionError(f"fast_forward({seconds}) failed: {result}")
+        return result
+
+    def step(self, seconds):
+        """Pause and jump `seconds` ahead, page clock included; returns the new currentTime"""
+        self.install_clock()
+        with self._script_timeout(self.page.event_timeout):
+            result = self.driver.execute_async_script(STEP_JS, float(seconds), int(self.page.event_timeout * 1000))
+        if isinstance(result, str):
+            raise AssertionError(f"step({seconds}) failed: {result}")
+        return result
+
+    def virtual_time(self, seconds, timeout=10):
+        """Run the page `seconds` ahead on DevTools virtual time; False where unsupported"""
+        start = self.driver.execute_script("return Date.now();")
+        if self._cdp("Emulation.setVirtualTimePolicy", {"policy": "advance", "budget": seconds * 1000}) is None:
+            return False
+        self.virtualized = True
+        deadline = time.monotonic() + timeout
+        with self._script_timeout(timeout):
+            while self.driver.execute_script("return Date.now();") < start + seconds * 1000:
+                if time.monotonic() > deadline:
+                    raise AssertionError(f"virtual time did not advance {seconds}s within {timeout}s")
+                time.sleep(0.01)
+        return True
@@ -1,42 +1,189 @@
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import time
 import os
-import datetime
+from pages.screenshots import ScreenshotStore
+from pages.time_control import TimeControl
+
+# Runs `action` against the page and resolves once `event` fires on `target`
+# (or immediately when `done` is already true), or false after `timeoutMs`.
+WAIT_FOR_EVENT_JS = """
+const [targetName, eventName, timeoutMs, action, done] = arguments;
+const callback = arguments[arguments.length - 1];
+const video = document.getElementById('video');
+const target = targetName === 'window' ? window : video;
+let finished = false;
+let timer = null;
+const onEvent = () => finish(true);
+const finish = (result) => {
+    if (finished) return;
+    finished = true;
+    clearTimeout(timer);
+    target.removeEventListener(eventName, onEvent);
+    callback(result);
+};
+try {
+    if (done && new Function('video', 'return (' + done + ');')(video)) {
+        finish(true);
+    } else {
+        target.addEventListener(eventName, onEvent);
+        timer = setTimeout(() => finish(false), timeoutMs);
+        if (action) {
+            const result = new Function('video', action)(video);
+            if (result && typeof result.catch === 'function') {
+                result.catch((e) => finish('error: ' + e.message));
+            }
+        }
+    }
+} catch (e) {
+    finish('error: ' + e.message);
+}
+"""
+
+# Everything get_state() reports, read in a single round trip.
+STATE_JS = """
+const video = document.getElementById('video');
+const buffered = [];
+for (let i = 0; i < video.buffered.length; i++) {
+    buffered.push([video.buffered.start(i), video.buffered.end(i)]);
+}
+return {
+    currentTime: video.currentTime,
+    duration: isFinite(video.duration) ? video.duration : null,
+    paused: video.paused,
+    ended: video.ended,
+    playing: !video.paused && !video.ended,
+    readyState: video.readyState,
+    buffered: buffered,
+    scrollX: window.scrollX,
+    scrollY: window.scrollY
+};
+"""
+
+
+class ScriptBatch():
+    """Queue page actions and queries and send them as one execute_script call.
+
+        with page.batch() as batch:
+            batch.seek(10)
+            batch.pause()
+            batch.state()
+        state = batch.results[-1]
+
+    Actions are applied in order without waiting for media events; each
+    queued step contributes one entry to `results` (None for actions).
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.results = None
+        self._steps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.execute()
+
+    def __len__(self):
+        return len(self._steps)
+
+    def script(self, body):
+        """Queue raw JS; `video` is in scope and `return` gives the step's result"""
+        self._steps.append(body)
+        return self
+
+    def play(self):
+        return self.script("video.play();")
+
+    def pause(self):
+        return self.script("video.pause();")
+
+    def seek(self, seconds):
+        return self.script(f"video.currentTime = {float(seconds)};")
+
+    def scroll_to(self, y_position):
+        return self.script(f"window.scrollTo(0, {int(y_position)});")
+
+    def current_time(self):
+        return self.script("return video.currentTime;")
+
+    def state(self):
+        return self.script(STATE_JS.replace("const video = document.getElementById('video');", ""))
+
+    def execute(self):
+        """Send all queued steps in one round trip and return their results"""
+        steps = "\n".join(
+            f"results.push((function() {{ {step} }})());" for step in self._steps
+        )
+        self._steps = []
+        self.results = self.page.driver.execute_script(
+            "const video = document.getElementById('video');\n"
+            "const results = [];\n"
+            f"{steps}\n"
+            "return results.map((r) => r === undefined ? null : r);"
+        )
+        return self.results
+
 
 class VideoPage():
-    def __init__(self,driver):
+    def __init__(self,driver, event_timeout=5, screenshots=None):
+        # selenium is imported on first use, so importing this module stays cheap
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
         self.VIDEO = (By.ID, "video")
         self.driver = driver
+        self.screenshots = screenshots or ScreenshotStore.default()
+        self.event_timeout = event_timeout
+        self.last_wait_error = None
+        # Playback rate, page clock and stepping for fast-forwarded tests
+        self.time = TimeControl(self)
 
         self.wait = WebDriverWait(self.driver, 10)
+        self.script_timeout = max(event_timeout, 10) + 5
+        self.driver.set_script_timeout(self.script_timeout)
 
+    def wait_for_event(self, event, action=None, done=None, target="video", timeout=None):
+        """Run `action` (JS, `video` in scope) and wait until `event` fires.
 
+        `done` is a JS expression; when it is already true the action is
+        skipped and the wait resolves immediately. Returns True when the
+        event fired, False on timeout or when the action failed (the reason
+        is kept in `last_wait_error`).
+        """
+        timeout = self.event_timeout if timeout is None else timeout
+        result = self.driver.execute_async_script(
+            WAIT_FOR_EVENT_JS, target, event, int(timeout * 1000), action, done
+        )
+        self.last_wait_error = None
+        if result is True:
+            return True
+        self.last_wait_error = result or f"no '{event}' event within {timeout}s"
+        return False
 
     def wait_for_video_ready(self):
+        from selenium.webdriver.support import expected_conditions as EC
         self.wait.until(
             EC.presence_of_element_located(self.VIDEO)
         )
-        for i in range(10):
-            ready = self.driver.execute_script(
-                "return document.getElementById('video').readyState >= 2"
-            )
-            if ready:
-                return
-            time.sleep(0.5)
+        return self.wait_for_event("canplay", done="video.readyState >= 2", timeout=10)
 
     def play_video(self):
-        self.driver.execute_script("document.getElementById('video').play()")
-        time.sleep(0.5)
+        return self.wait_for_event(
+            "playing", action="return video.play();", done="!video.paused && video.readyState >= 3"
+        )
 
     def pause_video(self):
-        self.driver.execute_script("document.getElementById('video').pause()")
-        time.sleep(0.5)
+        return self.wait_for_event("pause", action="video.pause();", done="video.paused")
 
     def seek_video(self, seconds):
-        self.driver.execute_script(f"document.getElementById('video').currentTime = {seconds}")
-        time.sleep(0.5)
+        return self.wait_for_event("seeked", action=f"video.currentTime = {float(seconds)};")
+
+    def get_state(self):
+        """Snapshot of playback and scroll state in one round trip"""
+        return self.driver.execute_script(STATE_JS)
+
+    def batch(self):
+        """Start a ScriptBatch of page actions sent as one script"""
+        return ScriptBatch(self)
 
     def get_current_time(self):
         return self.driver.execute_script("return document.getElementById('video').currentTime")
@@ -64,20 +211,46 @@ class VideoPage():
                                '<p>Lorem ipsum dolor sit amet...</p>'.repeat(50);
             document.body.appendChild(content);
         """)
-        time.sleep(0.5)
 
     def scroll_to_position(self, y_position):
         """scroll to position"""
-        self.driver.execute_script(f"window.scrollTo(0, {y_position})")
-        time.sleep(0.5)
-
-    def fail_with_screenshot(self, screenshot_name, logger):
-        screenshots_dir = os.path.join(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')), "reports", "screenshots")
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        path = os.path.join(screenshots_dir, f"{screenshot_name}_{timestamp}.png")
-        self.driver.save_screenshot(path)
-        logger.error(f"❌ 'failed'. Screenshot saved to: {path}")
-        raise AssertionError(f"failed. Screenshot: {path}")
+        y_position = int(y_position)
+        return self.wait_for_event(
+            "scroll",
+            action=f"window.scrollTo(0, {y_position});",
+            done=f"Math.abs(window.scrollY - Math.max(0, Math.min({y_position}, "
+                 f"document.documentElement.scrollHeight - window.innerHeight))) < 1",
+            target="window",
+        )
+
+    def smooth_scroll(self, distance, frames=60):
+        """scroll `distance` px spread over `frames` animation frames, like a user would"""
+        return self.driver.execute_async_script("""
+            const [distance, frames, done] = arguments;
+            const step = distance / frames;
+            let frame = 0;
+            const tick = () => {
+                window.scrollBy(0, step);
+                if (++frame < frames) requestAnimationFrame(tick);
+                else requestAnimationFrame(() => done(window.scrollY));
+            };
+            requestAnimationFrame(tick);
+        """, distance, frames)
+
+    def flush_events(self):
+        """send the page's queued (batched) events now; returns how many were queued"""
+        return self.driver.execute_script(
+            "return window.__eventPipeline ? window.__eventPipeline.flush() : 0"
+        )
+
+    def fail_with_screenshot(self, screenshot_name, logger, crop=False):
+        # Only the capture happens here; cropping, encoding and writing run
+        # on the store's worker, which logs the stored file. index.json maps
+        # the name to its file. `crop` keeps only the video element.
+        shot = self.screenshots.capture(self.driver, screenshot_name, crop=crop)
+        index = os.path.join(self.screenshots.directory, "index.json")
+        logger.error(f"❌ 'failed'. Screenshot {shot.name} queued (see {index})")
+        raise AssertionError(f"failed. Screenshot: {shot.name} in {index}")
 
 
 
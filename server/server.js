@@ -1,18 +1,143 @@
 const express = require('express');
 const bodyParser = require('body-parser');
+const fs = require('fs');
 const path = require('path');
+const { performance } = require('perf_hooks');
+const { StringDecoder } = require('string_decoder');
 
 const app = express();
+
+// Opt-in latency tracing: a request with X-Event-Trace gets the epoch-ms
+// marks of its arrival and of the reply in the reply's `trace` field.
+const traceNow = () => performance.timeOrigin + performance.now();
+
+app.use((req, res, next) => {
+  if (req.headers['x-event-trace']) req.receivedAt = traceNow();
+  next();
+});
+
+const withTrace = (req, reply) => req.receivedAt === undefined
+  ? reply
+  : { ...reply, trace: { receive: req.receivedAt, respond: traceNow() } };
+
+// Bulk events, registered before the global 100kb JSON parser. Accepts a
+// JSON array (application/json, or text/plain from navigator.sendBeacon)
+// or NDJSON (application/x-ndjson), which is parsed line by line as it
+// streams in. Replies with accepted/rejected counts and the rejected lines.
+const BULK_LIMIT = '64mb';
+const BULK_LIMIT_BYTES = 64 * 1024 * 1024;
+const MAX_BULK_ERRORS = 1000;
+
+const bulkResult = () => ({ received: 0, accepted: 0, rejected: 0, errors: [] });
+
+const rejectLine = (result, line, error) => {
+  result.rejected++;
+  if (result.errors.length < MAX_BULK_ERRORS) result.errors.push({ line, error });
+};
+
+const addLine = (result, line, event) => {
+  result.received++;
+  if (event && typeof event === 'object' && !Array.isArray(event)) {
+    result.accepted++;
+  } else {
+    rejectLine(result, line, 'expected a JSON object');
+  }
+};
+
+const sendBulkResult = (req, res, result) => {
+  console.log(`📦 Bulk events: ${result.accepted} accepted, ${result.rejected} rejected`);
+  res.status(200).send(withTrace(req, { ok: result.rejected === 0, ...result }));
+};
+
+const ingestNdjson = (req, res) => {
+  const result = bulkResult();
+  const decoder = new StringDecoder('utf8');
+  let pending = '';
+  let line = 0;
+  let size = 0;
+  let done = false;
+  const handleLine = (text) => {
+    line++;
+    if (!text.trim()) return;
+    let event;
+    try {
+      event = JSON.parse(text);
+    } catch (e) {
+      result.received++;
+      return rejectLine(result, line, e.message);
+    }
+    addLine(result, line, event);
+  };
+  req.on('data', (chunk) => {
+    if (done) return;
+    size += chunk.length;
+    if (size > BULK_LIMIT_BYTES) {
+      // Same bound as the JSON parsers; the rest of the upload is discarded.
+      done = true;
+      return res.status(413).send({ ok: false, error: `body larger than ${BULK_LIMIT}` });
+    }
+    const lines = (pending + decoder.write(chunk)).split('\n');
+    pending = lines.pop();
+    lines.forEach(handleLine);
+  });
+  req.on('end', () => {
+    if (done) return;
+    done = true;
+    pending += decoder.end();
+    if (pending) handleLine(pending);
+    sendBulkResult(req, res, result);
+  });
+  req.on('error', (e) => {
+    // The client aborted the upload; there is nobody left to answer.
+    if (done) return;
+    done = true;
+    console.log(`📦 Bulk upload aborted after ${result.received} events: ${e.message}`);
+  });
+};
+
+app.post('/api/events',
+  bodyParser.json({ limit: BULK_LIMIT }),
+  bodyParser.text({ type: 'text/plain', limit: BULK_LIMIT }),
+  (req, res) => {
+    if ((req.headers['content-type'] || '').includes('ndjson')) {
+      return ingestNdjson(req, res);
+    }
+    let events = req.body;
+    if (typeof events === 'string') {
+      try {
+        events = JSON.parse(events);
+      } catch (e) {
+        return res.status(400).send({ ok: false, error: e.message });
+      }
+    }
+    if (!Array.isArray(events)) {
+      return res.status(400).send({ ok: false, error: 'expected a JSON array' });
+    }
+    const result = bulkResult();
+    events.forEach((event, i) => addLine(result, i + 1, event));
+    sendBulkResult(req, res, result);
+  });
+
 app.use(bodyParser.json());
 
 app.use(express.static(path.join(__dirname, '../client')));
 
 app.post('/api/event', (req, res) => {
   console.log('📩 Event received:', req.body);
-  res.status(200).send({ ok: true });
+  res.status(200).send(withTrace(req, { ok: true }));
 });
 
 const PORT = process.env.PORT || 3000;
 app.listen(PORT, () => {
   console.log(`📺 Server is running at http://localhost:${PORT}`);
 });
+
+// Optional Unix-domain socket for co-located clients (EventAPI with an
+// http+unix:// base URL); a stale socket file from a previous run is removed.
+const SOCKET_PATH = process.env.SOCKET_PATH;
+if (SOCKET_PATH) {
+  if (fs.existsSync(SOCKET_PATH)) fs.unlinkSync(SOCKET_PATH);
+  app.listen(SOCKET_PATH, () => {
+    console.log(`📺 Server is also listening on ${SOCKET_PATH}`);
+  });
+}
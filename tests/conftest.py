@@ -1,34 +1,143 @@
 import pytest
 import logging
 import os
+import sys
 from datetime import datetime
 
+from tests.log_pipeline import LogPipeline, merge_run_logs
 
 
 PROJECT_ROOT = os.getenv("PROJECT_ROOT")
 if not PROJECT_ROOT:
     PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
+# Created on first use (LogPipeline, ScreenshotStore), never at import:
+# collecting a few API tests should not touch the disk.
 LOG_DIR = os.path.join(PROJECT_ROOT, "reports", "logs")
-SCREENSHOT_DIR = os.path.join(PROJECT_ROOT, "reports", "screenshots")
-
-os.makedirs(LOG_DIR, exist_ok=True)
-os.makedirs(SCREENSHOT_DIR, exist_ok=True)
-
-
-# === Setup logging to file and console ===
-log_file = os.path.join(LOG_DIR, f"log_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
+
+
 logger = logging.getLogger(__name__)
+log_pipeline = None
+
+
+def pytest_configure(config):
+    # Set once by the controller; xdist workers inherit it, so all of them
+    # write into the same run directory.
+    os.environ.setdefault("TEST_RUN_ID", datetime.now().strftime('%Y-%m-%d_%H-%M-%S'))
+    worker = os.getenv("PYTEST_XDIST_WORKER", "main")
+
+    # Optional plugins are imported only when asked for.
+    trace_path = config.getoption("--timing-trace")
+    if trace_path:
+        from tests.timing_plugin import TimingPlugin
+        os.makedirs(os.path.dirname(os.path.abspath(trace_path)), exist_ok=True)
+        config.pluginmanager.register(TimingPlugin(os.path.abspath(trace_path), worker), "timing")
+
+    if config.getoption("--lpt-schedule") and not hasattr(config, "workerinput"):
+        from tests.lpt_scheduler import LPTSchedulerPlugin
+        config.pluginmanager.register(
+            LPTSchedulerPlugin(config.getoption("--lpt-history"), os.path.join(PROJECT_ROOT, "results*.xml")),
+            "lpt_scheduler",
+        )
+
+
+# === Logging: JSON lines per worker, written off the test thread ===
+def pytest_sessionstart(session):
+    global log_pipeline
+    run_id = os.environ["TEST_RUN_ID"]
+    worker = os.getenv("PYTEST_XDIST_WORKER", "main")
+    log_pipeline = LogPipeline(os.path.join(LOG_DIR, f"run_{run_id}"), worker).start()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """Tag every record logged while a test runs with its nodeid and browser"""
+    callspec = getattr(item, "callspec", None)
+    log_pipeline.set_test(item.nodeid, callspec.params.get("setup_driver") if callspec else None)
+    yield
+    log_pipeline.set_test(None)
+
+
+def pytest_sessionfinish(session):
+    # Workers flush here, before xdist reports them finished; the controller
+    # (or a plain run) then merges every worker file into one run log.
+    # Screenshots exist only if a browser test imported pages.screenshots.
+    screenshots = sys.modules.get("pages.screenshots")
+    if screenshots is not None and screenshots.ScreenshotStore._default is not None:
+        screenshots.ScreenshotStore._default.flush(timeout=30)
+    log_pipeline.stop()
+    if not hasattr(session.config, "workerinput"):
+        run_id = os.environ["TEST_RUN_ID"]
+        merge_run_logs(log_pipeline.run_dir, os.path.join(LOG_DIR, f"log_{run_id}.jsonl"))
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--event-sink", action="store_true",
+        help="run API tests against the in-process Python event sink instead of localhost:3000"
+    )
+    parser.addoption(
+        "--timing-trace", metavar="PATH", default=None,
+        help="record step/WebDriver/HTTP spans and write a Chrome trace (chrome://tracing, ui.perfetto.dev) to PATH"
+    )
+    parser.addoption(
+        "--api-transport", choices=("http", "unix", "inproc"), default="http",
+        help="how the API suite's EventAPI reaches the server: pooled HTTP, a Unix socket "
+             "(EVENT_API_SOCKET, else a Python sink on a temporary socket) or in-process calls into the Python sink"
+    )
+    parser.addoption(
+        "--lpt-schedule", action="store_true",
+        help="with -n, give xdist workers longest-first bins of tests by historical duration, grouped by browser"
+    )
+    parser.addoption(
+        "--lpt-history", metavar="PATH", default=os.path.join(PROJECT_ROOT, "reports", "durations.json"),
+        help="duration history learned from results*.xml (default: reports/durations.json)"
+    )
 
 
 @pytest.fixture
 def test_logger():
     return logger
+
+
+@pytest.fixture(scope="session")
+def event_sink():
+    """In-process /api/event server on an ephemeral port"""
+    from api.event_sink import EventSinkServer
+    sink = EventSinkServer().start()
+    yield sink
+    sink.stop()
+
+
+@pytest.fixture(scope="session")
+def api_base_url(request):
+    """Base URL the API tests talk to"""
+    if request.config.getoption("--event-sink"):
+        return request.getfixturevalue("event_sink").url
+    return os.getenv("EVENT_API_URL", "http://localhost:3000")
+
+
+@pytest.fixture(scope="session")
+def api_transport(request, tmp_path_factory):
+    """EventAPI transport for the API tests (None = the shared pooled HTTP session)"""
+    from api.transports import InProcessTransport, UnixSocketTransport
+    kind = request.config.getoption("--api-transport")
+    if kind == "inproc":
+        return InProcessTransport(request.getfixturevalue("event_sink").handle)
+    if kind == "unix":
+        socket_path = os.getenv("EVENT_API_SOCKET")
+        if not socket_path:
+            from api.event_sink import EventSinkServer
+            socket_path = str(tmp_path_factory.mktemp("sink") / "events.sock")
+            sink = EventSinkServer(unix_path=socket_path, store=request.getfixturevalue("event_sink").store).start()
+            request.addfinalizer(sink.stop)
+        return UnixSocketTransport(socket_path)
+    return None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Expose each phase's report as item.rep_setup / rep_call / rep_teardown"""
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
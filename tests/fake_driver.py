@@ -0,0 +1,49 @@
+class FakeDriver():
+    """Stands in for a WebDriver in tests that need no browser.
+
+    execute_script / execute_async_script record (script, args) in
+    `scripts` and answer with `results` in order, then `default` once the
+    queue is empty. With `cdp` the driver also takes DevTools commands
+    (recorded in `cdp_commands`), like Chrome. Screenshots return `png`.
+    """
+
+    def __init__(self, results=(), default=None, cdp=False, png=None, browser="chrome"):
+        self.results = list(results)
+        self.default = default
+        self.png = png
+        self.browser = browser
+        self.scripts = []
+        self.script_timeouts = []
+        self.cdp_commands = []
+        self.visited = []
+        self.captures = 0
+        self.quit_called = False
+        if cdp:
+            self.execute_cdp_cmd = self._execute_cdp_cmd
+
+    def set_script_timeout(self, seconds):
+        self.script_timeouts.append(seconds)
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def execute_script(self, script, *args):
+        self.scripts.append((script, args))
+        return self.results.pop(0) if self.results else self.default
+
+    def execute_async_script(self, script, *args):
+        return self.execute_script(script, *args)
+
+    def get_screenshot_as_png(self):
+        self.captures += 1
+        return self.png
+
+    def maximize_window(self):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+    def _execute_cdp_cmd(self, command, params):
+        self.cdp_commands.append((command, params))
+        return {}
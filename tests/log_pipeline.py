@@ -0,0 +1,168 @@
+import copy
+import glob
+import heapq
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import shutil
+import sys
+from datetime import datetime
+
+
+STEP_PATTERN = re.compile(r"\bStep (\d+)\b")
+BROWSER_PATTERN = re.compile(r"^\[([A-Za-z]+)\]")
+CONSOLE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class RunContext():
+    """What the current test thread is running; read by ContextFilter"""
+
+    def __init__(self, worker):
+        self.worker = worker
+        self.nodeid = None
+        self.browser = None
+
+
+class ContextFilter(logging.Filter):
+    """Stamps records with worker/test context on the calling thread (cheap attribute copies only)"""
+
+    def __init__(self, context):
+        super().__init__()
+        self.context = context
+
+    def filter(self, record):
+        record.worker = self.context.worker
+        record.nodeid = self.context.nodeid
+        record.browser = self.context.browser
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record; step and browser are parsed here, on the listener thread"""
+
+    def format(self, record):
+        message = record.getMessage()
+        step = STEP_PATTERN.search(message)
+        browser = getattr(record, "browser", None)
+        if browser is None:
+            match = BROWSER_PATTERN.match(message)
+            browser = match.group(1).lower() if match else None
+        entry = {
+            "ts": record.created,
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "worker": getattr(record, "worker", None),
+            "nodeid": getattr(record, "nodeid", None),
+            "browser": browser,
+            "step": int(step.group(1)) if step else None,
+            "logger": record.name,
+            "message": message,
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RecordQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records with the traceback kept apart from the message.
+
+    The stock prepare() formats the traceback into `message` and drops
+    exc_info; here it goes into exc_text instead, so the listener's
+    formatters see the plain message and can write the traceback separately.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """Writes to whatever sys.stderr is at emit time, so pytest's capture applies"""
+
+    def __init__(self, level=logging.NOTSET):
+        logging.Handler.__init__(self, level)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+
+class LogPipeline():
+    """Queue-based logging: the test thread only enqueues, a listener thread writes.
+
+    The console handler stays on the test thread (root logger), so its
+    output lands in the captured output of the test that logged it.
+
+    Each process (xdist worker or plain pytest) writes `<worker>.jsonl` into
+    `run_dir`; the controller merges them into one time-ordered file at the end.
+    """
+
+    def __init__(self, run_dir, worker, level=logging.INFO, console=True):
+        self.run_dir = run_dir
+        self.worker = worker
+        self.context = RunContext(worker)
+        os.makedirs(run_dir, exist_ok=True)
+
+        file_handler = logging.FileHandler(os.path.join(run_dir, f"{worker}.jsonl"), encoding="utf-8")
+        file_handler.setFormatter(JsonLinesFormatter())
+        self._handlers = [file_handler]
+        self.console_handler = None
+        if console:
+            self.console_handler = ConsoleHandler()
+            self.console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+
+        self.queue = queue.SimpleQueue()
+        self.queue_handler = RecordQueueHandler(self.queue)
+        self.queue_handler.addFilter(ContextFilter(self.context))
+        self.listener = logging.handlers.QueueListener(self.queue, *self._handlers, respect_handler_level=True)
+        self.level = level
+
+    def start(self):
+        root = logging.getLogger()
+        root.addHandler(self.queue_handler)
+        if self.console_handler:
+            root.addHandler(self.console_handler)
+        root.setLevel(self.level)
+        self.listener.start()
+        return self
+
+    def stop(self):
+        """Drain the queue and close the files; safe to call twice"""
+        root = logging.getLogger()
+        if self.queue_handler in root.handlers:
+            root.removeHandler(self.queue_handler)
+            root.removeHandler(self.console_handler)
+            self.listener.stop()
+            for handler in self._handlers:
+                handler.close()
+
+    def set_test(self, nodeid, browser=None):
+        self.context.nodeid = nodeid
+        self.context.browser = browser
+
+
+def merge_run_logs(run_dir, target, remove=True):
+    """Merge per-worker JSON-lines files into one file ordered by timestamp"""
+    paths = sorted(glob.glob(os.path.join(run_dir, "*.jsonl")))
+    files = [open(path, encoding="utf-8") for path in paths]
+    try:
+        streams = [((json.loads(line)["ts"], line) for line in f if line.strip()) for f in files]
+        with open(target, "w", encoding="utf-8") as out:
+            for _, line in heapq.merge(*streams, key=lambda item: item[0]):
+                out.write(line if line.endswith("\n") else line + "\n")
+    finally:
+        for f in files:
+            f.close()
+    if remove:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return target
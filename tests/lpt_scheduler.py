@@ -0,0 +1,351 @@
+import glob
+import json
+import logging
+import os
+import re
+import xml.etree.ElementTree as ET
+from collections import deque
+
+import pytest
+
+
+BROWSERS = ("chrome", "firefox", "edge", "safari")
+# Seconds charged for starting another browser type on a worker.
+SWITCH_COST = 5.0
+DEFAULT_DURATION = 1.0
+EWMA_ALPHA = 0.3
+PREFETCH = 2
+
+logger = logging.getLogger(__name__)
+
+
+def junit_key(nodeid):
+    """The classname::name pair pytest's junitxml writes for a nodeid"""
+    path, bracket, params = nodeid.partition("[")
+    names = path.split("::")
+    names[0] = re.sub(r"\.py$", "", names[0].replace("/", "."))
+    names[-1] += bracket + params
+    return f"{'.'.join(names[:-1])}::{names[-1]}"
+
+
+def browser_of(nodeid):
+    """Browser named in the test's parameter id, or None"""
+    params = nodeid.partition("[")[2].rstrip("]")
+    for part in params.split("-"):
+        if part in BROWSERS:
+            return part
+    return None
+
+
+class DurationHistory():
+    """Per-test durations learned from JUnit XML files, kept in a small JSON file.
+
+    Each test keeps an exponentially weighted mean of its total time
+    (setup + call + teardown, which is what junitxml reports). Files are
+    remembered by path and mtime so a results file is only learned once.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tests = {}
+        self.sources = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            self.tests = data.get("tests", {})
+            self.sources = data.get("sources", {})
+
+    def record(self, key, seconds):
+        entry = self.tests.get(key)
+        if entry is None:
+            self.tests[key] = {"mean": seconds, "runs": 1}
+        else:
+            entry["mean"] += EWMA_ALPHA * (seconds - entry["mean"])
+            entry["runs"] += 1
+
+    def ingest_junit(self, path):
+        """Learn from one results XML; returns the number of test cases read"""
+        mtime = os.path.getmtime(path)
+        if self.sources.get(os.path.abspath(path)) == mtime:
+            return 0
+        try:
+            root = ET.parse(path).getroot()
+        except ET.ParseError as e:
+            logger.warning(f"Skipping unreadable JUnit file {path}: {e}")
+            return 0
+        count = 0
+        for case in root.iter("testcase"):
+            if case.find("skipped") is not None or case.get("time") is None:
+                continue
+            self.record(f"{case.get('classname', '')}::{case.get('name', '')}", float(case.get("time")))
+            count += 1
+        self.sources[os.path.abspath(path)] = mtime
+        return count
+
+    def ingest(self, pattern):
+        return sum(self.ingest_junit(path) for path in sorted(glob.glob(pattern)))
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({"tests": self.tests, "sources": self.sources}, f, indent=1, sort_keys=True)
+
+    def estimate(self, nodeid):
+        """Expected seconds for a test: its own history, else its siblings' (other params), else the median"""
+        key = junit_key(nodeid)
+        if key in self.tests:
+            return self.tests[key]["mean"]
+        base = key.partition("[")[0]
+        siblings = [e["mean"] for k, e in self.tests.items() if k.partition("[")[0] == base]
+        if siblings:
+            return sum(siblings) / len(siblings)
+        if self.tests:
+            means = sorted(e["mean"] for e in self.tests.values())
+            return means[len(means) // 2]
+        return DEFAULT_DURATION
+
+
+def _greedy(durations, groups, workers, switch_cost, items=None, bins=None, loads=None):
+    """LPT: longest first, each onto the bin that finishes it earliest (switches included)"""
+    items = range(len(durations)) if items is None else items
+    bins = bins if bins is not None else [[] for _ in range(workers)]
+    loads = loads if loads is not None else [0.0] * len(bins)
+    for index in sorted(items, key=lambda i: (-durations[i], i)):
+        group = groups[index]
+
+        def cost(b):
+            seen = group is None or any(groups[i] == group for i in bins[b])
+            return loads[b] + (0.0 if seen else switch_cost) + durations[index]
+
+        target = min(range(len(bins)), key=lambda b: (cost(b), b))
+        loads[target] = cost(target)
+        bins[target].append(index)
+    return bins, loads
+
+
+def _partitioned(durations, groups, workers, switch_cost):
+    """Workers split between groups in proportion to their work (D'Hondt), then LPT per group"""
+    totals = {}
+    for index, group in enumerate(groups):
+        totals[group] = totals.get(group, 0.0) + durations[index]
+    shares = dict.fromkeys(totals, 1)
+    for _ in range(workers - len(totals)):
+        group = max(totals, key=lambda g: totals[g] / shares[g])
+        shares[group] += 1
+    bins, loads = [], []
+    for group, share in shares.items():
+        items = [i for i, g in enumerate(groups) if g == group]
+        group_bins, group_loads = _greedy(durations, groups, share, switch_cost, items)
+        bins += group_bins
+        loads += group_loads
+    return bins, loads
+
+
+def lpt_plan(durations, groups, workers, switch_cost=SWITCH_COST):
+    """Longest-processing-time-first bin packing with group affinity.
+
+    Two plans are compared and the one with the smaller makespan wins:
+    plain LPT, where starting a group a bin has not run yet costs
+    `switch_cost`, and a partition that gives every group its own workers
+    (in proportion to the group's total time) and packs each with LPT.
+    Returns (bins, loads); each bin is ordered group by group, longest
+    first, so a worker finishes one browser before starting the next.
+    """
+    bins, loads = _greedy(durations, groups, workers, switch_cost)
+    if 1 < len(set(groups)) <= workers:
+        split_bins, split_loads = _partitioned(durations, groups, workers, switch_cost)
+        if max(split_loads) <= max(loads):
+            bins, loads = split_bins, split_loads
+    for items in bins:
+        order = {}
+        for index in items:
+            order.setdefault(groups[index], len(order))
+        items.sort(key=lambda i: (order[groups[i]], -durations[i], i))
+    return bins, loads
+
+
+class LPTScheduling():
+    """xdist scheduler that hands each worker a precomputed LPT bin.
+
+    Workers are kept `PREFETCH` tests ahead (a worker needs to know its next
+    test before finishing the current one). A worker that runs out of its
+    own bin takes the last queued test of the busiest other worker,
+    preferring one for the browser it already has open, so a bad estimate
+    costs at most one test's worth of imbalance.
+    """
+
+    def __init__(self, config, log=None, history=None, numnodes=None, switch_cost=SWITCH_COST):
+        if numnodes is None:
+            from xdist.workermanage import parse_spec_config
+            numnodes = len(parse_spec_config(config))
+        self.numnodes = numnodes
+        self.config = config
+        self.log = log.lptsched if log is not None else logger.debug
+        self.history = history
+        self.switch_cost = switch_cost
+        self.node2collection = {}
+        self.node2pending = {}
+        self.node2queue = {}
+        self.node2group = {}
+        self.collection = None
+        self.estimates = []
+        self.groups = []
+        self.planned_makespan = None
+
+    @property
+    def nodes(self):
+        return list(self.node2pending)
+
+    @property
+    def collection_is_completed(self):
+        return len(self.node2collection) >= self.numnodes
+
+    @property
+    def tests_finished(self):
+        if not self.collection_is_completed or any(self.node2queue.values()):
+            return False
+        return all(len(pending) < 2 for pending in self.node2pending.values())
+
+    @property
+    def has_pending(self):
+        return any(self.node2queue.values()) or any(self.node2pending.values())
+
+    def add_node(self, node):
+        assert node not in self.node2pending
+        self.node2pending[node] = []
+        self.node2queue[node] = deque()
+
+    def add_node_collection(self, node, collection):
+        assert node in self.node2pending
+        if self.collection_is_completed and self.collection is not None and list(collection) != self.collection:
+            self.log(f"node {node.gateway.id} collected different tests, not scheduling on it")
+            return
+        self.node2collection[node] = list(collection)
+
+    def schedule(self):
+        assert self.collection_is_completed
+        if self.collection is not None:
+            for node in self.nodes:
+                self._fill(node)
+            return
+        collections = list(self.node2collection.values())
+        if any(c != collections[0] for c in collections[1:]):
+            self._report_collection_diff()
+            return
+        self.collection = collections[0]
+        if not self.collection:
+            return
+        self.groups = [browser_of(nodeid) for nodeid in self.collection]
+        self.estimates = [self.history.estimate(nodeid) if self.history else DEFAULT_DURATION
+                          for nodeid in self.collection]
+        nodes = self.nodes
+        bins, loads = lpt_plan(self.estimates, self.groups, len(nodes), self.switch_cost)
+        self.planned_makespan = max(loads)
+        for node, items in zip(nodes, bins):
+            self.node2queue[node].extend(items)
+        self.log(f"LPT plan over {len(nodes)} workers, estimated makespan {self.planned_makespan:.1f}s")
+        for node in nodes:
+            self._fill(node)
+
+    def mark_test_complete(self, node, item_index, duration=0):
+        self.node2pending[node].remove(item_index)
+        self._fill(node)
+
+    def mark_test_pending(self, item):
+        index = self.collection.index(item)
+        node = min(self.nodes, key=self._remaining)
+        self.node2queue[node].appendleft(index)
+        for node in self.nodes:
+            self._fill(node)
+
+    def remove_node(self, node):
+        pending = self.node2pending.pop(node)
+        queue = self.node2queue.pop(node)
+        self.node2group.pop(node, None)
+        if not pending and not queue:
+            return None
+        crashitem = self.collection[pending.pop(0)] if pending else None
+        for index in list(pending) + list(queue):
+            target = min(self.node2queue, key=self._remaining, default=None)
+            if target is None:
+                break
+            self.node2queue[target].append(index)
+        for other in self.nodes:
+            self._fill(other)
+        return crashitem
+
+    def _remaining(self, node):
+        return sum(self.estimates[i] for i in self.node2queue[node])
+
+    def _steal(self, node):
+        """Take the last queued test of the busiest other worker, same browser first"""
+        victims = sorted((n for n in self.node2queue if n is not node and self.node2queue[n]),
+                         key=self._remaining, reverse=True)
+        if not victims:
+            return None
+        group = self.node2group.get(node)
+        for victim in victims:
+            queue = self.node2queue[victim]
+            for position in range(len(queue) - 1, -1, -1):
+                if self.groups[queue[position]] == group:
+                    index = queue[position]
+                    del queue[position]
+                    return index
+        return self.node2queue[victims[0]].pop()
+
+    def _fill(self, node):
+        if node.shutting_down:
+            return
+        pending = self.node2pending[node]
+        batch = []
+        while len(pending) + len(batch) < PREFETCH:
+            queue = self.node2queue[node]
+            index = queue.popleft() if queue else self._steal(node)
+            if index is None:
+                break
+            batch.append(index)
+            self.node2group[node] = self.groups[index]
+        if batch:
+            pending.extend(batch)
+            node.send_runtest_some(batch)
+        if not any(self.node2queue.values()):
+            node.shutdown()
+
+    def _report_collection_diff(self):
+        from _pytest.runner import CollectReport
+        from xdist.report import report_collection_diff
+
+        (first, collection), *others = self.node2collection.items()
+        for node, other in others:
+            msg = report_collection_diff(collection, other, first.gateway.id, node.gateway.id)
+            if msg:
+                self.log(msg)
+                self.config.hook.pytest_collectreport(
+                    report=CollectReport(node.gateway.id, "failed", longrepr=msg, result=[]))
+
+
+class LPTSchedulerPlugin():
+    """Registered on the xdist controller by `--lpt-schedule`"""
+
+    def __init__(self, history_path, junit_pattern):
+        self.history = DurationHistory(history_path)
+        self.junit_pattern = junit_pattern
+        self.scheduler = None
+
+    def pytest_configure(self, config):
+        learned = self.history.ingest(self.junit_pattern)
+        if learned:
+            self.history.save()
+        logger.info(f"LPT history: {len(self.history.tests)} tests known ({learned} new results)")
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_make_scheduler(self, config, log):
+        self.scheduler = LPTScheduling(config, log, history=self.history)
+        return self.scheduler
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.scheduler is not None and self.scheduler.planned_makespan is not None:
+            terminalreporter.write_line(
+                f"LPT schedule: {len(self.scheduler.collection)} tests on {len(self.scheduler.node2collection)} "
+                f"workers, estimated makespan {self.scheduler.planned_makespan:.1f}s"
+            )
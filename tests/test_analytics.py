@@ -0,0 +1,120 @@
+import pytest
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analytics.sessions import (EventColumns, viewer_metrics, metrics_to_records, synthetic_columns, write_jsonl,
+                                _decode_block_fast, _decode_block_json)
+
+
+def event(user, event_type, second, video_time):
+    return {"userId": user, "type": event_type, "videoTime": video_time,
+            "timestamp": f"2025-07-21T19:30:{second:02d}.000Z"}
+
+
+SESSION = [
+    event("user-a", "play", 0, 0.0),
+    event("user-b", "scroll", 0, 0.0),
+    event("user-a", "scroll", 5, 5.0),
+    event("user-b", "play", 1, 0.0),
+    event("user-a", "pause", 10, 10.0),
+    event("user-b", "scroll", 2, 1.0),
+    event("user-a", "play", 13, 10.0),
+    event("user-a", "seeked", 15, 50.0),
+    event("user-a", "pause", 20, 55.0),
+    {"userId": "user-b", "type": "pause", "videoTime": 3.0, "timestamp": "not-a-timestamp"},
+]
+
+
+def rows(columns):
+    """(userId, type, videoTime, timestamp) per event, NaN videoTime as None"""
+    return [(columns.users[u], columns.types[t], None if v != v else v, ts)
+            for u, t, v, ts in zip(columns.user, columns.type, columns.video_time.tolist(), columns.timestamp.tolist())]
+
+
+class TestViewerMetrics:
+    """Analytics tests - per-user metrics on a handcrafted session"""
+
+    def test_per_user_metrics(self, test_logger):
+        """Test watch time, seeks, pause dwell and scroll ratio"""
+        test_logger.info("Step 1: Load events into columns")
+        columns = EventColumns.from_events(SESSION)
+        assert len(columns) == len(SESSION)
+
+        test_logger.info("Step 2: Compute metrics")
+        records = {r["userId"]: r for r in metrics_to_records(viewer_metrics(columns))}
+
+        test_logger.info("Step 3: Validate user-a")
+        a = records["user-a"]
+        assert a["watch_time"] == pytest.approx(17.0)
+        assert a["seeks"] == 1
+        assert a["seek_distance"] == pytest.approx(38.0)
+        assert a["pauses"] == 2
+        assert a["pause_dwell"] == pytest.approx(3.0)
+        assert a["scroll_while_playing_ratio"] == 1.0
+
+        test_logger.info("Step 4: Validate user-b (malformed timestamp ignored)")
+        b = records["user-b"]
+        assert b["events"] == 3
+        assert b["watch_time"] == pytest.approx(1.0)
+        assert b["pauses"] == 0
+        assert b["scroll_while_playing_ratio"] == 0.5
+
+    def test_loaders_agree(self, tmp_path, test_logger):
+        """Test JSONL and array loaders produce the same metrics"""
+        path = tmp_path / "events.jsonl"
+        path.write_text("\n".join(json.dumps(e) for e in SESSION[:-1]) + "\n\n")
+        valid = SESSION[:-1]
+        from_file = viewer_metrics(EventColumns.from_jsonl(str(path)))
+        from_arrays = viewer_metrics(EventColumns.from_arrays(
+            [e["userId"] for e in valid], [e["type"] for e in valid],
+            [e["videoTime"] for e in valid], [e["timestamp"] for e in valid],
+        ))
+        assert metrics_to_records(from_file) == metrics_to_records(from_arrays)
+
+    def test_jsonl_edge_cases(self, tmp_path, test_logger):
+        """Test the vectorized and json.loads block decoders agree with from_events"""
+        odd = [
+            {"userId": "user-\u00e9 \"quoted\"", "type": "play", "videoTime": 1.5, "timestamp": "2025-07-21T19:30:00Z"},
+            {"userId": "user-a", "type": "pause", "videoTime": None, "timestamp": "2025-07-21T19:30:01.000Z"},
+            {"timestamp": "2025-07-21T19:30:02.000Z", "type": "scroll", "userId": "user-b", "videoTime": 2},
+            {"userId": "user-a", "type": "seeked", "videoTime": 1e3, "timestamp": "2025-07-21T19:30:03+01:00"},
+        ]
+        uniform = [json.dumps(e) for e in SESSION] + [json.dumps(e, separators=(",", ":")) for e in SESSION]
+        path = tmp_path / "events.jsonl"
+        path.write_text("\n".join(uniform[:5] + [json.dumps(e) for e in odd] + ["", "{not json", "[1, 2]"]
+                                  + uniform[5:]) + "\n")
+        expected = rows(EventColumns.from_events(SESSION[:5] + odd + [{}] + SESSION[5:] + SESSION))
+
+        test_logger.info("Step 1: A uniform block takes the vectorized path and matches json.loads")
+        block = ("\n".join(json.dumps(e) for e in SESSION) + "\n").encode()
+        fast = _decode_block_fast(block)
+        assert fast is not None
+        assert rows(EventColumns(*fast)) == rows(EventColumns(*_decode_block_json(block)))
+        assert _decode_block_fast(block.rstrip(b"\n")) is not None
+
+        test_logger.info("Step 2: Load the mixed file in one block and in many small ones")
+        for block_bytes in (1 << 20, 64, 300):
+            columns = EventColumns.from_jsonl(str(path), block_bytes=block_bytes)
+            assert rows(columns) == expected, f"block_bytes={block_bytes}"
+
+    def test_jsonl_round_trip(self, tmp_path, test_logger):
+        """Test write_jsonl output loads back into the same columns"""
+        columns = synthetic_columns(50_000, 500, seed=5)
+        path = tmp_path / "synthetic.jsonl"
+        write_jsonl(columns, str(path))
+        loaded = EventColumns.from_jsonl(str(path), block_bytes=1 << 20)
+        assert len(loaded) == len(columns)
+        assert [loaded.users[u] for u in loaded.user] == [columns.users[u] for u in columns.user]
+        assert (loaded.video_time == columns.video_time).all()
+        assert (loaded.timestamp == columns.timestamp).all()
+        by_user = {r["userId"]: r for r in metrics_to_records(viewer_metrics(columns))}
+        assert {r["userId"]: r for r in metrics_to_records(viewer_metrics(loaded))} == by_user
+
+    def test_synthetic_scale(self, test_logger):
+        """Test a larger synthetic stream keeps counts consistent"""
+        columns = synthetic_columns(200_000, 1_000, seed=3)
+        metrics = viewer_metrics(columns)
+        assert metrics["events"].sum() == 200_000
+        assert (metrics["watch_time"] >= 0).all()
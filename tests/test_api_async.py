@@ -0,0 +1,70 @@
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api.async_event_api import AsyncEventAPI
+
+
+class TestAsyncAPI:
+    """Async API tests - concurrent sends over pooled connections"""
+
+    def test_send_play_event(self, test_logger, api_base_url):
+        """Test sending valid play event asynchronously"""
+
+        async def scenario():
+            async with AsyncEventAPI(api_base_url) as api:
+                return await api.send_event(event_type="play", video_time=0.0)
+
+        test_logger.info("Step 1: Send play event to API")
+        response = asyncio.run(scenario())
+
+        test_logger.info("Step 2: Validate response")
+        assert response.status_code == 200, f"Failed: {response.text}"
+        assert response.json().get('ok') == True
+        test_logger.info(f" passed Response body: {response.json()}")
+
+    def test_send_many_bounded_concurrency(self, test_logger, api_base_url):
+        """Test send_many returns ordered results and reuses connections"""
+        concurrency = 8
+        events = [
+            {
+                "userId": f"user-{i % 5}",
+                "type": ["play", "pause", "seeked", "scroll"][i % 4],
+                "videoTime": float(i),
+                "timestamp": "2025-07-21T19:30:45.123Z"
+            }
+            for i in range(200)
+        ]
+
+        async def scenario():
+            async with AsyncEventAPI(api_base_url) as api:
+                results = await api.send_many(events, concurrency=concurrency)
+                return results, api.connections_opened
+
+        test_logger.info(f"Step 1: Send {len(events)} events with concurrency {concurrency}")
+        results, opened = asyncio.run(scenario())
+
+        test_logger.info("Step 2: Validate per-event results")
+        assert [r.index for r in results] == list(range(len(events)))
+        failed = [r for r in results if r.status_code != 200]
+        assert not failed, f"{len(failed)} events failed, first: {failed[0]}"
+        assert all(r.latency > 0 for r in results)
+
+        test_logger.info("Step 3: Validate connection reuse")
+        assert opened <= concurrency, f"Opened {opened} connections for concurrency {concurrency}"
+        test_logger.info(f" passed {len(results)} events over {opened} connections")
+
+    def test_send_many_connection_refused(self, test_logger):
+        """Test send_many reports errors instead of raising"""
+
+        async def scenario():
+            async with AsyncEventAPI(base_url="http://127.0.0.1:1") as api:
+                return await api.send_many([{"type": "play"}] * 3, concurrency=2)
+
+        test_logger.info("Step 1: Send events to a closed port")
+        results = asyncio.run(scenario())
+
+        test_logger.info("Step 2: Validate errors are reported per event")
+        assert len(results) == 3
+        assert all(r.status_code is None and r.error is not None for r in results)
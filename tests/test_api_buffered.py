@@ -0,0 +1,99 @@
+import pytest
+import sys
+import os
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api import buffered_event_api
+from api.buffered_event_api import BufferedEventAPI, EventQueueFull
+
+
+class TestBufferedAPI:
+    """Buffered API tests - background batching and backpressure"""
+
+    def test_send_returns_without_waiting(self, test_logger, api_base_url):
+        """Test events are queued and delivered on flush"""
+        with BufferedEventAPI(api_base_url, batch_size=10, flush_interval=0.2) as api:
+            test_logger.info("Step 1: Queue 50 events")
+            start = time.perf_counter()
+            for i in range(50):
+                assert api.send_event(event_type="play" if i % 2 == 0 else "pause",
+                                      video_time=float(i)) is None
+            queued_in = time.perf_counter() - start
+
+            test_logger.info("Step 2: Flush and validate delivery")
+            assert api.flush(timeout=10), "flush timed out"
+            assert api.sent == 50, f"sent={api.sent} failed={api.failed} last_error={api.last_error}"
+            assert api.failed == 0
+            assert api.pending == 0
+            test_logger.info(f" passed Queued 50 events in {queued_in * 1000:.2f} ms")
+
+    def test_time_trigger(self, test_logger, api_base_url):
+        """Test a partial batch is sent after flush_interval"""
+        with BufferedEventAPI(api_base_url, batch_size=100, flush_interval=0.1) as api:
+            test_logger.info("Step 1: Queue fewer events than a batch")
+            api.send_event(event_type="seeked", video_time=1.0)
+
+            test_logger.info("Step 2: Wait for the interval flush")
+            deadline = time.monotonic() + 5
+            while api.sent < 1 and time.monotonic() < deadline:
+                time.sleep(0.02)
+            assert api.sent == 1
+
+    def test_backpressure_raise(self, test_logger, api_base_url):
+        """Test 'raise' policy when the queue is full"""
+        api = BufferedEventAPI(api_base_url, max_queue=5, batch_size=100, flush_interval=60, backpressure="raise")
+        test_logger.info("Step 1: Fill the queue")
+        for i in range(5):
+            api.send_event(event_type="scroll", video_time=float(i))
+
+        test_logger.info("Step 2: Next event must raise")
+        with pytest.raises(EventQueueFull):
+            api.send_event(event_type="scroll", video_time=5.0)
+
+        test_logger.info("Step 3: Close delivers the queued events")
+        api.close()
+        assert api.sent == 5
+
+    def test_backpressure_drop_oldest(self, test_logger, api_base_url):
+        """Test 'drop_oldest' policy keeps the newest events"""
+        api = BufferedEventAPI(api_base_url, max_queue=3, batch_size=100, flush_interval=60, backpressure="drop_oldest")
+        test_logger.info("Step 1: Queue more events than fit")
+        for i in range(5):
+            api.send_event(event_type="scroll", video_time=float(i))
+
+        test_logger.info("Step 2: Validate oldest events were dropped")
+        assert api.dropped == 2
+        assert [e["videoTime"] for e in api._queue] == [2.0, 3.0, 4.0]
+        api.close()
+        assert api.sent == 3
+
+    def test_backpressure_block_timeout(self, test_logger, api_base_url):
+        """Test 'block' policy gives up after block_timeout"""
+        api = BufferedEventAPI(api_base_url, max_queue=1, batch_size=100, flush_interval=60,
+                               backpressure="block", block_timeout=0.05)
+        api.send_event(event_type="play")
+        test_logger.info("Step 1: Blocked send times out")
+        with pytest.raises(EventQueueFull):
+            api.send_event(event_type="pause")
+        api.close()
+        assert api.sent == 1
+
+    def test_exit_hook_registered_once(self, test_logger, api_base_url):
+        """Test instances share one atexit hook that closes only those still open"""
+        test_logger.info("Step 1: Open a few instances, then close them")
+        with mock.patch("atexit.register") as register:
+            apis = [BufferedEventAPI(api_base_url) for _ in range(3)]
+        register.assert_not_called()
+        assert all(api in buffered_event_api._open_apis for api in apis)
+        for api in apis:
+            api.close()
+        assert not any(api in buffered_event_api._open_apis for api in apis)
+
+        test_logger.info("Step 2: The exit hook delivers what an unclosed instance still holds")
+        api = BufferedEventAPI(api_base_url, batch_size=100, flush_interval=60)
+        api.send_event(event_type="play")
+        buffered_event_api._close_at_exit()
+        assert api.sent == 1
+        assert api not in buffered_event_api._open_apis
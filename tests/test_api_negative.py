@@ -4,13 +4,19 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from api.event_api import EventAPI
+from api.schema import EventValidationError, validate_event
+
+
+def schema_problems(event_data):
+    """{field: message} for every contract violation of an event"""
+    return {error.field: error.message for error in validate_event(event_data)}
 
 class TestAPINegative:
     """Negative API tests - invalid data"""
 
     @pytest.fixture(autouse=True)
-    def setup(self, test_logger):
-        self.api = EventAPI()
+    def setup(self, test_logger, api_base_url, api_transport):
+        self.api = EventAPI(api_base_url, transport=api_transport)
 
     def test_missing_user_id(self, test_logger):
         """Test event without userId field"""
@@ -29,6 +35,9 @@ class TestAPINegative:
             f"Unexpected status: {response.status_code}"
         test_logger.warning(f"   Server accepts missing userId: {response.status_code}")
 
+        test_logger.info("Step 4: Validate against the event schema")
+        assert schema_problems(event_data) == {"userId": "is required"}
+
     def test_missing_type(self, test_logger):
         """Test event without type field"""
         test_logger.info("Step 1: Create event without type")
@@ -41,6 +50,7 @@ class TestAPINegative:
         test_logger.info("Step 2: Send and validate")
         response = self.api.send_custom_event(event_data)
         test_logger.warning(f"   Missing type response: {response.status_code}")
+        assert schema_problems(event_data) == {"type": "is required"}
 
     def test_missing_video_time(self, test_logger):
         """Test event without videoTime field"""
@@ -53,6 +63,7 @@ class TestAPINegative:
 
         response = self.api.send_custom_event(event_data)
         test_logger.warning(f"   Missing videoTime response: {response.status_code}")
+        assert schema_problems(event_data) == {"videoTime": "is required"}
 
     def test_missing_timestamp(self, test_logger):
         """Test event without timestamp field"""
@@ -65,12 +76,14 @@ class TestAPINegative:
 
         response = self.api.send_custom_event(event_data)
         test_logger.warning(f"   Missing timestamp response: {response.status_code}")
+        assert schema_problems(event_data) == {"timestamp": "is required"}
 
     def test_empty_payload(self, test_logger):
         """Test completely empty payload"""
         test_logger.info("Testing empty payload")
         response = self.api.send_custom_event({})
         test_logger.warning(f"   Empty payload response: {response.status_code}")
+        assert set(schema_problems({})) == {"userId", "type", "videoTime", "timestamp"}
 
     def test_null_values(self, test_logger):
         """Test with null values"""
@@ -84,6 +97,7 @@ class TestAPINegative:
 
         response = self.api.send_custom_event(event_data)
         test_logger.warning(f"   Null values response: {response.status_code}")
+        assert set(schema_problems(event_data).values()) == {"must not be null"}
 
     def test_wrong_type_video_time(self, test_logger):
         """Test videoTime with wrong type (string instead of number)"""
@@ -97,6 +111,7 @@ class TestAPINegative:
 
         response = self.api.send_custom_event(event_data)
         test_logger.warning(f"   Wrong videoTime type response: {response.status_code}")
+        assert schema_problems(event_data) == {"videoTime": "must be a number"}
 
     def test_negative_video_time(self, test_logger):
         """Test negative videoTime"""
@@ -110,6 +125,7 @@ class TestAPINegative:
 
         response = self.api.send_custom_event(event_data)
         test_logger.warning(f"   Negative videoTime response: {response.status_code}")
+        assert schema_problems(event_data) == {"videoTime": "must be >= 0"}
 
     def test_invalid_event_type(self, test_logger):
         """Test invalid event type"""
@@ -123,6 +139,7 @@ class TestAPINegative:
 
         response = self.api.send_custom_event(event_data)
         test_logger.warning(f"   Invalid event type response: {response.status_code}")
+        assert list(schema_problems(event_data)) == ["type"]
 
     def test_malformed_timestamp(self, test_logger):
         """Test malformed timestamp"""
@@ -136,6 +153,7 @@ class TestAPINegative:
 
         response = self.api.send_custom_event(event_data)
         test_logger.warning(f"   Malformed timestamp response: {response.status_code}")
+        assert schema_problems(event_data) == {"timestamp": "must be an ISO-8601 timestamp"}
 
     def test_extra_fields(self, test_logger):
         """Test event with extra unexpected fields"""
@@ -152,6 +170,7 @@ class TestAPINegative:
         response = self.api.send_custom_event(event_data)
         test_logger.info(f"   Extra fields response: {response.status_code}")
         test_logger.info(f"   Server accepts extra fields: {response.status_code == 200}")
+        assert schema_problems(event_data) == {}
 
     def test_wrong_content_type(self, test_logger):
         """Test sending with wrong content type"""
@@ -181,4 +200,16 @@ class TestAPINegative:
 
         response = self.api.send_custom_event(event_data)
         test_logger.info(f"   Special characters response: {response.status_code}")
-        test_logger.info("    Server handles special characters safely")
\ No newline at end of file
+        test_logger.info("    Server handles special characters safely")
+        assert list(schema_problems(event_data)) == ["type"]
+
+    def test_client_side_validation(self, test_logger):
+        """Test EventAPI(validate=True) refuses invalid events before sending"""
+        test_logger.info("Step 1: Send an invalid event with validation on")
+        api = EventAPI(self.api.base_url, validate=True, transport=self.api.transport)
+        with pytest.raises(EventValidationError) as error:
+            api.send_custom_event({"userId": "user-123", "type": "play", "videoTime": -1.0})
+
+        test_logger.info("Step 2: Validate the reported problems")
+        assert {e.field for e in error.value.errors} == {"videoTime", "timestamp"}
+        assert api.send_event("play", 1.0).status_code == 200
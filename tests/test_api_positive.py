@@ -1,6 +1,7 @@
 import pytest
 import sys
 import os
+import json
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from api.event_api import EventAPI
@@ -10,8 +11,8 @@ class TestAPIPositive:
     """Positive API tests - valid data"""
 
     @pytest.fixture(autouse=True)
-    def setup(self, test_logger):
-        self.api = EventAPI()
+    def setup(self, test_logger, api_base_url, api_transport):
+        self.api = EventAPI(api_base_url, transport=api_transport)
 
     def test_send_play_event(self, test_logger):
         """Test sending valid play event"""
@@ -126,4 +127,43 @@ class TestAPIPositive:
 
         test_logger.info(f"Step 2: Validate all events sent")
         assert success_count == 6, f"Only {success_count}/10 events succeeded"
-        test_logger.info(f" passed  All 6 events sent successfully")
\ No newline at end of file
+        test_logger.info(f" passed  All 6 events sent successfully")
+
+    def test_send_event_batch(self, test_logger):
+        """Test posting a batch of scroll events as JSON and as a text/plain beacon"""
+        batch = [{"userId": "user-123", "type": "scroll", "videoTime": float(i),
+                  "timestamp": "2025-07-21T19:30:00.000Z"} for i in range(5)]
+
+        test_logger.info("Step 1: Send batch as application/json")
+        response = self.api.post("/api/events", batch)
+        assert response.status_code == 200
+        assert response.json() == {"ok": True, "received": 5, "accepted": 5, "rejected": 0, "errors": []}
+
+        test_logger.info("Step 2: Send batch the way sendBeacon does")
+        response = self.api.session.post(f"{self.api.base_url}/api/events", data=json.dumps(batch[:2]),
+                                         headers={"Content-Type": "text/plain;charset=UTF-8"})
+        assert response.status_code == 200
+        assert response.json()["received"] == 2
+        test_logger.info(" passed Batches accepted")
+
+    def test_send_events_streamed(self, test_logger):
+        """Test streaming a generator of events as NDJSON with per-line results"""
+        def events():
+            for i in range(2500):
+                if i in (10, 2000):
+                    yield ["not", "an", "object"]
+                else:
+                    yield {"userId": f"user-{i % 7}", "type": "scroll", "videoTime": float(i),
+                           "timestamp": "2025-07-21T19:30:00.000Z"}
+
+        test_logger.info("Step 1: Stream 2500 events in chunks")
+        response = self.api.send_events(events(), chunk_events=400)
+        assert response.status_code == 200
+        assert response.request.headers.get("Transfer-Encoding") == "chunked"
+
+        test_logger.info("Step 2: Validate per-line results")
+        result = response.json()
+        assert result["received"] == 2500
+        assert result["accepted"] == 2498
+        assert [e["line"] for e in result["errors"]] == [11, 2001]
+        assert result["ok"] is False
@@ -0,0 +1,82 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from drivers.pool import DriverPool
+from tests.fake_driver import FakeDriver
+
+
+def fake_factory(browser, launched):
+    def factory(logger):
+        driver = FakeDriver(browser=browser)
+        launched.append(driver)
+        return driver
+    return factory
+
+
+class TestDriverPool:
+    """Driver pool tests - reuse and recycling without a real browser"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, test_logger):
+        self.launched = []
+        self.pool = DriverPool(
+            {"chrome": fake_factory("chrome", self.launched),
+             "firefox": fake_factory("firefox", self.launched)},
+            max_uses=3,
+            logger=test_logger,
+        )
+
+    def test_reuse_per_browser(self, test_logger):
+        """Test a released driver is handed out again for the same browser"""
+        test_logger.info("Step 1: Acquire and release a chrome driver")
+        first = self.pool.acquire("chrome")
+        self.pool.release("chrome", first)
+
+        test_logger.info("Step 2: Acquire chrome and firefox")
+        assert self.pool.acquire("chrome") is first
+        other = self.pool.acquire("firefox")
+        assert other.browser == "firefox"
+        assert len(self.launched) == 2
+
+    def test_recycle_after_max_uses(self, test_logger):
+        """Test a driver is quit after max_uses tests"""
+        test_logger.info("Step 1: Use one driver max_uses times")
+        for _ in range(3):
+            driver = self.pool.acquire("chrome")
+            self.pool.release("chrome", driver)
+
+        test_logger.info("Step 2: Validate it was quit and replaced")
+        assert driver.quit_called
+        assert self.pool.acquire("chrome") is not driver
+        assert len(self.launched) == 2
+
+    def test_recycle_on_failure(self, test_logger):
+        """Test a driver is quit when its test failed"""
+        driver = self.pool.acquire("chrome")
+        self.pool.release("chrome", driver, failed=True)
+        assert driver.quit_called
+        assert self.pool.acquire("chrome") is not driver
+
+    def test_unavailable_browser_fails_fast(self, test_logger):
+        """Test a failed launch is remembered instead of retried every test"""
+        calls = []
+
+        def broken(logger):
+            calls.append(1)
+            raise RuntimeError("no firefox")
+
+        pool = DriverPool({"firefox": broken})
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                pool.acquire("firefox")
+        assert len(calls) == 1
+
+    def test_close_quits_idle(self, test_logger):
+        """Test close quits every idle driver"""
+        drivers = [self.pool.acquire("chrome"), self.pool.acquire("firefox")]
+        for driver in drivers:
+            self.pool.release(driver.browser, driver)
+        self.pool.close()
+        assert all(d.quit_called for d in drivers)
@@ -0,0 +1,114 @@
+import pytest
+import sys
+import os
+import stat
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from drivers.resolver import DriverResolver, DriverResolutionError
+
+
+def make_binary(directory, name="chromedriver", version="120.0.6099.109"):
+    """Create a fake driver executable that prints a version"""
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write(f"#!/bin/sh\necho 'ChromeDriver {version} (abc)'\n")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="uses a shell-script stand-in binary")
+class TestDriverResolver:
+    """Driver resolver tests - no network, fake driver binaries"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("CHROMEDRIVER_PATH", raising=False)
+        monkeypatch.delenv("DRIVER_OFFLINE", raising=False)
+        monkeypatch.setenv("PATH", str(tmp_path / "empty-path"))
+        monkeypatch.setenv("HOME", str(tmp_path / "home"))
+        self.tmp = tmp_path
+        self.install_calls = []
+        self.browser_version = None
+
+        downloads = tmp_path / "downloads"
+        downloads.mkdir()
+        self.downloaded = make_binary(str(downloads))
+
+        def install():
+            self.install_calls.append(1)
+            # Mimic webdriver-manager pointing at the notices file next to the binary
+            return os.path.join(str(downloads), "THIRD_PARTY_NOTICES.chromedriver")
+
+        self.installers = {"chrome": install}
+
+    def resolver(self, **kwargs):
+        kwargs.setdefault("browser_versions", {"chrome": lambda: self.browser_version})
+        return DriverResolver(cache_dir=str(self.tmp / "cache"), installers=self.installers, **kwargs)
+
+    def test_env_override(self, monkeypatch, test_logger):
+        """Test CHROMEDRIVER_PATH wins without touching the cache"""
+        local = make_binary(str(self.tmp))
+        monkeypatch.setenv("CHROMEDRIVER_PATH", local)
+        assert self.resolver().resolve("chrome") == local
+        assert not self.install_calls
+        assert not os.path.exists(self.tmp / "cache" / "drivers.json")
+
+    def test_install_once_then_cached(self, test_logger):
+        """Test the first resolution installs and later ones read the cache"""
+        test_logger.info("Step 1: First resolution downloads")
+        first = self.resolver()
+        assert first.resolve("chrome") == self.downloaded
+        assert first.version("chrome") == "120.0.6099.109"
+
+        test_logger.info("Step 2: New resolver instance uses the on-disk cache")
+        second = self.resolver(offline=True)
+        assert second.resolve("chrome") == self.downloaded
+        assert len(self.install_calls) == 1
+
+    def test_browser_update_invalidates_cache(self, test_logger):
+        """Test a cached driver for an older Chrome is replaced, and invalidate() forces a new lookup"""
+        test_logger.info("Step 1: Resolve for Chrome 120")
+        self.browser_version = "120.0.6099.200"
+        assert self.resolver().resolve("chrome") == self.downloaded
+
+        test_logger.info("Step 2: Chrome updates to 121; the cached 120 driver is dropped")
+        self.browser_version = "121.0.6167.85"
+        make_binary(os.path.dirname(self.downloaded), version="121.0.6167.85")
+        resolver = self.resolver()
+        assert resolver.resolve("chrome") == self.downloaded
+        assert resolver.version("chrome") == "121.0.6167.85"
+        assert len(self.install_calls) == 2
+
+        test_logger.info("Step 3: invalidate() drops the entry and the memo")
+        resolver.invalidate("chrome")
+        assert resolver.version("chrome") is None
+        assert resolver.resolve("chrome") == self.downloaded
+        assert len(self.install_calls) == 3
+
+    def test_offline_uses_path(self, monkeypatch, test_logger):
+        """Test offline mode finds a binary on PATH"""
+        bin_dir = self.tmp / "bin"
+        bin_dir.mkdir()
+        on_path = make_binary(str(bin_dir))
+        monkeypatch.setenv("PATH", str(bin_dir))
+        assert self.resolver(offline=True).resolve("chrome") == on_path
+        assert not self.install_calls
+
+    def test_offline_without_binary_fails(self, test_logger):
+        """Test offline mode never downloads"""
+        with pytest.raises(DriverResolutionError):
+            self.resolver(offline=True).resolve("chrome")
+        assert not self.install_calls
+
+    def test_concurrent_resolution_installs_once(self, test_logger):
+        """Test parallel resolvers (like xdist workers) share one install"""
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.resolver().resolve("chrome")))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == [self.downloaded] * 8
+        assert len(self.install_calls) == 1
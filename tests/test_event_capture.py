@@ -0,0 +1,169 @@
+import pytest
+import json
+import shutil
+import subprocess
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pages.event_capture import EventCapture
+from tests.fake_driver import FakeDriver
+
+# A long-lived Node process standing in for the page: every stdin line is
+# {"script", "args"}, run like execute_script, answered with one JSON line.
+NODE_PAGE = """
+global.window = global;
+global.location = { href: 'http://localhost:3000/' };
+global.fetch = () => Promise.resolve({ ok: true });
+global.navigator = { sendBeacon: () => true };
+require('readline').createInterface({ input: process.stdin }).on('line', (line) => {
+    const { script, args } = JSON.parse(line);
+    let reply;
+    try {
+        const value = new Function(script).apply(window, args);
+        reply = { value: value === undefined ? null : value };
+    } catch (e) {
+        reply = { error: String(e) };
+    }
+    process.stdout.write(JSON.stringify(reply) + '\\n');
+});
+"""
+
+
+class NodeDriver:
+    """Stands in for a WebDriver; runs scripts in a Node process"""
+
+    def __init__(self):
+        self.process = subprocess.Popen(["node", "-e", NODE_PAGE], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        text=True)
+
+    def execute_script(self, script, *args):
+        self.process.stdin.write(json.dumps({"script": script, "args": list(args)}) + "\n")
+        self.process.stdin.flush()
+        reply = json.loads(self.process.stdout.readline())
+        assert "error" not in reply, reply["error"]
+        return reply["value"]
+
+    def quit(self):
+        self.process.stdin.close()
+        self.process.wait(timeout=5)
+
+
+def send(driver, *types, path="/api/event"):
+    """Have the page post events of `types`: one request each, or one batch for /api/events"""
+    bodies = [{"userId": "u", "type": t, "n": i} for i, t in enumerate(types)]
+    if path == "/api/events":
+        bodies = [bodies]
+    for body in bodies:
+        driver.execute_script("window.fetch(arguments[0], {method: 'POST', body: arguments[1]});",
+                              path, json.dumps(body))
+
+
+@pytest.fixture
+def node_driver():
+    if shutil.which("node") is None:
+        pytest.skip("node not installed")
+    driver = NodeDriver()
+    yield driver
+    driver.quit()
+
+
+class TestEventCapture:
+    """Event capture ring buffer - run in Node, no browser needed"""
+
+    def test_cursor_drain(self, node_driver, test_logger):
+        """Test each drain returns only unseen events, per type and overall"""
+        capture = EventCapture(node_driver, capacity=10)
+        capture.attach()
+
+        test_logger.info("Step 1: Send single events and a batch")
+        send(node_driver, "play", "scroll")
+        send(node_driver, "scroll", "pause", path="/api/events")
+        node_driver.execute_script("navigator.sendBeacon('/api/event', arguments[0]);",
+                                   json.dumps({"userId": "u", "type": "pause", "n": 9}))
+        node_driver.execute_script("window.fetch('/api/other', {method: 'POST', body: '{}'});")
+        assert capture.request_counts() == {"/api/event": 3, "/api/events": 1}
+
+        test_logger.info("Step 2: Drain everything, then per type")
+        assert [e["type"] for e in capture.drain()] == ["play", "scroll", "scroll", "pause", "pause"]
+        assert capture.drain() == []
+        assert [e["n"] for e in capture.drain("scroll")] == [1, 0]
+
+        test_logger.info("Step 3: Only new events come back")
+        send(node_driver, "scroll")
+        assert [e["type"] for e in capture.drain()] == ["scroll"]
+        assert len(capture.drain("scroll")) == 1
+        assert capture.drain("play") == [{"userId": "u", "type": "play", "n": 0}]
+        assert capture.drain("seeked") == []
+        assert capture.overflowed == 0
+
+    def test_overflow(self, node_driver, test_logger):
+        """Test evicting unread events sets the overflow flag; evicting read ones does not"""
+        capture = EventCapture(node_driver, capacity=3)
+        capture.attach()
+
+        test_logger.info("Step 1: Send more events than the ring holds")
+        send(node_driver, "play", "scroll", "scroll", "scroll", "pause")
+        assert [e["n"] for e in capture.drain()] == [2, 3, 4]
+        assert capture.overflowed == 1
+
+        test_logger.info("Step 2: Events evicted after being read are not an overflow")
+        send(node_driver, "scroll", "scroll")
+        assert len(capture.drain()) == 2
+        assert capture.overflowed == 1
+
+        test_logger.info("Step 3: Per-type rings overflow on their own")
+        assert [e["n"] for e in capture.drain("scroll")] == [3, 0, 1]
+        assert capture.overflowed == 2
+        assert [e["type"] for e in capture.drain("pause")] == ["pause"]
+        assert capture.overflowed == 2
+
+    def test_limit(self, node_driver, test_logger):
+        """Test a limited drain leaves the rest for the next one"""
+        capture = EventCapture(node_driver)
+        capture.attach()
+        send(node_driver, "play", "scroll", "scroll", "pause", "play")
+
+        test_logger.info("Step 1: Drain two at a time")
+        assert [e["n"] for e in capture.drain(limit=2)] == [0, 1]
+        assert [e["n"] for e in capture.drain(limit=2)] == [2, 3]
+        assert [e["n"] for e in capture.drain(limit=2)] == [4]
+        assert capture.drain(limit=2) == []
+
+        test_logger.info("Step 2: Per-type limits")
+        assert [e["n"] for e in capture.drain("play", limit=1)] == [0]
+        assert [e["n"] for e in capture.drain("play", limit=1)] == [4]
+
+    def test_clear_and_attach(self, node_driver, test_logger):
+        """Test clear skips captured events and attach starts over on a new page"""
+        capture = EventCapture(node_driver)
+        capture.attach()
+        send(node_driver, "play", "scroll")
+
+        test_logger.info("Step 1: clear() moves every cursor to the head")
+        capture.clear()
+        assert node_driver.execute_script("return window.__eventCapture.head()") == 2
+        assert capture.drain() == [] and capture.drain("play") == []
+        send(node_driver, "pause")
+        assert [e["type"] for e in capture.drain()] == ["pause"]
+
+        test_logger.info("Step 2: A new page gets a new buffer, read from its start")
+        node_driver.execute_script("delete window.__eventCapture;")
+        capture.attach()
+        send(node_driver, "seeked")
+        assert [e["type"] for e in capture.drain()] == ["seeked"]
+
+    def test_for_driver(self, test_logger):
+        """Test one capture per driver, preloaded through DevTools once"""
+        driver, other = FakeDriver(cdp=True), FakeDriver(cdp=True)
+
+        test_logger.info("Step 1: The capture is cached per driver")
+        capture = EventCapture.for_driver(driver, capacity=50)
+        assert EventCapture.for_driver(driver, capacity=50) is capture
+        assert EventCapture.for_driver(other) is not capture
+        assert capture.preloaded and len(driver.cdp_commands) == 1
+        assert "(50)" in driver.cdp_commands[0][1]["source"]
+
+        test_logger.info("Step 2: A different capacity for the same driver is an error")
+        with pytest.raises(ValueError, match="capacity 50"):
+            EventCapture.for_driver(driver)
@@ -0,0 +1,143 @@
+import pytest
+import json
+import sys
+import os
+import socket
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api.event_api import EventAPI
+from api import event_sink as sink_module
+from api.event_sink import EventStore
+
+
+class TestEventSink:
+    """Event sink tests - events are asserted on the server side"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, event_sink):
+        self.sink = event_sink
+        self.sink.store.clear()
+        self.api = EventAPI(event_sink.url)
+
+    def test_events_are_stored(self, test_logger):
+        """Test received events can be queried by user and type"""
+        test_logger.info("Step 1: Send events for two users")
+        for i, event_type in enumerate(["play", "pause", "seeked", "play"]):
+            response = self.api.send_event(event_type=event_type, video_time=float(i),
+                                           user_id="user-a" if i % 2 == 0 else "user-b")
+            assert response.status_code == 200
+            assert response.json() == {"ok": True}
+
+        test_logger.info("Step 2: Query the store")
+        assert len(self.sink.store) == 4
+        assert self.sink.store.count(user_id="user-a") == 2
+        assert [e["videoTime"] for e in self.sink.store.query(event_type="play")] == [0.0, 3.0]
+        assert self.sink.store.query(user_id="user-b", event_type="pause")[0]["type"] == "pause"
+        assert self.sink.store.count(user_id="nobody") == 0
+
+    def test_time_range_query(self, test_logger):
+        """Test filtering by timestamp range"""
+        test_logger.info("Step 1: Send events with fixed timestamps")
+        for second in range(5):
+            self.api.send_event("scroll", timestamp=f"2025-07-21T19:30:0{second}.000Z")
+
+        test_logger.info("Step 2: Query an inclusive window")
+        events = self.sink.store.query(start="2025-07-21T19:30:01Z", end="2025-07-21T19:30:03Z")
+        assert [e["timestamp"] for e in events] == [
+            "2025-07-21T19:30:01.000Z", "2025-07-21T19:30:02.000Z", "2025-07-21T19:30:03.000Z"
+        ]
+
+    def test_invalid_json_rejected(self, test_logger):
+        """Test malformed JSON gets 400 like bodyParser.json()"""
+        response = self.api.session.post(f"{self.sink.url}/api/event", data="{not json",
+                                         headers={"Content-Type": "application/json"})
+        assert response.status_code == 400
+        assert len(self.sink.store) == 0
+
+    def test_batch_endpoint(self, test_logger):
+        """Test /api/events stores every event of a batch and rejects non-arrays"""
+        test_logger.info("Step 1: Post a beacon-style batch")
+        batch = [{"userId": "user-a", "type": "scroll", "videoTime": float(i)} for i in range(3)]
+        response = self.api.session.post(f"{self.sink.url}/api/events", data=json.dumps(batch),
+                                         headers={"Content-Type": "text/plain;charset=UTF-8"})
+        assert response.json()["accepted"] == 3
+        assert self.sink.store.count(event_type="scroll") == 3
+
+        test_logger.info("Step 2: Reject a single object")
+        response = self.api.post("/api/events", batch[0])
+        assert response.status_code == 400
+        assert len(self.sink.store) == 3
+
+    def test_ndjson_stream_stored(self, test_logger):
+        """Test NDJSON lines are stored and bad lines reported by line number"""
+        test_logger.info("Step 1: Stream NDJSON with a malformed and a blank line")
+        body = b'{"userId":"u","type":"play"}\n{broken\n\n{"userId":"u","type":"pause"}'
+        response = self.api.session.post(f"{self.sink.url}/api/events", data=iter([body[:10], body[10:]]),
+                                         headers={"Content-Type": "application/x-ndjson"})
+
+        test_logger.info("Step 2: Validate results and store")
+        result = response.json()
+        assert (result["received"], result["accepted"], result["rejected"]) == (3, 2, 1)
+        assert result["errors"][0]["line"] == 2
+        assert [e["type"] for e in self.sink.store.query(user_id="u")] == ["play", "pause"]
+
+    def test_aborted_and_oversized_ndjson(self, caplog, monkeypatch, test_logger):
+        """Test an NDJSON upload cut off mid-body is dropped quietly and an oversized one gets 413"""
+        host, port = self.sink.host, self.sink.port
+        head = (b"POST /api/events HTTP/1.1\r\nHost: sink\r\nContent-Type: application/x-ndjson\r\n"
+                b"Transfer-Encoding: chunked\r\n\r\n")
+        line = b'{"userId":"cut","type":"play"}\n'
+
+        test_logger.info("Step 1: Send one chunk and a half, then hang up")
+        with caplog.at_level("ERROR", logger="asyncio"):
+            with socket.create_connection((host, port)) as sock:
+                sock.sendall(head + b"%x\r\n" % len(line) + line + b"\r\n40\r\n" + line[:10])
+            time.sleep(0.2)  # let the sink notice the hang-up
+            response = requests.get(f"{self.sink.url}/")
+        assert response.status_code == 200
+        assert not [r for r in caplog.records if "exception" in r.getMessage()]
+
+        test_logger.info("Step 2: Stream past the bulk limit")
+        monkeypatch.setattr(sink_module, "BULK_MAX_BODY", 4 * len(line))
+        response = self.api.session.post(f"{self.sink.url}/api/events", data=iter([line] * 8),
+                                         headers={"Content-Type": "application/x-ndjson"})
+        assert response.status_code == 413
+
+    def test_serves_client(self, test_logger):
+        """Test the player page is served statically"""
+        response = requests.get(f"{self.sink.url}/")
+        assert response.status_code == 200
+        assert '<video id="video"' in response.text
+        assert requests.get(f"{self.sink.url}/../requirements.txt").status_code == 404
+
+    def test_head_and_reason_phrases(self, test_logger):
+        """Test HEAD replies carry Content-Length without a body and every status has a reason phrase"""
+        session = requests.Session()
+
+        test_logger.info("Step 1: HEAD then GET on one keep-alive connection")
+        head = session.head(f"{self.sink.url}/")
+        page = session.get(f"{self.sink.url}/")
+        assert head.status_code == page.status_code == 200
+        assert head.content == b""
+        assert int(head.headers["Content-Length"]) == len(page.content)
+        assert '<video id="video"' in page.text
+
+        test_logger.info("Step 2: A batch of the wrong media type gets a full status line")
+        response = session.post(f"{self.sink.url}/api/events", data="<events/>",
+                                headers={"Content-Type": "application/xml"})
+        assert (response.status_code, response.reason) == (415, "Unsupported Media Type")
+
+
+class TestEventStore:
+    """Store tests - malformed events are kept without crashing"""
+
+    def test_malformed_values(self, test_logger):
+        store = EventStore()
+        store.add({"userId": None, "type": None, "videoTime": "not-a-number", "timestamp": "bad"})
+        store.add({})
+        event = store.query()[0]
+        assert event == {"userId": None, "type": None, "videoTime": None, "timestamp": None}
+        assert store.count(event_type=None) == 2
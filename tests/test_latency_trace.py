@@ -0,0 +1,102 @@
+import pytest
+import json
+import time
+import sys
+import os
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api.event_sink import trace_now
+from pages.latency_trace import STAGES, LatencyTrace, clock_offset, stages
+from tests.fake_driver import FakeDriver
+
+SERVER_AHEAD_MS = 250.0
+
+
+def make_trace(event_type, listener, queue, uplink, server, downlink):
+    """Marks of one traced event; the server clock runs SERVER_AHEAD_MS ahead of the page"""
+    fetch_start = listener + queue
+    receive = fetch_start + uplink + SERVER_AHEAD_MS
+    respond = receive + server
+    return {"type": event_type, "id": 1, "listener": listener, "fetchStart": fetch_start,
+            "receive": receive, "respond": respond, "responseEnd": respond - SERVER_AHEAD_MS + downlink}
+
+
+class TestLatencyTrace:
+    """Latency trace helpers - no browser needed"""
+
+    def test_clock_offset_from_fastest_round_trip(self, test_logger):
+        """Test the offset comes from the round trip with the least network time"""
+        traces = [
+            make_trace("play", 1000.0, 0.5, 9.0, 1.0, 3.0),
+            make_trace("seeked", 2000.0, 0.5, 2.0, 4.0, 2.0),
+            {"type": "scroll", "listener": 3000.0},
+        ]
+        test_logger.info("Step 1: Estimate the offset")
+        assert clock_offset(traces) == pytest.approx(SERVER_AHEAD_MS)
+        assert clock_offset([]) == 0.0
+
+        test_logger.info("Step 2: Validate stages on the page clock")
+        result = stages(make_trace("scroll", 0.0, 240.0, 6.0, 1.5, 5.0), SERVER_AHEAD_MS)
+        assert result == pytest.approx({"queue": 240.0, "uplink": 6.0, "server": 1.5,
+                                        "downlink": 5.0, "delivery": 246.0})
+
+    def test_histograms_per_type(self, test_logger):
+        """Test collected traces build one histogram per event type and stage"""
+        driver = FakeDriver([
+            [make_trace("play", 0.0, 1.0, 2.0, 1.0, 2.0), {"type": "play", "listener": 5.0}],
+            [make_trace("scroll", 10.0, 200.0, 2.0, 3.0, 2.0), make_trace("scroll", 20.0, 100.0, 2.0, 1.0, 2.0)],
+            None,
+        ])
+        trace = LatencyTrace(driver)
+
+        test_logger.info("Step 1: Collect twice; incomplete traces are counted, not kept")
+        assert len(trace.collect()) == 1
+        assert len(trace.collect()) == 2
+        assert trace.incomplete == 1
+
+        test_logger.info("Step 2: Validate the histograms")
+        histograms = trace.histograms()
+        assert set(histograms) == {"play", "scroll"}
+        assert set(histograms["scroll"]) == set(STAGES)
+        assert histograms["scroll"]["queue"].total == 2
+        assert histograms["scroll"]["queue"].max == 200_000
+        assert trace.summary()["play"]["server"]["max_ms"] == pytest.approx(1.0)
+
+        test_logger.info("Step 3: A page without tracing is an error")
+        with pytest.raises(AssertionError, match="trace=1"):
+            trace.collect()
+
+    @pytest.mark.parametrize("path, body", [
+        ("/api/event", {"userId": "trace-user", "type": "play", "videoTime": 1.0,
+                        "timestamp": "2025-07-21T19:30:45.000Z", "trace": {"id": 1, "listener": 0}}),
+        ("/api/events", [{"userId": "trace-user", "type": "scroll", "videoTime": 1.0,
+                          "timestamp": "2025-07-21T19:30:45.000Z"}]),
+    ])
+    def test_server_marks(self, api_base_url, path, body, test_logger):
+        """Test the server answers traced requests with its receive and respond marks"""
+        session = requests.Session()
+
+        test_logger.info(f"Step 1: POST {path} with and without X-Event-Trace")
+        plain = session.post(api_base_url + path, json=body, timeout=5)
+        before = trace_now()
+        traced = session.post(api_base_url + path, json=body, headers={"X-Event-Trace": "1"}, timeout=5)
+        after = trace_now()
+
+        test_logger.info("Step 2: Validate the marks")
+        assert plain.status_code == traced.status_code == 200
+        assert "trace" not in plain.json()
+        marks = traced.json()["trace"]
+        test_logger.info(f"Server marks: {json.dumps(marks)}")
+        # Same machine: both clocks agree to well under the slack.
+        assert before - 50 <= marks["receive"] <= marks["respond"] <= after + 50
+
+    def test_in_process_marks(self, event_sink, test_logger):
+        """Test handle() adds the marks too"""
+        body = json.dumps({"userId": "trace-user", "type": "play"}).encode()
+        status, _, payload = event_sink.handle(
+            "POST", "/api/event", {"Content-Type": "application/json", "X-Event-Trace": "1"}, body)
+        reply = json.loads(payload)
+        assert status == 200 and reply["ok"]
+        assert reply["trace"]["receive"] <= reply["trace"]["respond"] <= time.time() * 1000
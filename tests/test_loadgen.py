@@ -0,0 +1,63 @@
+import pytest
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api.loadgen import LatencyHistogram, LoadGenerator, format_summary
+
+
+class TestLatencyHistogram:
+    """Histogram accuracy tests - no server needed"""
+
+    def test_percentiles_within_precision(self, test_logger):
+        """Test percentiles stay within 3 significant digits"""
+        test_logger.info("Step 1: Record 50k random latencies")
+        rng = random.Random(7)
+        values = sorted(rng.randint(1, 5_000_000) for _ in range(50_000))
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record_value(value)
+
+        test_logger.info("Step 2: Compare percentiles with exact values")
+        for p in (50, 90, 99, 99.9):
+            exact = values[int(p / 100 * len(values)) - 1]
+            got = histogram.value_at_percentile(p)
+            assert abs(got - exact) / exact < 0.002, f"p{p}: {got} vs {exact}"
+
+        assert histogram.total == len(values)
+        assert histogram.min == values[0]
+        assert histogram.max == values[-1]
+
+    def test_merge(self, test_logger):
+        """Test merging two histograms"""
+        test_logger.info("Step 1: Record into two histograms and merge")
+        first, second = LatencyHistogram(), LatencyHistogram()
+        for value in range(1, 1001):
+            (first if value % 2 else second).record_value(value)
+        first.merge(second)
+
+        test_logger.info("Step 2: Validate merged stats")
+        assert first.total == 1000
+        assert first.min == 1 and first.max == 1000
+        assert first.value_at_percentile(50) == 500
+
+
+class TestLoadGenerator:
+    """Short load runs against the event endpoint"""
+
+    @pytest.mark.parametrize("mode", ["rate", "concurrency"])
+    def test_short_run(self, mode, test_logger, api_base_url):
+        """Test a short run reports throughput and percentiles"""
+        test_logger.info(f"Step 1: Run load generator in {mode} mode")
+        generator = LoadGenerator(api_base_url, users=10, seed=1)
+        if mode == "rate":
+            report = generator.run(0.5, rate=100)
+        else:
+            report = generator.run(0.5, concurrency=4)
+
+        test_logger.info("Step 2: Validate report")
+        assert report["requests"] > 0
+        assert report["errors"] == 0, report["error_breakdown"]
+        assert report["latency"]["p50_ms"] <= report["latency"]["p99_ms"]
+        test_logger.info(format_summary(report))
@@ -0,0 +1,89 @@
+import pytest
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analytics.logs import analyze, build_report, baseline_from, main
+
+PLAIN_LOG = """\
+2025-07-21 19:30:00,000 - INFO - [CHROME] Step 1: Click play button
+2025-07-21 19:30:00,500 - INFO - [CHROME] Step 2: Verify video is playing
+2025-07-21 19:30:02,000 - INFO - [CHROME] Step 3: Check play event
+2025-07-21 19:30:02,250 - INFO - [CHROME] Play event test passed
+2025-07-21 19:30:03,000 - INFO - [FIREFOX] Step 1: Click play button
+2025-07-21 19:30:04,000 - INFO - [FIREFOX] Step 2: Verify video is playing
+2025-07-21 19:30:08,000 - INFO - [FIREFOX] Step 3: Check play event
+2025-07-21 19:30:08,500 - INFO - [FIREFOX] Play event test passed
+"""
+
+NODEID = "tests/test_video.py::TestVideoPlayer::test_play_event"
+
+
+def jsonl_log(path, offset):
+    """Interleaved records from two xdist workers"""
+    records = [
+        (0.0, f"{NODEID}[chrome]", "[CHROME] Step 1: Click play button"),
+        (0.1, f"{NODEID}[firefox]", "[FIREFOX] Step 1: Click play button"),
+        (0.5, f"{NODEID}[chrome]", "[CHROME] Step 2: Verify video is playing"),
+        (1.1, f"{NODEID}[firefox]", "[FIREFOX] Step 2: Verify video is playing"),
+        (2.0, f"{NODEID}[chrome]", "[CHROME] Step 3: Check play event"),
+        (5.1, f"{NODEID}[firefox]", "[FIREFOX] Step 3: Check play event"),
+        (2.5, f"{NODEID}[chrome]", "[CHROME] Play event test passed"),
+        (5.6, f"{NODEID}[firefox]", "[FIREFOX] Play event test passed"),
+    ]
+    with open(path, "w") as f:
+        for ts, nodeid, message in records:
+            f.write(json.dumps({"ts": 1000.0 + offset + ts, "nodeid": nodeid, "message": message}) + "\n")
+
+
+class TestLogAnalyzer:
+    """Log analyzer tests - step timings, browser variance and regressions"""
+
+    def test_plain_log_steps(self, tmp_path, test_logger):
+        """Test step durations are rebuilt from the plain log format"""
+        test_logger.info("Step 1: Analyze a plain log")
+        path = tmp_path / "log_20250721_193000.log"
+        path.write_text(PLAIN_LOG)
+        steps, tests = analyze([str(path)], workers=1)
+
+        test_logger.info("Step 2: Validate per-browser step durations")
+        key = ("Click play button", 2, "Verify video is playing")
+        assert steps[(key, "chrome")].mean == pytest.approx(1.5)
+        assert steps[(key, "firefox")].mean == pytest.approx(4.0)
+        assert tests[("Click play button", "chrome")].mean == pytest.approx(2.25)
+
+    def test_jsonl_across_processes(self, tmp_path, test_logger):
+        """Test JSON-lines logs from several runs merge across worker processes"""
+        test_logger.info("Step 1: Write three runs")
+        paths = []
+        for run in range(3):
+            path = tmp_path / f"log_run{run}.jsonl"
+            jsonl_log(path, run * 100)
+            paths.append(str(path))
+
+        test_logger.info("Step 2: Analyze with a process pool")
+        steps, tests = analyze(paths, workers=2)
+        report = build_report(steps, tests, top=3)
+        slowest = report["slowest_steps"][0]
+        assert slowest["step"] == f"{NODEID} :: Step 2: Verify video is playing"
+        assert slowest["count"] == 6
+        assert report["per_browser"][slowest["step"]]["firefox"]["mean_s"] == pytest.approx(4.0)
+        assert tests[(NODEID, "chrome")].count == 3
+
+    def test_baseline_regression(self, tmp_path, test_logger):
+        """Test a slowed-down step is flagged against a saved baseline"""
+        test_logger.info("Step 1: Save a baseline")
+        path = tmp_path / "log_base.log"
+        path.write_text(PLAIN_LOG)
+        baseline_path = tmp_path / "baseline.json"
+        assert main([str(path), "--save-baseline", str(baseline_path), "--json", str(tmp_path / "r.json")]) == 0
+
+        test_logger.info("Step 2: Compare a slower run")
+        baseline = json.loads(baseline_path.read_text())
+        slow = tmp_path / "log_slow.log"
+        slow.write_text(PLAIN_LOG.replace("19:30:02,000", "19:30:06,000").replace("19:30:02,250", "19:30:06,250"))
+        steps, tests = analyze([str(slow)], workers=1)
+        report = build_report(steps, tests, baseline=baseline)
+        assert [r["step"] for r in report["regressions"]] == ["Click play button :: Step 2: Verify video is playing"]
+        assert baseline_from(steps) != baseline
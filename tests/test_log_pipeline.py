@@ -0,0 +1,61 @@
+import json
+import logging
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests.log_pipeline import JsonLinesFormatter, LogPipeline, merge_run_logs
+
+
+class TestLogPipeline:
+    """Logging pipeline tests - record format and run-log merging"""
+
+    def test_step_and_browser_parsed(self, test_logger):
+        """Test step number and browser are extracted from the message"""
+        record = logging.LogRecord("tests", logging.INFO, __file__, 1,
+                                   "[CHROME] Step 3: Verify video is playing", None, None)
+        record.worker, record.nodeid, record.browser = "gw1", "tests/test_video.py::t", None
+        entry = json.loads(JsonLinesFormatter().format(record))
+        assert entry["step"] == 3
+        assert entry["browser"] == "chrome"
+        assert entry["worker"] == "gw1"
+        assert entry["nodeid"] == "tests/test_video.py::t"
+
+    def test_merge_orders_by_timestamp(self, tmp_path, test_logger):
+        """Test per-worker files merge into one time-ordered log"""
+        run_dir = tmp_path / "run"
+        run_dir.mkdir()
+        for worker, stamps in (("gw0", [1.0, 4.0, 5.0]), ("gw1", [2.0, 3.0, 6.0])):
+            with open(run_dir / f"{worker}.jsonl", "w") as f:
+                for ts in stamps:
+                    f.write(json.dumps({"ts": ts, "worker": worker}) + "\n")
+
+        target = merge_run_logs(str(run_dir), str(tmp_path / "log.jsonl"))
+        with open(target) as f:
+            merged = [json.loads(line) for line in f]
+        assert [e["ts"] for e in merged] == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+        assert not run_dir.exists()
+
+    def test_exception_kept_apart(self, tmp_path, capsys, test_logger):
+        """Test tracebacks reach the JSON "exc" field and the console is written on the test thread"""
+        pipeline = LogPipeline(str(tmp_path / "run"), "gw9").start()
+        try:
+            test_logger.info("Step 1: Log an exception")
+            try:
+                1 / 0
+            except ZeroDivisionError:
+                logging.getLogger("tests.pipeline").exception("division failed")
+            console = capsys.readouterr().err
+        finally:
+            pipeline.stop()
+
+        test_logger.info("Step 2: Validate the console line was captured with the traceback")
+        assert "ERROR - division failed" in console
+        assert "ZeroDivisionError" in console
+
+        test_logger.info("Step 3: Validate the JSON entry")
+        with open(tmp_path / "run" / "gw9.jsonl") as f:
+            entry = [json.loads(line) for line in f if "division failed" in line][0]
+        assert entry["message"] == "division failed"
+        assert entry["level"] == "ERROR"
+        assert "ZeroDivisionError" in entry["exc"]
@@ -0,0 +1,146 @@
+import pytest
+import itertools
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests.lpt_scheduler import DurationHistory, LPTScheduling, browser_of, junit_key, lpt_plan
+
+JUNIT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" tests="4">
+<testcase classname="tests.test_video.TestVideoPlayer" name="test_seek_control[chrome]" time="{seek}" />
+<testcase classname="tests.test_video.TestVideoPlayer" name="test_play_button[chrome]" time="2.0" />
+<testcase classname="tests.test_video.TestVideoPlayer" name="test_play_button[firefox]" time="3.0" />
+<testcase classname="tests.test_video.TestVideoPlayer" name="test_scroll_event[firefox]" time="0.0">
+<skipped message="Firefox not available" /></testcase>
+</testsuite></testsuites>
+"""
+
+
+class FakeNode:
+    def __init__(self, name):
+        self.gateway = type("Gateway", (), {"id": name})()
+        self.shutting_down = False
+        self.sent = []
+
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+def makespan(bins, durations):
+    return max(sum(durations[i] for i in items) for items in bins)
+
+
+class TestLPTPlan:
+    """Bin packing - no xdist workers needed"""
+
+    def test_lpt_within_bound_of_optimal(self, test_logger):
+        """Test LPT makespan against brute force on small instances"""
+        durations = [7, 7, 6, 6, 5, 5, 4, 4, 4]
+        test_logger.info("Step 1: Pack 9 tests onto 3 workers")
+        bins, loads = lpt_plan(durations, [None] * len(durations), 3)
+        assert sorted(i for items in bins for i in items) == list(range(len(durations)))
+        assert max(loads) == makespan(bins, durations)
+
+        test_logger.info("Step 2: Compare with the optimal assignment")
+        optimal = min(
+            max(sum(d for d, w in zip(durations, assignment) if w == b) for b in range(3))
+            for assignment in itertools.product(range(3), repeat=len(durations))
+        )
+        assert max(loads) <= optimal * (4 / 3 - 1 / 9)
+        assert max(loads) < makespan([list(range(b, len(durations), 3)) for b in range(3)], durations) + 1
+
+    def test_browsers_kept_together(self, test_logger):
+        """Test a browser switch is only paid when it shortens the makespan"""
+        test_logger.info("Step 1: Two workers, equal chrome and firefox work")
+        durations = [10, 10, 10, 10, 1, 1]
+        groups = ["chrome", "chrome", "firefox", "firefox", "chrome", "firefox"]
+        bins, loads = lpt_plan(durations, groups, 2, switch_cost=5)
+        assert [{groups[i] for i in items} for items in bins] in (
+            [{"chrome"}, {"firefox"}], [{"firefox"}, {"chrome"}])
+
+        test_logger.info("Step 2: Each bin runs one browser's tests contiguously, longest first")
+        bins, _ = lpt_plan([9, 1, 8, 2, 7, 3], ["a", "b", "a", "b", "a", "b"], 1, switch_cost=0)
+        assert bins == [[0, 2, 4, 5, 3, 1]]
+
+    def test_history_from_junit(self, tmp_path, test_logger):
+        """Test durations are learned once per results file and used for estimates"""
+        test_logger.info("Step 1: Learn from a results file")
+        results = tmp_path / "results_video.xml"
+        results.write_text(JUNIT.format(seek=20.0))
+        history = DurationHistory(str(tmp_path / "durations.json"))
+        assert history.ingest(str(tmp_path / "results*.xml")) == 3
+        assert history.ingest(str(tmp_path / "results*.xml")) == 0
+        history.save()
+
+        test_logger.info("Step 2: Estimates for known, sibling and unknown tests")
+        history = DurationHistory(str(tmp_path / "durations.json"))
+        prefix = "tests/test_video.py::TestVideoPlayer::"
+        assert history.estimate(prefix + "test_seek_control[chrome]") == 20.0
+        assert history.estimate(prefix + "test_seek_control[firefox]") == 20.0
+        assert history.estimate(prefix + "test_scroll_event[chrome]") == 3.0
+
+        test_logger.info("Step 3: A newer results file moves the mean")
+        results.write_text(JUNIT.format(seek=10.0))
+        os.utime(results, (1, 1))
+        history.ingest(str(tmp_path / "results*.xml"))
+        assert history.estimate(prefix + "test_seek_control[chrome]") == pytest.approx(17.0)
+
+    def test_node_ids(self, test_logger):
+        nodeid = "tests/test_video.py::TestVideoPlayer::test_play_button[firefox]"
+        assert junit_key(nodeid) == "tests.test_video.TestVideoPlayer::test_play_button[firefox]"
+        assert browser_of(nodeid) == "firefox"
+        assert browser_of("tests/test_schema.py::TestSchema::test_x") is None
+
+
+class TestLPTScheduling:
+    """Scheduler protocol driven with fake worker nodes"""
+
+    def test_every_test_runs_once(self, tmp_path, test_logger):
+        """Test bins are dispatched, idle workers steal, and all workers shut down"""
+        test_logger.info("Step 1: Collect 12 tests on 3 workers")
+        collection = [f"tests/test_video.py::T::test_{n}[{b}]" for n in range(6) for b in ("chrome", "firefox")]
+        history = DurationHistory(str(tmp_path / "durations.json"))
+        for i, nodeid in enumerate(collection):
+            history.record(junit_key(nodeid), float(12 - i))
+        scheduler = LPTScheduling(None, history=history, numnodes=3)
+        nodes = [FakeNode(f"gw{i}") for i in range(3)]
+        for node in nodes:
+            scheduler.add_node(node)
+            scheduler.add_node_collection(node, collection)
+        assert scheduler.collection_is_completed
+        scheduler.schedule()
+        assert all(len(node.sent) == 2 for node in nodes)
+
+        test_logger.info("Step 2: Complete tests, always on the first worker that has any")
+        done = []
+        while scheduler.has_pending:
+            node = next(n for n in nodes if scheduler.node2pending[n])
+            index = scheduler.node2pending[node][0]
+            scheduler.mark_test_complete(node, index)
+            done.append(index)
+        assert sorted(done) == list(range(len(collection)))
+        assert sorted(i for node in nodes for i in node.sent) == list(range(len(collection)))
+        assert scheduler.tests_finished
+        assert all(node.shutting_down for node in nodes)
+
+    def test_crashed_worker_requeued(self, test_logger):
+        """Test a dead worker's queued tests move to the others"""
+        collection = [f"tests/test_api.py::T::test_{n}" for n in range(8)]
+        scheduler = LPTScheduling(None, numnodes=2)
+        nodes = [FakeNode("gw0"), FakeNode("gw1")]
+        for node in nodes:
+            scheduler.add_node(node)
+            scheduler.add_node_collection(node, collection)
+        scheduler.schedule()
+
+        test_logger.info("Step 1: gw0 dies while running its first test")
+        running = scheduler.node2pending[nodes[0]][0]
+        crashed = scheduler.remove_node(nodes[0])
+        assert crashed == collection[running]
+        while scheduler.has_pending:
+            scheduler.mark_test_complete(nodes[1], scheduler.node2pending[nodes[1]][0])
+        assert set(nodes[1].sent) == set(range(8)) - {running}
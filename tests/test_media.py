@@ -0,0 +1,110 @@
+import pytest
+import http.client
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from media.server import MediaServer
+from media.synth import MediaUnavailable, ffmpeg_available, synthetic_video
+
+
+@pytest.fixture
+def media_dir(tmp_path):
+    rng = random.Random(7)
+    for name, size in (("small.mp4", 256 * 1024), ("large.mp4", 16 * 1024 * 1024)):
+        (tmp_path / name).write_bytes(rng.randbytes(size))
+    return tmp_path
+
+
+@pytest.fixture
+def server(media_dir):
+    with MediaServer(str(media_dir)) as server:
+        yield server
+
+
+def fetch(conn, path, headers=None, method="GET"):
+    conn.request(method, path, headers=headers or {})
+    response = conn.getresponse()
+    return response, response.read()
+
+
+class TestMediaServer:
+    """Media fixture server tests - byte ranges and keep-alive"""
+
+    def test_ranges_over_one_connection(self, server, media_dir, test_logger):
+        """Test full, open-ended, bounded and suffix ranges on a single keep-alive connection"""
+        data = (media_dir / "small.mp4").read_bytes()
+        conn = http.client.HTTPConnection(server.host, server.port, timeout=5)
+
+        test_logger.info("Step 1: Full file")
+        response, body = fetch(conn, "/small.mp4")
+        assert response.status == 200
+        assert response.getheader("Accept-Ranges") == "bytes"
+        assert response.getheader("Content-Type") == "video/mp4"
+        assert body == data
+        sock = conn.sock
+
+        test_logger.info("Step 2: Ranges reuse the connection")
+        response, body = fetch(conn, "/small.mp4", {"Range": "bytes=0-1"})
+        assert response.status == 206 and body == data[:2]
+        assert response.getheader("Content-Range") == f"bytes 0-1/{len(data)}"
+        response, body = fetch(conn, "/small.mp4", {"Range": "bytes=1000-"})
+        assert response.status == 206 and body == data[1000:]
+        response, body = fetch(conn, "/small.mp4", {"Range": "bytes=-500"})
+        assert body == data[-500:]
+        response, body = fetch(conn, "/small.mp4", method="HEAD")
+        assert response.getheader("Content-Length") == str(len(data)) and body == b""
+        assert conn.sock is sock
+        conn.close()
+
+    def test_invalid_requests(self, server, test_logger):
+        """Test unsatisfiable ranges, missing files and path traversal"""
+        conn = http.client.HTTPConnection(server.host, server.port, timeout=5)
+        response, _ = fetch(conn, "/small.mp4", {"Range": f"bytes={10 ** 9}-"})
+        assert response.status == 416
+        assert response.getheader("Content-Range") == f"bytes */{256 * 1024}"
+        response, _ = fetch(conn, "/missing.mp4")
+        assert response.status == 404
+        response, _ = fetch(conn, "/..%2f..%2fetc%2fpasswd")
+        assert response.status == 404
+        conn.close()
+
+    def test_seek_read_latency_by_size(self, server, test_logger):
+        """Test random-offset range reads stay fast regardless of file size"""
+        conn = http.client.HTTPConnection(server.host, server.port, timeout=5)
+        rng = random.Random(1)
+        for name, size in (("small.mp4", 256 * 1024), ("large.mp4", 16 * 1024 * 1024)):
+            test_logger.info(f"Step 1: 50 seeks into {name}")
+            latencies = []
+            for _ in range(50):
+                offset = rng.randrange(size - 65536)
+                start = time.perf_counter()
+                response, body = fetch(conn, f"/{name}", {"Range": f"bytes={offset}-{offset + 65535}"})
+                latencies.append(time.perf_counter() - start)
+                assert response.status == 206 and len(body) == 65536
+            latencies.sort()
+            test_logger.info(f"{name}: median {latencies[25] * 1000:.2f} ms, max {latencies[-1] * 1000:.2f} ms")
+            assert latencies[25] < 0.05
+        conn.close()
+
+
+class TestSyntheticVideo:
+    """Synthetic video generation"""
+
+    def test_missing_ffmpeg_reported(self, tmp_path, monkeypatch, test_logger):
+        """Test a clear error when ffmpeg cannot be found"""
+        monkeypatch.setenv("FFMPEG", str(tmp_path / "no-ffmpeg"))
+        with pytest.raises(MediaUnavailable):
+            synthetic_video(duration=2, cache_dir=str(tmp_path))
+
+    @pytest.mark.skipif(not ffmpeg_available(), reason="ffmpeg not installed")
+    def test_generated_once_and_cached(self, tmp_path, test_logger):
+        """Test the video is generated once and then served from the cache"""
+        path = synthetic_video(duration=2, width=160, height=90, bitrate_kbps=100, cache_dir=str(tmp_path))
+        mtime = os.path.getmtime(path)
+        assert synthetic_video(duration=2, width=160, height=90, bitrate_kbps=100, cache_dir=str(tmp_path)) == path
+        assert os.path.getmtime(path) == mtime
+        with open(path, "rb") as f:
+            assert b"ftyp" in f.read(64)
@@ -0,0 +1,66 @@
+import pytest
+import urllib.parse
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pages.multi_viewer_page import DRAIN_JS, INSTALL_CAPTURE_JS, MultiViewerPage
+from tests.fake_driver import FakeDriver
+
+
+def drained(events, cursor):
+    return {"events": events, "cursor": cursor, "overflow": False}
+
+
+class TestMultiViewerPage:
+    """Multi-viewer page object - no browser needed"""
+
+    def test_open_loads_viewers(self, test_logger):
+        """Test the viewers page URL and capture install when it was not preloaded"""
+        driver = FakeDriver([[], None, []])
+        page = MultiViewerPage(driver, 3, app_url="http://localhost:3000", src="http://127.0.0.1:8090/v.mp4",
+                               user_template="load-{n}")
+
+        test_logger.info("Step 1: Open three viewers")
+        assert page.open() is page
+        url = urllib.parse.urlsplit(driver.visited[0])
+        assert url.path == "/viewers.html"
+        assert urllib.parse.parse_qs(url.query) == {
+            "count": ["3"], "user": ["load-{n}"], "src": ["http://127.0.0.1:8090/v.mp4"]}
+        assert page.user_ids == ["load-0", "load-1", "load-2"]
+
+        test_logger.info("Step 2: Validate capture was installed in every viewer")
+        script, args = driver.scripts[1]
+        assert script == INSTALL_CAPTURE_JS and args == (None, page.capture.script)
+
+    def test_open_reports_stuck_viewers(self, test_logger):
+        """Test viewers that never become ready are named in the error"""
+        driver = FakeDriver([[], None, [4, 7]])
+        with pytest.raises(AssertionError, match=r"\[4, 7\]"):
+            MultiViewerPage(driver, 10).open()
+
+    def test_bulk_drain_keeps_cursors(self, test_logger):
+        """Test one round trip drains every viewer from its own cursor"""
+        driver = FakeDriver()
+        page = MultiViewerPage(driver, 3)
+
+        test_logger.info("Step 1: First drain of every viewer")
+        play = {"type": "play", "userId": "viewer-0", "timestamp": "2025-07-21T19:30:45.100Z"}
+        later = {"type": "play", "userId": "viewer-2", "timestamp": "2025-07-21T19:30:45.000Z"}
+        driver.results = [[drained([play], 4), None, drained([later], 9)]]
+        assert page.drain("play") == {"viewer-0": [play], "viewer-1": [], "viewer-2": [later]}
+        assert driver.scripts[-1] == (DRAIN_JS, ([0, 1, 2], [0, 0, 0], "play", None))
+
+        test_logger.info("Step 2: Next drains start after the cursors, or after clear()")
+        driver.results = [[drained([], 4), drained([], 0), drained([], 9)]]
+        page.drain("play")
+        assert driver.scripts[-1][1][1] == [4, 0, 9]
+        driver.results = [[0, 12]]
+        page.clear([1, 2])
+        driver.results = [[drained([later], 20)]]
+        assert page.viewer(2).drain("play") == [later]
+        assert driver.scripts[-1][1][:2] == ([2], [12])
+
+        test_logger.info("Step 3: drain_all orders every viewer's events by timestamp")
+        driver.results = [[drained([play], 5), drained([], 0), drained([later], 21)]]
+        assert page.drain_all("play") == [later, play]
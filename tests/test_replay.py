@@ -0,0 +1,112 @@
+import pytest
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api.event_sink import EventSinkServer
+from api.replay import Replayer, build_schedule, load_events, main, parse_js_literal
+
+NODE_LOG = """Server running at http://localhost:3000
+📩 Event received: {
+  userId: 'user-1',
+  type: 'play',
+  videoTime: 0,
+  timestamp: '2025-07-21T19:30:45.000Z'
+}
+📩 Event received: { userId: "it's", type: 'pause', videoTime: 1.5, timestamp: '2025-07-21T19:30:45.200Z' }
+📩 Event received: {
+  userId: 'user-1',
+  type: 'scroll',
+  videoTime: undefined,
+  meta: { tags: [ 'a', 'b' ] },
+  timestamp: '2025-07-21T19:30:45.400Z'
+}
+"""
+
+
+def recorded_session(count=20, step_ms=50):
+    return [{"userId": "user-1", "type": "play" if i % 2 else "pause", "videoTime": i * 0.05,
+             "timestamp": f"2025-07-21T19:30:{45 + (i * step_ms) // 1000:02d}.{(i * step_ms) % 1000:03d}Z"}
+            for i in range(count)]
+
+
+class TestReplayInput:
+    """Loading recordings and building schedules - no server needed"""
+
+    def test_node_log_parsed(self, tmp_path, test_logger):
+        """Test multi-line util.inspect output from the Node server log"""
+        test_logger.info("Step 1: Load a Node server log")
+        path = tmp_path / "server.log"
+        path.write_text(NODE_LOG, encoding="utf-8")
+        events = load_events(str(path))
+
+        test_logger.info("Step 2: Validate the parsed events")
+        assert [e["type"] for e in events] == ["play", "pause", "scroll"]
+        assert events[1]["userId"] == "it's"
+        assert events[2]["videoTime"] is None
+        assert events[2]["meta"] == {"tags": ["a", "b"]}
+        assert parse_js_literal("{ a: 'x\\'y', b: [ 1, NaN ] }") == {"a": "x'y", "b": [1, None]}
+
+    def test_json_and_jsonl_inputs(self, tmp_path, test_logger):
+        """Test array dumps, wrapped dumps and JSON lines load the same events"""
+        events = recorded_session(3)
+        (tmp_path / "dump.json").write_text(json.dumps(events))
+        (tmp_path / "wrapped.json").write_text(json.dumps({"events": events}))
+        (tmp_path / "body.jsonl").write_text("\n".join(json.dumps({"body": e}) for e in events) + "\n")
+        for name in ("dump.json", "wrapped.json", "body.jsonl"):
+            test_logger.info(f"Step 1: Load {name}")
+            assert load_events(str(tmp_path / name)) == events
+
+    def test_schedule_offsets_and_fan_out(self, test_logger):
+        """Test offsets follow the recorded timing and fan-out rewrites userIds"""
+        test_logger.info("Step 1: Single-user schedule")
+        schedule = build_schedule(recorded_session(5, step_ms=100))
+        assert [round(offset, 3) for offset, _ in schedule] == [0.0, 0.1, 0.2, 0.3, 0.4]
+
+        test_logger.info("Step 2: Three users staggered by one second")
+        schedule = build_schedule(recorded_session(5, step_ms=100), users=3, stagger=1.0)
+        assert len(schedule) == 15
+        assert {e["userId"] for _, e in schedule} == {"user-1-r0", "user-1-r1", "user-1-r2"}
+        assert [offset for offset, _ in schedule] == sorted(offset for offset, _ in schedule)
+        assert round(schedule[-1][0], 3) == 2.4
+
+
+class TestReplayer:
+    """Replays against an in-process event sink"""
+
+    @pytest.fixture
+    def sink(self):
+        with EventSinkServer() as sink:
+            yield sink
+
+    def test_scaled_replay_keeps_timing(self, sink, test_logger):
+        """Test a 10x replay takes about a tenth of the recorded time with low drift"""
+        test_logger.info("Step 1: Replay 1s of events at 10x")
+        schedule = build_schedule(recorded_session(21, step_ms=50))
+        report = Replayer(sink.url, speed=10).run(schedule)
+
+        test_logger.info(f"Step 2: Validate report: {report['send_duration_s']}s, drift {report['drift']}")
+        assert report["events"] == 21 and report["errors"] == 0
+        assert report["target_duration_s"] == pytest.approx(0.1)
+        assert 0.09 <= report["send_duration_s"] < 0.5
+        assert report["drift"]["p50_ms"] < 50
+        assert len(sink.store) == 21
+
+    def test_max_speed_fan_out(self, sink, test_logger, tmp_path):
+        """Test the CLI fans a recording out to many users at max speed"""
+        test_logger.info("Step 1: Replay a 2-event-per-user log for 25 users")
+        path = tmp_path / "server.log"
+        path.write_text(NODE_LOG, encoding="utf-8")
+        report_path = tmp_path / "report.json"
+        status = main([str(path), "--base-url", sink.url, "--users", "25", "--stagger", "60",
+                       "--speed", "max", "--json", str(report_path)])
+
+        test_logger.info("Step 2: Validate the sink saw every synthetic user")
+        report = json.loads(report_path.read_text())
+        assert status == 0
+        assert report["events"] == 75 and report["users"] == 50
+        assert report["send_duration_s"] < 5
+        users = set(sink.store.users())
+        assert {f"user-1-r{n}" for n in range(25)} <= users
+        assert {f"it's-r{n}" for n in range(25)} <= users
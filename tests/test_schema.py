@@ -0,0 +1,50 @@
+import pytest
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api.schema import CompiledSchema, validate_events, validate_jsonl, is_valid
+
+VALID = {"userId": "user-123", "type": "play", "videoTime": 10.0, "timestamp": "2025-07-21T19:30:45.123Z"}
+
+
+class TestSchema:
+    """Event schema tests - compiled checks and batch positions"""
+
+    @pytest.mark.parametrize("field,value", [
+        ("videoTime", True), ("videoTime", float("nan")), ("videoTime", "1"), ("userId", ""),
+        ("userId", 123), ("timestamp", "2025-02-30T10:00:00Z"), ("timestamp", "2025-07-21"),
+    ])
+    def test_rejects_edge_values(self, field, value, test_logger):
+        """Test booleans, NaN, empty ids and impossible dates are rejected"""
+        assert not is_valid({**VALID, field: value})
+
+    def test_valid_event_variants(self, test_logger):
+        """Test integer times, offsets and extra fields are accepted"""
+        assert is_valid(VALID)
+        assert is_valid({**VALID, "videoTime": 0, "timestamp": "2025-07-21T19:30:45+05:30", "extra": 1})
+        assert not CompiledSchema(allow_extra=False).is_valid({**VALID, "extra": 1})
+
+    def test_batch_positions(self, tmp_path, test_logger):
+        """Test arrays report indexes and JSONL files report 1-based lines"""
+        test_logger.info("Step 1: Validate an array")
+        events = [VALID, {**VALID, "type": "bogus"}, VALID, "not an object"]
+        assert [(e.position, e.field) for e in validate_events(events)] == [(1, "type"), (3, None)]
+
+        test_logger.info("Step 2: Validate a JSONL file spanning several blocks")
+        path = tmp_path / "capture.jsonl"
+        lines = [json.dumps(VALID)] * 10000
+        lines[4999] = json.dumps({**VALID, "videoTime": -1})
+        lines[7000] = "{broken"
+        lines.insert(100, "")
+        path.write_text("\n".join(lines) + "\n")
+        count, problems = validate_jsonl(str(path))
+        assert count == 10000
+        assert [(e.position, e.field) for e in problems] == [(5001, "videoTime"), (7002, None)]
+        assert "column" in problems[1].message
+
+    def test_max_errors(self, test_logger):
+        """Test batch validation stops at max_errors"""
+        events = [{}] * 100
+        assert len(validate_events(events, max_errors=10)) == 10
@@ -0,0 +1,106 @@
+import pytest
+import struct
+import sys
+import os
+import zlib
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pages import screenshots
+from pages.screenshots import ScreenshotStore
+from pages.video_page import VideoPage
+from tests.fake_driver import FakeDriver
+
+
+def make_png(width, height, shade):
+    """Solid grey PNG built with zlib only"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    rows = b"".join(b"\x00" + bytes([shade]) * width for _ in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+def screen_driver(png):
+    """A driver whose screenshot is `png` and whose #video sits at (10, 10)-(50, 40)"""
+    return FakeDriver(default=[10, 10, 50, 40], png=png)
+
+
+class TestScreenshotStore:
+    """Screenshot pipeline tests - background writes, dedup and size cap"""
+
+    def test_identical_shots_stored_once(self, tmp_path, test_logger):
+        """Test repeated failures with the same frame share one file"""
+        store = ScreenshotStore(directory=str(tmp_path))
+        driver = screen_driver(make_png(64, 48, 120))
+
+        test_logger.info("Step 1: Capture the same frame three times")
+        shots = [store.capture(driver, f"chrome] video not playing {i}") for i in range(3)]
+        assert store.flush(timeout=10)
+
+        test_logger.info("Step 2: Validate one file, three index names")
+        assert len({shot.path for shot in shots}) == 1
+        assert [shot.duplicate for shot in shots] == [False, True, True]
+        index = store.index()
+        assert len(index["files"]) == 1
+        assert len(index["names"]) == 3
+        assert all("]" not in name and " " not in name for name in index["names"])
+
+    def test_size_cap_evicts_least_recently_used(self, tmp_path, test_logger):
+        """Test the directory stays under max_bytes by dropping the oldest shots"""
+        frames = [make_png(64, 48, shade) for shade in (10, 90, 170, 250)]
+        store = ScreenshotStore(directory=str(tmp_path), max_bytes=int(len(frames[0]) * 2.5), max_distance=-1)
+
+        test_logger.info("Step 1: Capture four different frames")
+        shots = []
+        for frame in frames:
+            shots.append(store.capture(screen_driver(frame), "frame"))
+            store.flush(timeout=10)
+
+        test_logger.info("Step 2: Validate only the two newest remain")
+        stored = sorted(p for p in os.listdir(tmp_path) if p.endswith((".png", ".webp")))
+        assert len(stored) == 2
+        assert not os.path.exists(shots[0].path)
+        assert os.path.exists(shots[-1].path)
+        assert store.evicted == 2
+
+    def test_near_duplicates_share_a_file(self, tmp_path, test_logger):
+        """Test frames that differ slightly are deduplicated by perceptual hash"""
+        pytest.importorskip("PIL")
+        store = ScreenshotStore(directory=str(tmp_path))
+        first = store.capture(screen_driver(make_png(64, 48, 120)), "a")
+        second = store.capture(screen_driver(make_png(64, 48, 122)), "b")
+        store.flush(timeout=10)
+        assert first.path == second.path
+        assert first.path.endswith(".webp")
+
+    def test_fail_with_screenshot_keeps_api(self, tmp_path, test_logger):
+        """Test fail_with_screenshot raises at once with the queued name, captures once and keeps the full page"""
+        driver = screen_driver(make_png(32, 32, 60))
+        page = VideoPage(driver, screenshots=ScreenshotStore(directory=str(tmp_path)))
+
+        test_logger.info("Step 1: Fail with the default full-page shot")
+        with pytest.raises(AssertionError, match="video_not_paused") as failure:
+            page.fail_with_screenshot("chrome] video not paused", test_logger)
+        assert driver.captures == 1
+        assert driver.scripts == []
+        assert os.path.join(str(tmp_path), "index.json") in str(failure.value)
+
+        test_logger.info("Step 2: The queued name resolves to its file once flushed")
+        assert page.screenshots.flush(timeout=10)
+        names = page.screenshots.index()["names"]
+        assert len(names) == 1
+        name, = names
+        assert f"Screenshot: {name} in " in str(failure.value)
+
+        test_logger.info("Step 3: crop=True asks the page for the video's rect")
+        with pytest.raises(AssertionError):
+            page.fail_with_screenshot("chrome] video not paused", test_logger, crop=True)
+        assert len(driver.scripts) == 1
+
+    def test_stores_share_one_exit_hook(self, tmp_path, test_logger):
+        """Test new stores join the module's flush-at-exit set instead of registering a hook each"""
+        with mock.patch("atexit.register") as register:
+            stores = [ScreenshotStore(directory=str(tmp_path)) for _ in range(3)]
+        register.assert_not_called()
+        assert all(store in screenshots._stores for store in stores)
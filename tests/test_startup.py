@@ -0,0 +1,78 @@
+import pytest
+import glob
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_TESTS = sorted(os.path.relpath(path, PROJECT_ROOT)
+                   for path in glob.glob(os.path.join(PROJECT_ROOT, "tests", "test_api_*.py")))
+BROWSER_MODULES = ("selenium", "webdriver_manager")
+
+# Collecting the API tests may take at most this many times as long as a
+# baseline collection of this module alone (pytest, plugins and conftest),
+# so a slow agent slows both sides. An absolute budget in seconds, which
+# only holds on a known machine, is checked only when STARTUP_BUDGET_S is set.
+BASELINE_TESTS = ["tests/test_startup.py"]
+STARTUP_RATIO = float(os.getenv("STARTUP_RATIO", "2.5"))
+STARTUP_BUDGET_S = float(os.getenv("STARTUP_BUDGET_S", "0")) or None
+
+# Collects the given tests in this interpreter and reports how long that
+# took and which browser modules got imported.
+COLLECT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import pytest
+code = pytest.main(["--collect-only", "-q", "-p", "no:cacheprovider"] + sys.argv[1:])
+print(json.dumps({"code": int(code), "seconds": time.perf_counter() - started,
+                  "loaded": [name for name in %r if name in sys.modules]}))
+""" % (BROWSER_MODULES,)
+
+
+def run_python(args, project_root):
+    """Run python in a clean environment (not this run's log directory or xdist worker)"""
+    env = {name: value for name, value in os.environ.items()
+           if name not in ("TEST_RUN_ID", "PYTEST_XDIST_WORKER", "PYTEST_XDIST_TESTRUNUID", "PYTEST_CURRENT_TEST")}
+    env["PROJECT_ROOT"] = str(project_root)
+    return subprocess.run([sys.executable] + args, cwd=PROJECT_ROOT, env=env,
+                          capture_output=True, text=True, timeout=60)
+
+
+def collect(tests, project_root):
+    output = run_python(["-c", COLLECT_SCRIPT] + list(tests), project_root)
+    assert output.returncode == 0, output.stderr
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+class TestStartup:
+    """Import- and collection-time guards for the API-only loop"""
+
+    def test_conftest_import_has_no_side_effects(self, tmp_path, test_logger):
+        """Test importing conftest creates no directories or files"""
+        output = run_python(["-c", "import tests.conftest"], tmp_path)
+        assert output.returncode == 0, output.stderr
+        assert list(tmp_path.iterdir()) == []
+
+    def test_collection_skips_browser_stack(self, tmp_path, test_logger):
+        """Test collecting the browser tests does not import selenium or webdriver_manager"""
+        result = collect(API_TESTS + ["tests/test_video.py"], tmp_path)
+        test_logger.info(f"API + video collection: {result}")
+        assert result["code"] == 0
+        assert result["loaded"] == []
+
+    def test_api_collection_time(self, tmp_path, test_logger):
+        """Test collecting the API tests costs at most STARTUP_RATIO times a bare collection"""
+        test_logger.info(f"Step 1: Collect {BASELINE_TESTS} and {API_TESTS}, three times each, interleaved")
+        baseline, timings = [], []
+        for _ in range(3):
+            baseline.append(collect(BASELINE_TESTS, tmp_path)["seconds"])
+            timings.append(collect(API_TESTS, tmp_path)["seconds"])
+        test_logger.info(f"Baseline collection: {', '.join(f'{t:.3f}s' for t in baseline)}")
+        test_logger.info(f"API collection: {', '.join(f'{t:.3f}s' for t in timings)}")
+
+        test_logger.info("Step 2: Validate the fastest runs against each other")
+        assert min(timings) < min(baseline) * STARTUP_RATIO, \
+            f"API collection took {min(timings):.2f}s, baseline {min(baseline):.2f}s"
+        if STARTUP_BUDGET_S:
+            assert min(timings) < STARTUP_BUDGET_S, f"API collection took {min(timings):.2f}s"
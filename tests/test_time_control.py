@@ -0,0 +1,111 @@
+import pytest
+import json
+import shutil
+import subprocess
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pages.time_control import CLOCK_JS, MAX_PLAYBACK_RATE, TimeControl
+from pages.video_page import VideoPage
+from tests.fake_driver import FakeDriver
+
+# Runs CLOCK_JS in Node with a minimal window, scales and advances the
+# clock, and prints what the page would observe.
+CLOCK_HARNESS = """
+global.window = global;
+const started = Date.now();
+%s
+const realMs = () => Number(process.hrtime.bigint()) / 1e6;
+const t0 = Date.now();
+const perf0 = performance.now();
+window.__clock.setScale(10);
+const realStart = realMs();
+const realPerfStart = window.__clock.realPerfNow();
+const target = Date.now() + 1000;
+while (Date.now() < target) {}
+const realForSecond = realMs() - realStart;
+const realPerfForSecond = window.__clock.realPerfNow() - realPerfStart;
+const before = Date.now();
+const advanced = window.__clock.advance(5000) - before;
+const timerStart = realMs();
+setTimeout(() => {
+    console.log(JSON.stringify({
+        startedNearRealTime: Math.abs(t0 - started) < 50,
+        realMsForVirtualSecond: realForSecond,
+        realPerfForVirtualSecond: realPerfForSecond,
+        perfScaled: performance.now() - perf0,
+        advanced: advanced,
+        isDate: new Date() instanceof Date,
+        parsed: new Date('2025-07-21T19:30:45.000Z').toISOString(),
+        iso: new Date().toISOString().length,
+        timerRealMs: realMs() - timerStart
+    }));
+}, 1000);
+"""
+
+
+class TestTimeControl:
+    """Time control scripts - no browser needed"""
+
+    def test_rate_clamped_and_clock_scaled(self, test_logger):
+        """Test the requested rate is clamped and the clock shim is registered for new documents"""
+        driver = FakeDriver([None, 16.0], cdp=True)
+        control = VideoPage(driver).time
+
+        test_logger.info("Step 1: Ask for 100x")
+        assert control.set_playback_rate(100) == 16.0
+        assert control.rate == 16.0
+
+        test_logger.info("Step 2: Validate the clock shim and the clamped rate")
+        assert driver.cdp_commands == [("Page.addScriptToEvaluateOnNewDocument", {"source": CLOCK_JS})]
+        (shim, _), (_, args) = driver.scripts
+        assert shim == CLOCK_JS
+        assert args == (MAX_PLAYBACK_RATE, True)
+
+    def test_step_and_fast_forward_errors(self, test_logger):
+        """Test page-side failures surface as AssertionError"""
+        driver = FakeDriver([None, "error: no seeked event"])
+        control = TimeControl(VideoPage(driver))
+        with pytest.raises(AssertionError, match="no seeked event"):
+            control.step(2)
+        driver.results = [3.0, 23.5]
+        assert control.fast_forward(20) == 23.5
+        assert driver.scripts[-1][1][0] == 23.0
+
+        test_logger.info("Step 1: The driver waits longer than the in-page timeout, then goes back")
+        page_timeout = control.page.script_timeout
+        assert driver.script_timeouts[-2:] == [20 + control.page.event_timeout + 5, page_timeout]
+
+    def test_virtual_time_needs_devtools(self, test_logger):
+        """Test virtual time reports False without the DevTools protocol"""
+        driver = FakeDriver([1000])
+        control = TimeControl(VideoPage(driver))
+        assert control.virtual_time(5) is False
+        assert not control.virtualized
+
+        test_logger.info("Step 1: With DevTools, wait for the page clock to pass the budget")
+        driver = FakeDriver([1000, 3000, 6000], cdp=True)
+        control = TimeControl(VideoPage(driver))
+        assert control.virtual_time(5) is True
+        assert control.virtualized
+        assert driver.cdp_commands == [("Emulation.setVirtualTimePolicy", {"policy": "advance", "budget": 5000})]
+
+    @pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+    def test_clock_shim(self, test_logger):
+        """Test the clock shim scales Date, performance.now and timers, can jump ahead and keeps the real clock"""
+        test_logger.info("Step 1: Run the shim in Node at 10x")
+        output = subprocess.run(["node", "-e", CLOCK_HARNESS % CLOCK_JS], capture_output=True, text=True, timeout=30)
+        assert output.returncode == 0, output.stderr
+        result = json.loads(output.stdout)
+        test_logger.info(f"Shim observations: {result}")
+
+        test_logger.info("Step 2: Validate scaled and advanced time")
+        assert result["startedNearRealTime"]
+        assert result["realMsForVirtualSecond"] < 300
+        assert result["realPerfForVirtualSecond"] < 300
+        assert result["perfScaled"] >= 1000
+        assert 5000 <= result["advanced"] < 5100
+        assert result["isDate"] and result["iso"] == 24
+        assert result["parsed"] == "2025-07-21T19:30:45.000Z"
+        assert result["timerRealMs"] < 300
@@ -0,0 +1,66 @@
+import pytest
+import json
+import logging
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api.event_api import EventAPI
+from tests.timing_plugin import TimingPlugin, merge_traces
+
+
+class TestTimingPlugin:
+    """Timing plugin tests - spans for steps and HTTP calls, trace export"""
+
+    def test_spans_for_steps_and_requests(self, api_base_url, tmp_path, test_logger):
+        """Test steps, API methods and HTTP requests each get a span"""
+        plugin = TimingPlugin(str(tmp_path / "trace.json"))
+        plugin.instrument()
+        logging.getLogger().addHandler(plugin._handler)
+        try:
+            test_logger.info("Step 1: Send one event")
+            EventAPI(api_base_url).send_event("play", 1.0)
+            test_logger.info("Step 2: Finish")
+            plugin.end_step()
+        finally:
+            logging.getLogger().removeHandler(plugin._handler)
+            plugin.restore()
+
+        names = {(s["cat"], s["name"]) for s in plugin.spans}
+        assert ("step", "Step 1: Send one event") in names
+        assert ("api", "EventAPI.send_event") in names
+        assert ("http", "POST /api/event") in names
+        step = next(s for s in plugin.spans if s["name"] == "Step 1: Send one event")
+        http = next(s for s in plugin.spans if s["cat"] == "http")
+        assert step["ts"] <= http["ts"] and http["ts"] + http["dur"] <= step["ts"] + step["dur"]
+        assert set(plugin.totals()) == {"api", "http"}
+
+    def test_worker_parts_merge_into_one_trace(self, tmp_path, test_logger):
+        """Test per-worker span files merge into a single Chrome trace"""
+        target = str(tmp_path / "trace.json")
+        for worker in ("gw0", "gw1"):
+            plugin = TimingPlugin(target, worker)
+            plugin.record("call", "phase", 0.0, 10.0)
+            plugin.write_part()
+
+        merge_traces(f"{target}.parts", target)
+        with open(target) as f:
+            trace = json.load(f)
+        assert {e["pid"] for e in trace["traceEvents"]} == {1, 2}
+        assert sum(e["ph"] == "X" for e in trace["traceEvents"]) == 2
+        assert not os.path.exists(f"{target}.parts")
+
+    def test_nested_spans_counted_once(self, tmp_path, test_logger):
+        """Test a span inside another of the same category adds no time"""
+        plugin = TimingPlugin(str(tmp_path / "trace.json"))
+
+        test_logger.info("Step 1: send_event wrapping post, then a separate call")
+        plugin.record("EventAPI.send_event", "api", 0.0, 3492.0)
+        plugin.record("EventAPI.post", "api", 10.0, 3487.0)
+        plugin.record("EventAPI.post", "api", 5000.0, 6000.0)
+        plugin.record("POST /api/event", "http", 20.0, 3400.0)
+
+        test_logger.info("Step 2: Validate the per-category totals")
+        totals = plugin.totals()
+        assert totals["api"] == pytest.approx(0.004492)
+        assert totals["http"] == pytest.approx(0.00338)
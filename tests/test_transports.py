@@ -0,0 +1,74 @@
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api.event_api import EventAPI
+from api.event_sink import EventSinkServer
+from api.transports import InProcessTransport, UnixSocketTransport, shared_transport, transport_for
+
+
+def events(count, user="transport-user"):
+    return ({"userId": user, "type": "play", "videoTime": float(i), "timestamp": "2025-07-21T19:30:45.123Z"}
+            for i in range(count))
+
+
+class TestTransports:
+    """EventAPI over each transport against the Python event sink"""
+
+    def test_in_process(self, test_logger):
+        """Test the in-process transport reaches a sink that never listens on a socket"""
+        sink = EventSinkServer()
+        api = EventAPI(transport=InProcessTransport(sink.handle))
+
+        test_logger.info("Step 1: Single, bulk and streamed events")
+        response = api.send_event("play", 1.0)
+        assert response.status_code == 200 and response.json() == {"ok": True}
+        response = api.send_events(events(2500), chunk_events=1000)
+        assert response.json()["accepted"] == 2500
+        response = api.session.post(f"{api.base_url}{api.bulk_endpoint}", data=json.dumps(list(events(3))),
+                                    headers={"Content-Type": "application/json"})
+        assert response.ok and response.json()["accepted"] == 3
+
+        test_logger.info("Step 2: Errors come back as HTTP responses")
+        response = api.session.post(f"{api.base_url}{api.endpoint}", data="{not json",
+                                    headers={"Content-Type": "application/json"})
+        assert response.status_code == 400 and response.reason == "Bad Request"
+        assert api.session.get(f"{api.base_url}/missing.js").status_code == 404
+        assert len(sink.store) == 2504
+        assert sink.port == 0
+
+    def test_unix_socket(self, tmp_path, test_logger):
+        """Test EventAPI on an http+unix:// URL uses one pooled Unix-socket connection"""
+        socket_path = str(tmp_path / "events.sock")
+        with EventSinkServer(unix_path=socket_path) as sink:
+            test_logger.info(f"Step 1: Send events to {sink.url}")
+            api = EventAPI(sink.url)
+            assert isinstance(api.transport, UnixSocketTransport)
+            assert EventAPI(sink.url).transport is api.transport
+            for i in range(20):
+                assert api.send_event("pause", float(i)).status_code == 200
+            assert api.send_events(events(100)).json()["accepted"] == 100
+
+            test_logger.info("Step 2: Validate one connection carried every request")
+            assert len(sink.store) == 120
+            assert api.session.get_adapter(sink.url)._pool.num_connections == 1
+        assert not os.path.exists(socket_path)
+
+    def test_shared_pool(self, event_sink, test_logger):
+        """Test EventAPI instances for http URLs share one keep-alive pool"""
+        test_logger.info("Step 1: Two EventAPI instances send to the same sink")
+        first, second = EventAPI(event_sink.url), EventAPI(event_sink.url)
+        assert first.session is second.session is shared_transport().session
+        assert transport_for("https://example.com") is shared_transport()
+        pools = first.session.get_adapter(event_sink.url).poolmanager.pools
+
+        def connections():
+            return sum(pools[key].num_connections for key in pools.keys() if key.key_port == event_sink.port)
+
+        opened = connections()
+        for api in (first, second) * 10:
+            assert api.send_event("play", 2.0).status_code == 200
+
+        test_logger.info("Step 2: Validate the connection was reused")
+        assert connections() - opened <= 1
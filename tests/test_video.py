@@ -1,36 +1,45 @@
 import pytest
-import time
 import os
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
 import sys
+import logging
+import time
 import datetime
+import urllib.parse
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from pages.video_page import VideoPage
+from pages.event_capture import EventCapture
+from pages.multi_viewer_page import MultiViewerPage
+from pages.latency_trace import STAGES, LatencyTrace
+from drivers.pool import DriverPool
+from drivers.resolver import invalidate_driver, resolve_driver
+from media.server import MediaServer
+from media.synth import MediaUnavailable, synthetic_video
 
 def get_events(driver, event_type=None):
-    """locate event"""
-    events = driver.execute_script("return window.capturedEvents || []")
-    if event_type:
-        return [e for e in events if e.get('type') == event_type]
-    return events
+    """Events (optionally of one type) captured since the last call for that type"""
+    return EventCapture.for_driver(driver).drain(event_type)
+
+
+def clear_events(driver):
+    """Ignore every event captured so far"""
+    EventCapture.for_driver(driver).clear()
+
+
+def get_traces(driver):
+    """Latency traces of the events the page sent since the last call (page loaded with trace=True)"""
+    return LatencyTrace.for_driver(driver).collect()
 
 
 def get_chrome_driver(logger):
     """Create Chrome driver with proper path"""
+    from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
+    from selenium.webdriver.chrome.service import Service as ChromeService
     logger.info("Setting up Chrome driver...")
 
-    # Get the correct chromedriver path
-    driver_path = ChromeDriverManager().install()
-
-    # Fix the path if it points to wrong file
-    if driver_path.endswith('THIRD_PARTY_NOTICES.chromedriver'):
-        driver_path = driver_path.replace('THIRD_PARTY_NOTICES.chromedriver', 'chromedriver.exe')
-
+    # Cached per machine; only the first run may hit the network
+    driver_path = resolve_driver("chrome", logger)
     logger.info(f"Chrome driver path: {driver_path}")
 
     service = ChromeService(driver_path)
@@ -38,15 +47,24 @@ def get_chrome_driver(logger):
     options.add_argument("--autoplay-policy=no-user-gesture-required")
     options.add_argument("--disable-blink-features=AutomationControlled")
 
-    return webdriver.Chrome(service=service, options=options)
+    try:
+        return webdriver.Chrome(service=service, options=options)
+    except SessionNotCreatedException as e:
+        # Usually a cached driver left behind by a Chrome update: resolve once more
+        logger.warning(f"Chrome session not created with {driver_path} ({e.msg}); resolving the driver again")
+        invalidate_driver("chrome")
+        service = ChromeService(resolve_driver("chrome", logger))
+        return webdriver.Chrome(service=service, options=options)
 
 
 def get_firefox_driver(logger):
     """Create Firefox driver"""
+    from selenium import webdriver
+    from selenium.webdriver.firefox.service import Service as FirefoxService
     logger.info("Setting up Firefox driver...")
 
 
-    service = FirefoxService(GeckoDriverManager().install())
+    service = FirefoxService(resolve_driver("firefox", logger))
     options = webdriver.FirefoxOptions()
     options.set_preference("media.autoplay.default", 0)
     options.set_preference("media.autoplay.blocking_policy", 0)
@@ -54,50 +72,106 @@ def get_firefox_driver(logger):
     return webdriver.Firefox(service=service, options=options)
 
 
+APP_URL = "http://localhost:3000"
+DRIVER_MAX_USES = int(os.getenv("DRIVER_MAX_USES", "20"))
+
+TEST_VIDEO_DURATION = int(os.getenv("TEST_VIDEO_DURATION", "30"))
+# Set where ffmpeg is provisioned: a missing ffmpeg then fails the run
+# instead of falling back to the CDN video (media_src) or skipping the seek
+# benchmarks.
+REQUIRE_LOCAL_MEDIA = os.getenv("REQUIRE_LOCAL_MEDIA", "") not in ("", "0")
+MULTI_VIEWERS = int(os.getenv("MULTI_VIEWERS", "20"))
+
+def reset_page(driver, src=None, trace=False):
+    """Load a fresh app page (playing `src` when given) with event capture attached;
+    `trace` turns on event latency tracing"""
+    capture = EventCapture.for_driver(driver)
+    query = {}
+    if src:
+        query["src"] = src
+    if trace:
+        query["trace"] = "1"
+    driver.get(f"{APP_URL}/?{urllib.parse.urlencode(query)}" if query else APP_URL)
+    capture.attach()
+    LatencyTrace.for_driver(driver).clear()
+
+
+@pytest.fixture(scope="session")
+def media_server():
+    """Local range-capable server for synthetic videos (one per xdist worker)"""
+    server = MediaServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def media_src(media_server):
+    """Video URL for the page: TEST_VIDEO_SRC, else a local synthetic file, else the CDN default"""
+    logger = logging.getLogger(__name__)
+    if os.getenv("TEST_VIDEO_SRC"):
+        logger.info(f"Video source: TEST_VIDEO_SRC {os.getenv('TEST_VIDEO_SRC')}")
+        return os.getenv("TEST_VIDEO_SRC")
+    try:
+        path = synthetic_video(duration=TEST_VIDEO_DURATION, cache_dir=media_server.directory)
+    except MediaUnavailable as e:
+        if REQUIRE_LOCAL_MEDIA:
+            pytest.fail(f"REQUIRE_LOCAL_MEDIA is set but the local test video is unavailable: {e}")
+        logger.warning(f"Video source: CDN default (local test video unavailable: {e})")
+        return None
+    logger.info(f"Video source: local synthetic {path}")
+    return media_server.url_for(path)
+
+
+@pytest.fixture(scope="session")
+def driver_pool():
+    """Warm drivers shared by all tests of this process (one pool per xdist worker)"""
+    pool = DriverPool(
+        {"chrome": get_chrome_driver, "firefox": get_firefox_driver},
+        max_uses=DRIVER_MAX_USES,
+    )
+    yield pool
+    pool.close()
+
+
 @pytest.fixture
-def setup_driver(request,test_logger):
+def setup_driver(request, driver_pool, media_src, test_logger):
     """Setup driver based on browser parameter"""
+    # The browser stack loads here, not at import: collecting this module
+    # (e.g. with -k or -m deselecting it) stays cheap.
+    from selenium.common.exceptions import WebDriverException
     browser = request.param
+    driver = None
 
     try:
-        if browser == "chrome":
-            driver = get_chrome_driver(test_logger)
-        else:  # firefox
-            driver = get_firefox_driver(test_logger)
-
-        driver.maximize_window()
-        driver.get("http://localhost:3000")
-
-        #Inject JavaScript
-        driver.execute_script("""
-            window.capturedEvents = [];
-            const originalFetch = window.fetch;
-            window.fetch = function(...args) {
-                if (args[0] === '/api/event') {
-                    const body = JSON.parse(args[1].body);
-                    window.capturedEvents.push(body);
-                }
-                return originalFetch.apply(this, args);
-            };
-        """)
+        driver = driver_pool.acquire(browser, test_logger)
+        try:
+            reset_page(driver, media_src)
+        except WebDriverException as e:
+            # A pooled browser may have died between tests; start a new one.
+            test_logger.warning(f"Pooled {browser} driver unusable ({e.msg}), relaunching")
+            driver_pool.discard(driver)
+            driver = None
+            driver = driver_pool.acquire(browser, test_logger)
+            reset_page(driver, media_src)
 
         # Create page object
         page = VideoPage(driver)
         page.wait_for_video_ready()
 
-        yield driver, page, browser
-
     except Exception as e:
         test_logger.error(f"Failed to setup {browser}: {str(e)}")
+        if driver is not None:
+            driver_pool.discard(driver)
         if browser == "firefox":
             pytest.skip(f"Firefox not available: {str(e)}")
-        else:
-            raise
-    finally:
-        if 'driver' in locals():
-            test_logger.info(f"Closing {browser} driver...")
-            driver.quit()
+        raise
 
+    yield driver, page, browser
+
+    report = getattr(request.node, "rep_call", None)
+    failed = report is None or report.failed
+    # A browser left on DevTools virtual time is not reused.
+    driver_pool.release(browser, driver, failed=failed or page.time.virtualized, logger=test_logger)
 
 
 @pytest.mark.parametrize("setup_driver", ["chrome","firefox"], indirect=True)
@@ -108,10 +182,11 @@ class TestVideoPlayer:
         driver, page, browser = setup_driver
 
         test_logger.info(f"[{browser.upper()}] Step 1: Click play button")
-        page.play_video()
+        played = page.play_video()
 
         test_logger.info(f"[{browser.upper()}] Step 2: Wait for event to be sent")
-        time.sleep(1)
+        if not played:
+            test_logger.warning(f"[{browser.upper()}] No 'playing' event: {page.last_wait_error}")
 
         test_logger.info(f"[{browser.upper()}] Step 3: Verify video is playing")
         is_playing = page.is_playing()
@@ -140,14 +215,12 @@ class TestVideoPlayer:
 
         test_logger.info(f"[{browser.upper()}] Step 1: Play video first")
         page.play_video()
-        time.sleep(1)
 
         test_logger.info(f"[{browser.upper()}] Step 2: Clear previous events")
-        driver.execute_script("window.capturedEvents = []")
+        clear_events(driver)
 
         test_logger.info(f"[{browser.upper()}] Step 3: Click pause button")
         page.pause_video()
-        time.sleep(1)
 
         test_logger.info(f"[{browser.upper()}] Step 4: Verify video is paused")
         is_paused = page.is_paused()
@@ -180,17 +253,15 @@ class TestVideoPlayer:
 
         test_logger.info(f"[{browser.upper()}] Step 1: Play video")
         page.play_video()
-        time.sleep(1)
 
         test_logger.info(f"[{browser.upper()}] Step 2: Get video duration")
         duration = page.get_duration()
         test_logger.info(f"[{browser.upper()}] Video duration: {duration:.1f} seconds")
 
         test_logger.info(f"[{browser.upper()}] Step 3: Clear events and seek to 10 seconds")
-        driver.execute_script("window.capturedEvents = []")
+        clear_events(driver)
         seek_time = 10.0
         page.seek_video(seek_time)
-        time.sleep(1)
 
         test_logger.info(f"[{browser.upper()}] Step 4: Verify seek worked")
         current_time = page.get_current_time()
@@ -219,23 +290,22 @@ class TestVideoPlayer:
 
         test_logger.info(f"[{browser.upper()}] Step 2: Scroll to top")
         page.scroll_to_position(0)
-        time.sleep(1)
 
         test_logger.info(f"[{browser.upper()}] Step 3: Clear events and scroll down")
-        driver.execute_script("window.capturedEvents = []")
+        clear_events(driver)
         page.scroll_to_position(500)
-        time.sleep(1)
 
         test_logger.info(f"[{browser.upper()}] Step 4: Check initial scroll events")
+        page.flush_events()
         events = get_events(driver, 'scroll')
         initial_events = len(events)
         test_logger.info(f"[{browser.upper()}] Scroll events after first scroll: {initial_events}")
 
         test_logger.info(f"[{browser.upper()}] Step 5: Scroll more")
         page.scroll_to_position(1000)
-        time.sleep(1)
 
-        events = get_events(driver, 'scroll')
+        page.flush_events()
+        events = events + get_events(driver, 'scroll')
         test_logger.info(f"[{browser.upper()}] Total scroll events: {len(events)}")
 
         if len(events) == 0:
@@ -247,4 +317,177 @@ class TestVideoPlayer:
         assert event['type'] == 'scroll'
         assert 'videoTime' in event
         assert 'timestamp' in event
-        test_logger.info(f"[{browser.upper()}] passed Scroll event valid: {event}")
\ No newline at end of file
+        test_logger.info(f"[{browser.upper()}] passed Scroll event valid: {event}")
+
+    def test_scroll_requests_bounded(self, setup_driver, test_logger):
+        """Scroll reports are throttled and batched"""
+        driver, page, browser = setup_driver
+        capture = EventCapture.for_driver(driver)
+
+        test_logger.info(f"[{browser.upper()}] Step 1: Add content and scroll smoothly for ~1s")
+        page.add_scroll_content()
+        before = capture.request_counts()
+        clear_events(driver)
+        page.smooth_scroll(1500, frames=60)
+        page.flush_events()
+
+        test_logger.info(f"[{browser.upper()}] Step 2: Validate request and event counts")
+        events = get_events(driver, 'scroll')
+        after = capture.request_counts()
+        batches = after.get("/api/events", 0) - before.get("/api/events", 0)
+        singles = after.get("/api/event", 0) - before.get("/api/event", 0)
+        test_logger.info(f"[{browser.upper()}] {len(events)} scroll events in {batches} batch requests")
+        assert len(events) > 0, f"[{browser}] no scroll events"
+        assert batches <= 3, f"[{browser}] {batches} batch requests for one scroll gesture"
+        assert singles == 0, f"[{browser}] scroll sent as single events"
+        assert len(events) <= 10, f"[{browser}] scroll reports not throttled: {len(events)}"
+
+    def test_event_latency_trace(self, setup_driver, media_src, test_logger):
+        """Traced events report where their time goes, per event type"""
+        driver, page, browser = setup_driver
+
+        test_logger.info(f"[{browser.upper()}] Step 1: Reload the page with tracing")
+        reset_page(driver, media_src, trace=True)
+        page.wait_for_video_ready()
+
+        test_logger.info(f"[{browser.upper()}] Step 2: Play, seek and scroll")
+        page.play_video()
+        page.seek_video(3)
+        page.add_scroll_content()
+        page.scroll_to_position(500)
+        page.flush_events()
+
+        test_logger.info(f"[{browser.upper()}] Step 3: Collect the traces")
+        trace = LatencyTrace.for_driver(driver)
+        deadline = time.monotonic() + page.event_timeout
+        while time.monotonic() < deadline:
+            get_traces(driver)
+            if {"play", "seeked", "scroll"} <= {t["type"] for t in trace.traces}:
+                break
+            time.sleep(0.1)
+        histograms = trace.histograms()
+        test_logger.info(f"[{browser.upper()}] Clock offset {trace.offset:.2f} ms, summary: {trace.summary()}")
+
+        test_logger.info(f"[{browser.upper()}] Step 4: Validate every stage was measured")
+        assert {"play", "seeked", "scroll"} <= set(histograms), f"[{browser}] traced types: {set(histograms)}"
+        for event_type, by_stage in histograms.items():
+            assert set(by_stage) == set(STAGES)
+            assert all(h.total == by_stage["delivery"].total for h in by_stage.values())
+            assert by_stage["delivery"].max < page.event_timeout * 1_000_000, f"[{browser}] {event_type} too slow"
+        assert trace.incomplete == 0
+
+    def test_long_session_fast_forward(self, setup_driver, test_logger):
+        """20 s of playback at the maximum rate, then stepped playback, with consistent event times"""
+        driver, page, browser = setup_driver
+        page.add_scroll_content()
+
+        def event_time(event):
+            return datetime.datetime.fromisoformat(event['timestamp'].replace('Z', '+00:00')).timestamp()
+
+        test_logger.info(f"[{browser.upper()}] Step 1: Play at the maximum playback rate")
+        rate = page.time.set_playback_rate(16)
+        page.play_video()
+        page.scroll_to_position(100)
+        page.flush_events()
+        start = get_events(driver, 'scroll')[-1]
+        started = time.monotonic()
+
+        test_logger.info(f"[{browser.upper()}] Step 2: Fast-forward 20 s of media at {rate}x")
+        page.time.fast_forward(20)
+        elapsed = time.monotonic() - started
+        page.scroll_to_position(400)
+        page.flush_events()
+        end = get_events(driver, 'scroll')[-1]
+        test_logger.info(f"[{browser.upper()}] 20 s of media played in {elapsed:.1f} s")
+        assert elapsed < 20 / rate + 5, f"[{browser}] fast-forward took {elapsed:.1f}s at {rate}x"
+
+        test_logger.info(f"[{browser.upper()}] Step 3: Page clock kept pace with videoTime")
+        media = end['videoTime'] - start['videoTime']
+        clock = event_time(end) - event_time(start)
+        assert media >= 20
+        assert abs(clock - media) < max(1.0, 0.1 * media), f"[{browser}] clock {clock:.1f}s vs media {media:.1f}s"
+
+        test_logger.info(f"[{browser.upper()}] Step 4: Step playback 3 x 2 s")
+        page.time.set_playback_rate(1)
+        clear_events(driver)
+        positions = [page.time.step(2) for _ in range(3)]
+        seeked = get_events(driver, 'seeked')
+        assert [round(b - a, 1) for a, b in zip(positions, positions[1:])] == [2.0, 2.0]
+        assert len(seeked) == 3, f"[{browser}] {len(seeked)} seeked events for 3 steps"
+        for before, after in zip(seeked, seeked[1:]):
+            assert abs((event_time(after) - event_time(before)) - (after['videoTime'] - before['videoTime'])) < 1.0
+
+
+class TestMultiViewer:
+    """Many viewers in one Chrome tab"""
+
+    def test_viewers_send_isolated_events(self, driver_pool, media_src, test_logger):
+        """Every viewer plays and seeks with its own userId; one viewer can be driven alone"""
+        driver = driver_pool.acquire("chrome", test_logger)
+        failed = True
+        try:
+            test_logger.info(f"Step 1: Open {MULTI_VIEWERS} viewers")
+            page = MultiViewerPage(driver, MULTI_VIEWERS, app_url=APP_URL, src=media_src).open()
+
+            test_logger.info("Step 2: Play all viewers")
+            assert page.play(), f"viewers not playing: {page.last_wait_failures}"
+            plays = page.drain("play")
+            assert all(len(plays[user]) == 1 for user in page.user_ids), plays
+            assert all(events[0]["userId"] == user for user, events in plays.items())
+
+            test_logger.info("Step 3: Seek only the first viewer")
+            page.clear()
+            first = page.viewer(0)
+            assert first.seek(5)
+            seeked = page.drain("seeked")
+            assert [user for user, events in seeked.items() if events] == [first.user_id]
+            assert abs(seeked[first.user_id][0]["videoTime"] - 5) < 1
+
+            test_logger.info("Step 4: Seek every viewer")
+            assert page.seek(2)
+            events = page.drain_all("seeked")
+            assert sorted(e["userId"] for e in events) == sorted(page.user_ids)
+            failed = False
+        finally:
+            driver_pool.release("chrome", driver, failed=failed, logger=test_logger)
+
+
+SEEK_BITRATES = [250, 2000, 8000]
+
+
+@pytest.mark.parametrize("bitrate_kbps", SEEK_BITRATES)
+class TestSeekLatency:
+    """Seek latency against local synthetic videos of increasing size"""
+
+    def test_seek_latency(self, bitrate_kbps, driver_pool, media_server, test_logger):
+        try:
+            path = synthetic_video(duration=TEST_VIDEO_DURATION, bitrate_kbps=bitrate_kbps,
+                                   cache_dir=media_server.directory)
+        except MediaUnavailable as e:
+            if REQUIRE_LOCAL_MEDIA:
+                pytest.fail(f"REQUIRE_LOCAL_MEDIA is set but the test video is unavailable: {e}")
+            pytest.skip(str(e))
+        size_mb = os.path.getsize(path) / 1e6
+
+        test_logger.info(f"[CHROME] Step 1: Load {size_mb:.1f} MB video")
+        driver = driver_pool.acquire("chrome", test_logger)
+        failed = True
+        try:
+            reset_page(driver, media_server.url_for(path))
+            page = VideoPage(driver)
+            page.wait_for_video_ready()
+
+            test_logger.info("[CHROME] Step 2: Seek across the file")
+            latencies = []
+            for target in (10.0, TEST_VIDEO_DURATION - 5.0, 2.0, TEST_VIDEO_DURATION / 2):
+                start = time.perf_counter()
+                page.seek_video(target)
+                latencies.append(time.perf_counter() - start)
+                assert abs(page.get_current_time() - target) <= 1
+
+            latencies.sort()
+            test_logger.info(f"[CHROME] Seek latency {bitrate_kbps}k ({size_mb:.1f} MB): "
+                             f"median {latencies[len(latencies) // 2] * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms")
+            failed = False
+        finally:
+            driver_pool.release("chrome", driver, failed=failed, logger=test_logger)
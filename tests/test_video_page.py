@@ -0,0 +1,54 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pages.video_page import VideoPage
+from tests.fake_driver import FakeDriver
+
+
+class TestVideoPageScripts:
+    """Page object round-trip tests - no browser needed"""
+
+    def test_get_state_single_round_trip(self, test_logger):
+        """Test get_state reads everything with one execute_script"""
+        state = {"currentTime": 3.0, "duration": 10.0, "paused": False, "ended": False,
+                 "playing": True, "readyState": 4, "buffered": [[0, 10]], "scrollX": 0, "scrollY": 0}
+        driver = FakeDriver(default=state)
+        page = VideoPage(driver)
+
+        test_logger.info("Step 1: Read state")
+        assert page.get_state() == state
+
+        test_logger.info("Step 2: Validate one round trip covering all fields")
+        assert len(driver.scripts) == 1
+        for field in ("currentTime", "duration", "paused", "ended", "readyState", "buffered", "scrollY"):
+            assert field in driver.scripts[0][0]
+
+    def test_batch_sends_one_script(self, test_logger):
+        """Test batched actions are sent in order as a single script"""
+        driver = FakeDriver(default=[None, None, 10.0, None])
+        page = VideoPage(driver)
+
+        test_logger.info("Step 1: Queue seek, pause, query and scroll")
+        with page.batch() as batch:
+            batch.seek(10).pause().current_time().scroll_to(500)
+            assert len(batch) == 4
+
+        test_logger.info("Step 2: Validate a single ordered script")
+        assert len(driver.scripts) == 1
+        script, _ = driver.scripts[0]
+        positions = [script.index(s) for s in
+                     ("video.currentTime = 10.0", "video.pause()", "return video.currentTime", "scrollTo(0, 500)")]
+        assert positions == sorted(positions)
+        assert batch.results == [None, None, 10.0, None]
+
+    def test_batch_not_sent_on_error(self, test_logger):
+        """Test nothing is sent when the with-block raises"""
+        driver = FakeDriver()
+        page = VideoPage(driver)
+        with pytest.raises(ValueError):
+            with page.batch() as batch:
+                batch.play()
+                raise ValueError("abort")
+        assert driver.scripts == []
@@ -0,0 +1,279 @@
+import functools
+import glob
+import html
+import inspect
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+import pytest
+
+
+STEP_PATTERN = re.compile(r"\bStep (\d+):?\s*(.*)$")
+
+# (module, class, category, methods or None for every public method)
+INSTRUMENTED = [
+    ("pages.video_page", "VideoPage", "page", None),
+    ("pages.video_page", "ScriptBatch", "page", ["execute"]),
+    ("api.event_api", "EventAPI", "api", None),
+    ("api.async_event_api", "AsyncEventAPI", "api", None),
+    ("selenium.webdriver.remote.webdriver", "WebDriver", "webdriver", ["execute"]),
+    ("requests.sessions", "Session", "http", ["send"]),
+]
+
+
+def _now_us():
+    return time.perf_counter_ns() / 1000.0
+
+
+class StepHandler(logging.Handler):
+    """Turns "Step N: ..." records into spans that end at the next step or at test end"""
+
+    def __init__(self, plugin):
+        super().__init__()
+        self.plugin = plugin
+
+    def emit(self, record):
+        if record.levelno < logging.INFO:
+            return
+        match = STEP_PATTERN.search(record.getMessage())
+        if match:
+            self.plugin.start_step(f"Step {match.group(1)}: {match.group(2)}".rstrip(": "))
+
+
+class TimingPlugin():
+    """High-resolution spans for test phases, fixtures, steps, page/API methods,
+    WebDriver commands, HTTP requests and sleeps.
+
+    Spans are Chrome trace "complete" events (viewable in chrome://tracing or
+    ui.perfetto.dev). Each xdist worker writes `<trace>.parts/<worker>.json`
+    and the controller merges them into `<trace>`. Per-test totals go to the
+    pytest-html report and to results.xml as properties.
+    """
+
+    def __init__(self, trace_path, worker="main"):
+        self.trace_path = trace_path
+        self.worker = worker
+        self.pid = int(re.sub(r"\D", "", worker) or 0) + (0 if worker == "main" else 1)
+        self.spans = []
+        self._patched = []
+        self._step = None
+        self._test_start = None
+        self._test_first = 0
+        self._handler = StepHandler(self)
+
+    # --- span recording ---
+    def record(self, name, category, start_us, end_us, args=None):
+        span = {"name": name, "cat": category, "ph": "X", "ts": start_us, "dur": end_us - start_us,
+                "pid": self.pid, "tid": threading.get_ident()}
+        if args:
+            span["args"] = args
+        self.spans.append(span)
+
+    def start_step(self, name):
+        now = _now_us()
+        self.end_step(now)
+        self._step = (name, now)
+
+    def end_step(self, now=None):
+        if self._step is not None:
+            name, start = self._step
+            self._step = None
+            self.record(name, "step", start, now or _now_us())
+
+    def _wrap(self, func, category, name):
+        plugin = self
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = _now_us()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    plugin.record(name, category, start, _now_us())
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = _now_us()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                plugin.record(_span_name(name, args), category, start, _now_us())
+        return wrapper
+
+    def _patch(self, owner, attr, category, name):
+        original = owner.__dict__[attr]
+        setattr(owner, attr, self._wrap(original, category, name))
+        self._patched.append((owner, attr, original))
+
+    def instrument(self):
+        """Wrap whatever instrumented classes are imported by now (modules are never imported here)"""
+        for module_name, class_name, category, methods in INSTRUMENTED:
+            module = sys.modules.get(module_name)
+            cls = getattr(module, class_name, None)
+            if cls is None or any(owner is cls for owner, _, _ in self._patched):
+                continue
+            names = methods or [n for n, v in vars(cls).items() if not n.startswith("_") and inspect.isfunction(v)]
+            for attr in names:
+                if attr in vars(cls):
+                    self._patch(cls, attr, category, f"{class_name}.{attr}")
+        if not any(owner is time for owner, _, _ in self._patched):
+            original = time.sleep
+            time.sleep = self._wrap(original, "sleep", "time.sleep")
+            self._patched.append((time, "sleep", original))
+
+    def restore(self):
+        for owner, attr, original in reversed(self._patched):
+            setattr(owner, attr, original)
+        self._patched = []
+
+    # --- pytest hooks ---
+    def pytest_configure(self, config):
+        logging.getLogger().addHandler(self._handler)
+
+    def pytest_unconfigure(self, config):
+        logging.getLogger().removeHandler(self._handler)
+        self.restore()
+
+    def pytest_collection_finish(self, session):
+        self.instrument()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        self.instrument()
+        start = self._test_start = _now_us()
+        self._test_first = len(self.spans)
+        yield
+        self.end_step()
+        self.record(item.nodeid, "test", start, _now_us())
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        start = _now_us()
+        yield
+        # The browser stack is imported lazily, often by a fixture.
+        self.instrument()
+        self.record(f"fixture {fixturedef.argname}", "fixture", start, _now_us(), {"scope": fixturedef.scope})
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        start = _now_us()
+        yield
+        self.record("setup", "phase", start, _now_us())
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        start = _now_us()
+        yield
+        self.end_step()
+        self.record("call", "phase", start, _now_us())
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item, nextitem):
+        start = _now_us()
+        yield
+        self.record("teardown", "phase", start, _now_us())
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        report = outcome.get_result()
+        if report.when != "call" or self._test_start is None:
+            return
+        # junitxml reads properties from the teardown report, which copies these.
+        item.user_properties.extend(
+            (f"time_{category}_s", round(total, 4)) for category, total in self.totals(self._test_first).items()
+        )
+        pytest_html = item.config.pluginmanager.getplugin("html")
+        if pytest_html is None:
+            return
+        spans = [s for s in self.spans[self._test_first:] if s["cat"] != "test"]
+        report.extras = getattr(report, "extras", []) + [pytest_html.extras.html(self.html_table(spans))]
+
+    def pytest_sessionfinish(self, session):
+        self.end_step()
+        self.write_part()
+        if not hasattr(session.config, "workerinput"):
+            merge_traces(self.parts_dir, self.trace_path)
+
+    # --- output ---
+    @property
+    def parts_dir(self):
+        return f"{self.trace_path}.parts"
+
+    def totals(self, first=0):
+        """Seconds per category over spans recorded since index `first`.
+
+        Nested or overlapping spans of one category on one thread (e.g.
+        EventAPI.send_event around EventAPI.post) are counted once.
+        """
+        intervals = {}
+        for span in self.spans[first:]:
+            if span["cat"] in ("test", "step", "phase"):
+                continue
+            intervals.setdefault((span["cat"], span["tid"]), []).append((span["ts"], span["ts"] + span["dur"]))
+        totals = {}
+        for (category, _), spans in intervals.items():
+            covered = 0.0
+            end = None
+            for start, stop in sorted(spans):
+                if end is None or start >= end:
+                    covered += stop - start
+                    end = stop
+                elif stop > end:
+                    covered += stop - end
+                    end = stop
+            totals[category] = totals.get(category, 0.0) + covered / 1e6
+        return totals
+
+    def html_table(self, spans):
+        by_name = {}
+        for span in spans:
+            entry = by_name.setdefault((span["cat"], span["name"]), [0, 0.0])
+            entry[0] += 1
+            entry[1] += span["dur"] / 1000.0
+        rows = "".join(
+            f"<tr><td>{html.escape(cat)}</td><td>{html.escape(name)}</td><td>{count}</td><td>{ms:.1f}</td></tr>"
+            for (cat, name), (count, ms) in sorted(by_name.items(), key=lambda i: -i[1][1])[:25]
+        )
+        return ("<div><p>Timing (slowest spans, setup + call)</p><table>"
+                "<tr><th>category</th><th>span</th><th>calls</th><th>total ms</th></tr>"
+                f"{rows}</table></div>")
+
+    def write_part(self):
+        os.makedirs(self.parts_dir, exist_ok=True)
+        meta = {"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": self.worker}}
+        with open(os.path.join(self.parts_dir, f"{self.worker}.json"), "w") as f:
+            json.dump([meta] + self.spans, f)
+
+
+def _span_name(name, args):
+    """WebDriver commands and HTTP requests are named after what they did"""
+    if name == "WebDriver.execute" and len(args) > 1:
+        return f"webdriver {args[1]}"
+    if name == "Session.send" and len(args) > 1:
+        request = args[1]
+        return f"{request.method} {request.path_url}"
+    return name
+
+
+def merge_traces(parts_dir, target):
+    """Combine every worker's spans into one Chrome trace file"""
+    events = []
+    for path in sorted(glob.glob(os.path.join(parts_dir, "*.json"))):
+        with open(path) as f:
+            events.extend(json.load(f))
+        os.remove(path)
+    try:
+        os.rmdir(parts_dir)
+    except OSError:
+        pass
+    with open(target, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return target